@@ -1,14 +1,16 @@
 from contextlib import asynccontextmanager
-from dotenv import load_dotenv
 
-# Charger les variables d'environnement depuis .env
-load_dotenv()
+# Charger les variables d'environnement depuis .env (avant les modules qui les lisent)
+import utils.env  # noqa: F401
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from api.routes.v1_router import v1_router
 from api.settings import api_settings
+from db.archive import archiver
+from db.connection import DatabaseUnavailable, DeadlineExceeded, db, deadline, transaction
 from utils.log import logger
 
 # Import des fonctions pour créer les agents (pas les instances)
@@ -27,11 +29,27 @@ async def lifespan(app: FastAPI):
     """Lifespan event handler for startup and shutdown"""
     # Startup: Ne PAS créer les agents ici, ils seront créés en mode lazy
     logger.info("[INIT] Mode lazy: les agents seront créés à la demande")
+    # Archivage périodique des sprints / cartes terminés (DB_ARCHIVE_INTERVAL, désactivé par défaut)
+    archiver.start()
     
     yield
     
     # Shutdown: Fermer les agents si créés
     logger.info("[SHUTDOWN] Arret de l'application")
+    await archiver.stop()
+    await db.disconnect()
+
+
+def _request_timeout(request: Request) -> float:
+    """Délai de la requête : X-Request-Timeout (s) s'il est plus court que le défaut"""
+    timeout = api_settings.request_timeout
+    header = request.headers.get("x-request-timeout")
+    if header:
+        try:
+            timeout = min(timeout, max(float(header), 0.0))
+        except ValueError:
+            pass
+    return timeout
 
 
 def create_app() -> FastAPI:
@@ -50,6 +68,27 @@ def create_app() -> FastAPI:
     # Add v1 router
     app.include_router(v1_router)
 
+    # Une unité de travail par requête HTTP : un seul commit, rollback si erreur (4xx/5xx)
+    @app.middleware("http")
+    async def db_unit_of_work(request: Request, call_next):
+        async with deadline(_request_timeout(request)), transaction() as uow:
+            response = await call_next(request)
+            if response.status_code >= 400:
+                uow.set_rollback_only()
+        return response
+
+    # Délai dépassé (statement_timeout, attente du pool...) → 504
+    @app.exception_handler(DeadlineExceeded)
+    async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+        logger.warning(f"[TIMEOUT] {request.method} {request.url.path}: {exc}")
+        return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+    # Disjoncteur ouvert (base indisponible) → 503, le client peut réessayer plus tard
+    @app.exception_handler(DatabaseUnavailable)
+    async def database_unavailable_handler(request: Request, exc: DatabaseUnavailable):
+        logger.warning(f"[DB DOWN] {request.method} {request.url.path}: {exc}")
+        return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
+
     # Add Middlewares
     app.add_middleware(
         CORSMiddleware,
@@ -0,0 +1,183 @@
+"""
+Routes d'import / export en masse du Product Backlog
+Import : le fichier (NDJSON ou CSV) est lu en streaming et inséré par lots via COPY.
+Export : les items sont lus via un curseur serveur et envoyés au fil de l'eau.
+Une migration de plusieurs milliers de user stories ne tient jamais en mémoire.
+"""
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from utils.log import logger
+from db.connection import deadline, outside_transaction
+from db.tables import BacklogItem
+
+
+backlog_router = APIRouter(prefix="/backlog", tags=["Backlog"])
+
+# Nombre d'items envoyés par COPY
+IMPORT_BATCH_SIZE = 1000
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    """Découper le corps de la requête en lignes au fil de la réception"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def _iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict]]:
+    """
+    Un objet JSON par ligne : (numéro de ligne, objet)
+
+    Raises:
+        ValueError: ligne qui n'est pas un objet JSON (numéro de ligne dans le message)
+    """
+    number = 0
+    async for line in lines:
+        number += 1
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"ligne {number}: JSON invalide ({e})") from None
+        if not isinstance(obj, dict):
+            raise ValueError(f"ligne {number}: objet JSON attendu, {type(obj).__name__} reçu")
+        yield number, obj
+
+
+async def _iter_csv(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict]]:
+    """CSV avec ligne d'en-tête (title, description, assignee_id) : (numéro de ligne, enregistrement)"""
+    header = None
+    pending = ""
+    number = start = 0
+    async for line in lines:
+        number += 1
+        if not pending:
+            start = number
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue  # Champ entre guillemets sur plusieurs lignes : attendre la suite
+        record = next(csv.reader([pending.rstrip("\r")]), [])
+        pending = ""
+        if not record:
+            continue
+        if header is None:
+            header = [column.strip() for column in record]
+            continue
+        yield start, dict(zip(header, record))
+
+
+@backlog_router.post("/{space_id}/import")
+async def import_backlog(
+    request: Request,
+    space_id: str,
+    created_by_id: str,
+    create_tasks: bool = False,
+    column_id: Optional[str] = None
+):
+    """
+    Importer des items dans le Product Backlog (corps NDJSON ou CSV en streaming)
+
+    Content-Type: application/x-ndjson (un objet par ligne) ou text/csv (avec en-tête)
+    Champs: title (obligatoire), description, assignee_id
+
+    Les items sont insérés par lots de IMPORT_BATCH_SIZE, chacun dans sa propre
+    transaction, hors de l'unité de travail de la requête (pas de transaction
+    ouverte pendant tout l'envoi) : sur une ligne invalide, les lots précédents
+    restent importés. La réponse 400 indique la ligne fautive et le nombre
+    d'items déjà importés, pour reprendre après eux.
+
+    Args:
+        space_id: ID du workspace
+        created_by_id: ID du créateur des items
+        create_tasks: Créer aussi une tâche KANBAN par item
+        column_id: Colonne des tâches créées (défaut: première colonne du workspace)
+
+    Returns:
+        {
+            "imported": 2,
+            "items": [{"id": "c...", "sequence_number": 41}, {"id": "c...", "sequence_number": 42}]
+        }
+    """
+    content_type = request.headers.get("content-type", "")
+    lines = _iter_lines(request)
+    rows = _iter_csv(lines) if "csv" in content_type else _iter_ndjson(lines)
+
+    imported = []
+    batch = []
+
+    async def _flush():
+        created = await BacklogItem.bulk_create(
+            space_id=space_id,
+            created_by_id=created_by_id,
+            items=batch,
+            create_tasks=create_tasks,
+            column_id=column_id
+        )
+        imported.extend({"id": row["id"], "sequence_number": row["sequence_number"]} for row in created)
+        batch.clear()
+
+    try:
+        # Le délai de la requête HTTP ne s'applique pas au flux (gros imports) ;
+        # chaque lot est commité seul, même si la réponse est une erreur
+        with deadline(None):
+            async with outside_transaction():
+                async for number, row in rows:
+                    title = (row.get("title") or "").strip()
+                    if not title:
+                        raise ValueError(f"ligne {number}: title requis")
+                    batch.append({
+                        "title": title,
+                        "description": row.get("description") or None,
+                        "assignee_id": row.get("assignee_id") or None,
+                    })
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        await _flush()
+                if batch:
+                    await _flush()
+    except ValueError as e:
+        # JSON invalide, title manquant... : le lot en cours est abandonné, les lots précédents restent commités
+        logger.warning(f"[Backlog] Import interrompu pour {space_id} après {len(imported)} items: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Import invalide ({e}) : {len(imported)} items déjà importés, lot en cours abandonné"
+        )
+
+    logger.info(f"[Backlog] {len(imported)} items importés dans {space_id}")
+    return {"imported": len(imported), "items": imported}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+@backlog_router.get("/{space_id}/export")
+async def export_backlog(space_id: str):
+    """
+    Exporter le Product Backlog en NDJSON (un item par ligne, ordre de priorité)
+    Le format est directement ré-importable via POST /backlog/{space_id}/import.
+    """
+    async def _lines() -> AsyncIterator[str]:
+        # Le délai de la requête HTTP ne s'applique pas au flux (gros backlogs)
+        with deadline(None):
+            async for item in BacklogItem.iter_by_space(space_id):
+                yield json.dumps(item.to_dict(), default=_json_default, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
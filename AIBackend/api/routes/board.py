@@ -0,0 +1,50 @@
+"""
+Routes du board : charge des colonnes (occupation / limite WIP).
+La charge est lue dans le compteur columns.task_count, sans compter les tâches.
+"""
+from fastapi import APIRouter, HTTPException
+
+from db.tables import Column, Space, Sprint
+
+
+board_router = APIRouter(prefix="/board", tags=["Board"])
+
+
+@board_router.get("/{space_id}/load")
+async def get_column_load(space_id: str):
+    """
+    Charge des colonnes du board : colonnes du workspace (KANBAN) ou du sprint actif (SCRUM)
+
+    Returns:
+        {
+            "space_id": "...", "methodology": "KANBAN", "sprint_id": None,
+            "columns": [{"id", "name", "position", "wip_limit", "task_count", "wip_exceeded"}, ...]
+        }
+    """
+    space = await Space.find_by_id(space_id)
+    if not space:
+        raise HTTPException(status_code=404, detail=f"Workspace '{space_id}' introuvable")
+
+    sprint_id = None
+    if space.methodology == "SCRUM":
+        active_sprint = await Sprint.get_active(space_id)
+        if active_sprint:
+            sprint_id = active_sprint.id
+            columns = await Column.get_load(sprint_id=sprint_id)
+        else:
+            columns = []
+    else:
+        columns = await Column.get_load(space_id=space_id)
+
+    return {
+        "space_id": space_id,
+        "methodology": space.methodology,
+        "sprint_id": sprint_id,
+        "columns": [
+            {
+                **column.to_dict(),
+                "wip_exceeded": column['wip_limit'] is not None and column['task_count'] > column['wip_limit'],
+            }
+            for column in columns
+        ],
+    }
@@ -5,11 +5,12 @@ Ces endpoints permettent à l'agent de récupérer les IDs nécessaires sans les
 Les données sont récupérées DIRECTEMENT depuis PostgreSQL (table sessions, spaces, users, columns)
 ⚠️ ENDPOINTS INTERNES - Utilisés par les MCP servers, pas d'authentification JWT requise
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from typing import Optional
 
 from utils.log import logger
-from db.connection import execute_query, execute_one
+from db.connection import DatabaseUnavailable, DeadlineExceeded, db, execute_one, locate, on_shard
+from db.tables import User
 
 
 context_router = APIRouter(prefix="/context", tags=["Context"])
@@ -46,6 +47,8 @@ async def get_current_user(user_id: Optional[str] = "user_alice"):
             "space_id": row['space_id'],
             "sprint_id": row['sprint_id']
         }
+    except (DeadlineExceeded, DatabaseUnavailable):
+        raise
     except Exception as e:
         logger.error(f"[Context] Erreur lors de la récupération de la session: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur base de données: {str(e)}")
@@ -89,11 +92,12 @@ async def get_default_workspace(user_id: Optional[str] = "user_alice"):
                 "methodology": space['methodology']
             }
         
-        # Récupérer les infos du workspace
-        space = await execute_one(
-            "SELECT id, name, methodology FROM spaces WHERE id = %s",
-            (session['space_id'],)
-        )
+        # Récupérer les infos du workspace (sur son shard, la session reste sur la base par défaut)
+        async with on_shard(db.shard_for_space(session['space_id'])):
+            space = await execute_one(
+                "SELECT id, name, methodology FROM spaces WHERE id = %s",
+                (session['space_id'],)
+            )
         
         if not space:
             raise HTTPException(status_code=404, detail=f"Workspace {session['space_id']} introuvable")
@@ -104,7 +108,7 @@ async def get_default_workspace(user_id: Optional[str] = "user_alice"):
             "name": space['name'],
             "methodology": space['methodology']
         }
-    except HTTPException:
+    except (HTTPException, DeadlineExceeded, DatabaseUnavailable):
         raise
     except Exception as e:
         logger.error(f"[Context] Erreur lors de la récupération du workspace: {e}")
@@ -143,11 +147,12 @@ async def get_active_sprint(user_id: Optional[str] = "user_alice"):
                 "end_date": None
             }
         
-        # Récupérer les infos du sprint
-        sprint = await execute_one(
-            "SELECT id, name, status, start_date, end_date FROM sprints WHERE id = %s",
-            (session['sprint_id'],)
-        )
+        # Récupérer les infos du sprint (sur le shard de son workspace)
+        async with on_shard(await locate("sprints", session['sprint_id'])):
+            sprint = await execute_one(
+                "SELECT id, name, status, start_date, end_date FROM sprints WHERE id = %s",
+                (session['sprint_id'],)
+            )
         
         if not sprint:
             logger.warning(f"[Context] Sprint {session['sprint_id']} introuvable")
@@ -167,6 +172,8 @@ async def get_active_sprint(user_id: Optional[str] = "user_alice"):
             "start_date": sprint['start_date'].isoformat() if sprint['start_date'] else None,
             "end_date": sprint['end_date'].isoformat() if sprint['end_date'] else None
         }
+    except (DeadlineExceeded, DatabaseUnavailable):
+        raise
     except Exception as e:
         logger.error(f"[Context] Erreur lors de la récupération du sprint: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur base de données: {str(e)}")
@@ -207,10 +214,11 @@ async def get_workspace_metadata(user_id: Optional[str] = "user_alice"):
             space_id = first_space['id']
         
         # Récupérer les métadonnées complètes
-        space = await execute_one(
-            "SELECT id, name, methodology, created_by_id FROM spaces WHERE id = %s",
-            (space_id,)
-        )
+        async with on_shard(db.shard_for_space(space_id)):
+            space = await execute_one(
+                "SELECT id, name, methodology, created_by_id FROM spaces WHERE id = %s",
+                (space_id,)
+            )
         
         if not space:
             raise HTTPException(status_code=404, detail=f"Workspace {space_id} introuvable")
@@ -222,7 +230,7 @@ async def get_workspace_metadata(user_id: Optional[str] = "user_alice"):
             "methodology": space['methodology'],
             "owner_id": space['created_by_id']
         }
-    except HTTPException:
+    except (HTTPException, DeadlineExceeded, DatabaseUnavailable):
         raise
     except Exception as e:
         logger.error(f"[Context] Erreur lors de la récupération des métadonnées: {e}")
@@ -230,12 +238,19 @@ async def get_workspace_metadata(user_id: Optional[str] = "user_alice"):
 
 
 @context_router.get("/available-users")
-async def get_available_users(space_id: Optional[str] = None):
+async def get_available_users(
+    response: Response,
+    space_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+):
     """
-    Récupérer la liste des utilisateurs disponibles
+    Récupérer la liste des utilisateurs disponibles (ordre alphabétique, paginée)
     
     Args:
         space_id: ID du workspace (optionnel, si fourni filtre par membres du workspace)
+        limit: Taille de la page (défaut: 100, max: DB_MAX_PAGE_SIZE)
+        cursor: Curseur de la page suivante (en-tête X-Next-Cursor de la réponse précédente)
     
     Returns:
         [
@@ -243,40 +258,31 @@ async def get_available_users(space_id: Optional[str] = None):
             {"user_id": "user_bob", "name": "Bob Martin", "email": "bob@example.com"},
             ...
         ]
+        En-tête X-Next-Cursor s'il reste des utilisateurs
     """
     try:
-        if space_id:
-            # Récupérer les membres du workspace
-            rows = await execute_query(
-                """
-                SELECT u.id, u.name, u.email 
-                FROM users u
-                INNER JOIN space_members sm ON u.id = sm.user_id
-                WHERE sm.space_id = %s
-                ORDER BY u.name
-                """,
-                (space_id,)
-            )
-        else:
-            # Récupérer tous les utilisateurs
-            rows = await execute_query(
-                "SELECT id, name, email FROM users ORDER BY name"
-            )
-        
-        users = [
-            {
-                "user_id": row['id'],
-                "name": row['name'],
-                "email": row['email']
-            }
-            for row in rows
-        ]
-        
-        logger.info(f"[Context] Récupération de {len(users)} utilisateurs")
-        return users
+        rows, next_cursor = await User.get_directory_page(space_id, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    except (DeadlineExceeded, DatabaseUnavailable):
+        raise
     except Exception as e:
         logger.error(f"[Context] Erreur lors de la récupération des utilisateurs: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur base de données: {str(e)}")
+    
+    users = [
+        {
+            "user_id": row['id'],
+            "name": row['name'],
+            "email": row['email']
+        }
+        for row in rows
+    ]
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    logger.info(f"[Context] Récupération de {len(users)} utilisateurs")
+    return users
 
 
 @context_router.get("/column-by-name")
@@ -319,10 +325,11 @@ async def get_column_by_name(column_name: str, space_id: Optional[str] = None, u
             raise HTTPException(status_code=404, detail="Aucun workspace disponible")
         
         # Rechercher la colonne par nom et space_id
-        column = await execute_one(
-            "SELECT id, name, position, wip_limit, space_id FROM columns WHERE name = %s AND space_id = %s",
-            (column_name, space_id)
-        )
+        async with on_shard(db.shard_for_space(space_id)):
+            column = await execute_one(
+                "SELECT id, name, position, wip_limit, space_id FROM columns WHERE name = %s AND space_id = %s",
+                (column_name, space_id)
+            )
         
         if not column:
             logger.error(f"[Context] Colonne '{column_name}' introuvable dans workspace {space_id}")
@@ -336,7 +343,7 @@ async def get_column_by_name(column_name: str, space_id: Optional[str] = None, u
             "wip_limit": column['wip_limit'],
             "space_id": column['space_id']
         }
-    except HTTPException:
+    except (HTTPException, DeadlineExceeded, DatabaseUnavailable):
         raise
     except Exception as e:
         logger.error(f"[Context] Erreur lors de la récupération de la colonne: {e}")
@@ -0,0 +1,79 @@
+"""
+Routes d'observabilité de la base de données : pool, requêtes préparées,
+latences par requête/méthode et slow-query log ; réparation des compteurs et du read model des boards ;
+copie des utilisateurs sur les shards ; archivage des sprints et cartes terminés.
+
+⚠️ ENDPOINTS INTERNES - pas d'authentification JWT requise
+"""
+from fastapi import APIRouter
+
+from db.archive import archiver
+from db.connection import db
+from db.instrumentation import instrumentation
+from db.tables import BoardCard, Column, User
+
+
+database_router = APIRouter(prefix="/db", tags=["Database"])
+
+
+@database_router.get("/stats")
+async def get_database_stats(top: int = 50):
+    """
+    Statistiques agrégées de la couche base de données
+
+    Args:
+        top: Nombre d'empreintes / de méthodes retournées (triées par temps total)
+
+    Returns:
+        {
+            "pool": {"pool_size": 4, "pool_available": 3, "statements": {...}, ...},
+            "queries": {"by_fingerprint": [...], "by_caller": [...], "slow_queries": [...]},
+            "archive": {"running": false, "totals": {...}, "last_run": {...}}
+        }
+    """
+    return {
+        "pool": db.get_stats(),
+        "queries": instrumentation.get_stats(top=top),
+        "archive": archiver.get_stats(),
+    }
+
+
+@database_router.get("/slow-queries")
+async def get_slow_queries():
+    """Dernières requêtes lentes avec leur plan EXPLAIN (ANALYZE, BUFFERS)"""
+    return list(instrumentation.slow_queries)
+
+
+@database_router.post("/stats/reset")
+async def reset_database_stats():
+    """Remettre à zéro les statistiques de requêtes"""
+    instrumentation.reset()
+    return {"success": True}
+
+
+@database_router.post("/repair/column-counts")
+async def repair_column_counts():
+    """Vérifier les compteurs de tâches des colonnes (columns.task_count) et corriger ceux qui ont dérivé"""
+    repaired = await Column.repair_task_counts()
+    return {"repaired": len(repaired), "columns": [row.to_dict() for row in repaired]}
+
+
+@database_router.post("/repair/users")
+async def repair_users():
+    """Copier les utilisateurs de la base par défaut sur chaque shard (créés par le backend Node, modifiés...)"""
+    count = await User.replicate()
+    return {"users": count, "shards": len(db.shard_names()) - 1}
+
+
+@database_router.post("/rebuild/board-cards")
+async def rebuild_board_cards():
+    """Reconstruire le read model des boards (board_cards) depuis les tables normalisées"""
+    count = await BoardCard.rebuild()
+    return {"cards": count}
+
+
+@database_router.post("/archive")
+async def run_archive():
+    """Lancer un balayage d'archivage (sprints terminés, cartes Kanban terminées) en tâche de fond"""
+    started = archiver.trigger()
+    return {"started": started, **archiver.get_stats()}
@@ -4,9 +4,15 @@ from fastapi import APIRouter
 from api.routes.status import status_router
 from api.routes.context import context_router
 from api.routes.agents import agents_router
+from api.routes.database import database_router
+from api.routes.backlog import backlog_router
+from api.routes.board import board_router
 
 v1_router = APIRouter(prefix="/v1")
 v1_router.include_router(status_router)
 # v1_router.include_router(playground_router)  # Temporairement désactivé
 v1_router.include_router(context_router)
 v1_router.include_router(agents_router)
+v1_router.include_router(database_router)
+v1_router.include_router(backlog_router)
+v1_router.include_router(board_router)
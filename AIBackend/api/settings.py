@@ -28,6 +28,10 @@ class ApiSettings(BaseSettings):
     # Set to False to disable docs at /docs and /redoc
     docs_enabled: bool = True
 
+    # Délai max (s) des requêtes SQL d'une requête HTTP, au-delà : 504.
+    # Un client peut demander moins via l'en-tête X-Request-Timeout.
+    request_timeout: float = 30.0
+
     # Cors origin list to allow requests from.
     # This list is set using the set_cors_origin_list validator
     # which uses the runtime_env variable to set the
@@ -0,0 +1,233 @@
+"""
+Archivage (hot/cold) des sprints terminés et des cartes Kanban terminées.
+
+Les tables chaudes (sprint_backlog_items, tasks, columns, columns_tasks) ne
+gardent que le travail vivant. archive_sprint() (SQL) déplace un sprint
+COMPLETED (items, tâches, colonnes, placements) vers les tables *_archive ;
+archive_done_cards() y déplace les cartes restées dans la dernière colonne
+d'un board Kanban depuis plus de DB_ARCHIVE_AFTER_DAYS jours. Pour un sprint
+archivé, Sprint.get_tasks et Sprint.get_backlog_items lisent les archives.
+
+⚠️ "Terminée" = dans la colonne de plus grande position du board : aucune
+colonne n'est marquée comme terminale. Réordonner les colonnes (ou en ajouter
+une après "Terminé") change les cartes archivées.
+
+Le balayage avance par lots de DB_ARCHIVE_BATCH_SIZE (une requête atomique par
+sprint ou par lot de cartes, verrous courts), sur chaque shard :
+
+    python -m db.archive                 (cron)
+    DB_ARCHIVE_INTERVAL=3600             (tâche de fond de l'API, 0 = désactivée)
+    POST /v1/db/archive                  (à la demande)
+
+Progression et totaux : archiver.get_stats() (GET /v1/db/stats).
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from db.connection import db, deadline, execute_one, execute_query, on_shard, transaction
+from db.statements import prepared
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+# Âge (jours) au-delà duquel un sprint terminé (date de fin) ou une carte terminée est archivé
+ARCHIVE_AFTER_DAYS = int(os.getenv("DB_ARCHIVE_AFTER_DAYS", 30))
+
+# Sprints / cartes par lot
+ARCHIVE_BATCH_SIZE = int(os.getenv("DB_ARCHIVE_BATCH_SIZE", 100))
+
+# Intervalle (s) du balayage en tâche de fond de l'API (0 = désactivé)
+ARCHIVE_INTERVAL = float(os.getenv("DB_ARCHIVE_INTERVAL", 0))
+
+
+class ArchiveSweep:
+    """Balayage d'archivage par lots, avec compteurs de progression"""
+
+    def __init__(self, after_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE):
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._totals = {"runs": 0, "sprints": 0, "cards": 0, "rows": 0, "batches": 0, "errors": 0}
+        self._run: dict = {}
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def run(self) -> dict:
+        """
+        Un balayage complet (tous les shards) ; ignoré si un balayage est déjà en cours
+
+        Returns:
+            Progression du balayage : {"sprints", "cards", "rows", "batches", "errors", ...}
+        """
+        if self.running:
+            return self._run
+        async with self._lock:
+            self._run = {
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "finished_at": None,
+                "duration_s": None,
+                "shard": None,
+                "phase": None,
+                "sprints": 0,
+                "cards": 0,
+                "rows": 0,
+                "batches": 0,
+                "errors": 0,
+                "last_error": None,
+            }
+            self._totals["runs"] += 1
+            start = time.perf_counter()
+            try:
+                with deadline(None):
+                    for shard in db.shard_names():
+                        self._run["shard"] = shard
+                        async with on_shard(shard):
+                            await self._archive_sprints()
+                            await self._archive_done_cards()
+            finally:
+                self._run["phase"] = None
+                self._run["finished_at"] = datetime.now(timezone.utc).isoformat()
+                self._run["duration_s"] = round(time.perf_counter() - start, 3)
+            logger.info(
+                f"🧊 Archivage terminé : {self._run['sprints']} sprint(s), {self._run['cards']} carte(s), "
+                f"{self._run['rows']} ligne(s) en {self._run['duration_s']}s"
+            )
+            return self._run
+
+    async def _archive_sprints(self) -> None:
+        """Archiver les sprints terminés, un sprint par requête"""
+        self._run["phase"] = "sprints"
+        candidates = prepared("archive.completed_sprints", """
+            SELECT id FROM sprints
+            WHERE status = 'COMPLETED' AND archived_at IS NULL
+              AND end_date < CURRENT_DATE - %s::int
+            ORDER BY end_date, id
+            LIMIT %s
+        """)
+        archive = prepared("archive.sprint", "SELECT archive_sprint(%s) AS moved")
+        while True:
+            rows = await self._on_primary(execute_query, candidates, (self.after_days, self.batch_size))
+            for row in rows:
+                try:
+                    result = await self._on_primary(execute_one, archive, (row['id'],))
+                except Exception as e:
+                    # Le sprint reste candidat : on arrête la phase plutôt que de boucler dessus
+                    self._record_error(f"sprint {row['id']}: {e}")
+                    return
+                self._record(sprints=1, rows=result['moved'])
+            self._record(batches=1)
+            if len(rows) < self.batch_size:
+                return
+
+    async def _archive_done_cards(self) -> None:
+        """Archiver les cartes Kanban terminées, par lots"""
+        self._run["phase"] = "cards"
+        archive = prepared("archive.done_cards", """
+            SELECT archive_done_cards(LOCALTIMESTAMP - make_interval(days => %s), %s) AS moved
+        """)
+        while True:
+            try:
+                result = await self._on_primary(execute_one, archive, (self.after_days, self.batch_size))
+            except Exception as e:
+                self._record_error(f"cartes: {e}")
+                return
+            moved = result['moved']
+            # Tâche + placement par carte
+            self._record(cards=moved, rows=2 * moved, batches=1)
+            if moved < self.batch_size:
+                return
+
+    @staticmethod
+    async def _on_primary(execute, query: str, params: tuple):
+        """Requête dans sa propre transaction sur le primaire : ni replica (candidats à jour), ni nouvelle tentative"""
+        async with transaction() as uow:
+            await uow.acquire()
+            return await execute(query, params)
+
+    def _record(self, **counts: int) -> None:
+        for key, value in counts.items():
+            self._run[key] += value
+            self._totals[key] += value
+
+    def _record_error(self, error: str) -> None:
+        logger.warning(f"⚠️ Archivage {self._run['shard'] or 'base par défaut'} échoué ({error})")
+        self._run["last_error"] = error
+        self._record(errors=1)
+
+    def start(self, interval: float = ARCHIVE_INTERVAL) -> None:
+        """Lancer le balayage périodique en tâche de fond (contexte vide, hors requête)"""
+        if interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop(interval), context=contextvars.Context())
+        logger.info(f"🧊 Archivage périodique toutes les {interval:.0f}s")
+
+    def trigger(self) -> bool:
+        """Lancer un balayage en tâche de fond ; False si un balayage est déjà en cours"""
+        if self.running:
+            return False
+        task = asyncio.create_task(self.run(), context=contextvars.Context())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        return True
+
+    async def stop(self) -> None:
+        """Arrêter le balayage périodique"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.run()
+            except Exception as e:
+                # Pas bloquant : le prochain balayage reprendra où celui-ci s'est arrêté
+                logger.warning(f"⚠️ Balayage d'archivage échoué: {e}")
+
+    def get_stats(self) -> dict:
+        """Totaux depuis le démarrage et progression du balayage en cours (ou du dernier)"""
+        return {
+            "running": self.running,
+            "after_days": self.after_days,
+            "batch_size": self.batch_size,
+            "totals": dict(self._totals),
+            "last_run": dict(self._run) or None,
+        }
+
+
+# Balayages lancés à la demande (référence gardée jusqu'à la fin)
+_background_tasks: set[asyncio.Task] = set()
+
+# Instance globale
+archiver = ArchiveSweep()
+
+
+if __name__ == "__main__":
+    # Balayage ponctuel (cron) : python -m db.archive
+    async def main():
+        await db.connect()
+        try:
+            await archiver.run()
+        finally:
+            await db.disconnect()
+
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+Benchmark des IDs : ancien generate_cuid (aléatoire dans la milliseconde) contre
+les IDs croissants de utils.generate_cuids.
+
+    python -m db.bench_ids [lignes] [taille de lot]
+
+Pour chaque générateur : coût de génération seul, puis débit d'insertion
+(COPY par lots dans une table temporaire, clé primaire TEXT comme les tables
+Prisma) et taille finale de l'index de clé primaire. Avec des IDs croissants,
+chaque insertion tombe sur la dernière page du B-tree (moins de pages lues et
+éclatées, index plus compact). Rien n'est écrit en dehors de tables temporaires.
+"""
+import asyncio
+import logging
+import secrets
+import sys
+import time
+from typing import Callable
+
+from db.connection import db, deadline
+from utils import generate_cuids
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def legacy_cuid() -> str:
+    """Ancien generate_cuid : timestamp base36 + 16 hex, tronqué à 25 caractères"""
+    num = int(time.time() * 1000)
+    ts_part = ""
+    while num:
+        ts_part = _BASE36[num % 36] + ts_part
+        num //= 36
+    return f"c{ts_part}{secrets.token_hex(8)}"[:25]
+
+
+def legacy_cuids(n: int) -> list[str]:
+    """Un appel par ligne, comme les imports avant generate_cuids"""
+    return [legacy_cuid() for _ in range(n)]
+
+
+GENERATORS: dict[str, Callable[[int], list[str]]] = {
+    "legacy": legacy_cuids,
+    "monotonic": generate_cuids,
+}
+
+
+def bench_generation(generate: Callable[[int], list[str]], rows: int, batch_size: int) -> float:
+    """Microsecondes par ID (génération seule)"""
+    start = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        generate(min(batch_size, rows - offset))
+    return (time.perf_counter() - start) / rows * 1_000_000
+
+
+async def bench_inserts(name: str, generate: Callable[[int], list[str]], rows: int, batch_size: int) -> dict:
+    """Insérer `rows` lignes par lots via COPY dans une table temporaire ; débit et taille d'index"""
+    table = f"bench_ids_{name}"
+    async with db.checkout() as conn:
+        await conn.execute(f"DROP TABLE IF EXISTS pg_temp.{table}")
+        await conn.execute(f"CREATE TEMP TABLE {table} (id TEXT PRIMARY KEY, payload TEXT NOT NULL)")
+        start = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            ids = generate(min(batch_size, rows - offset))
+            async with conn.transaction(), conn.cursor() as cur:
+                async with cur.copy(f"COPY {table} (id, payload) FROM STDIN") as copy:
+                    for row_id in ids:
+                        await copy.write_row((row_id, "x" * 32))
+        elapsed = time.perf_counter() - start
+        async with conn.cursor() as cur:
+            await cur.execute(f"SELECT pg_relation_size('{table}_pkey') AS index_bytes")
+            index_bytes = (await cur.fetchone())["index_bytes"]
+        await conn.execute(f"DROP TABLE pg_temp.{table}")
+    return {
+        "rows_per_s": round(rows / elapsed),
+        "seconds": round(elapsed, 3),
+        "index_mb": round(index_bytes / 1024 / 1024, 2),
+    }
+
+
+async def run(rows: int, batch_size: int) -> dict[str, dict]:
+    """Mesures de chaque générateur : {nom: {"us_per_id", "rows_per_s", "seconds", "index_mb"}}"""
+    results = {}
+    with deadline(None):
+        for name, generate in GENERATORS.items():
+            result = {"us_per_id": round(bench_generation(generate, rows, batch_size), 2)}
+            result.update(await bench_inserts(name, generate, rows, batch_size))
+            results[name] = result
+            logger.info(
+                f"⏱️ {name:<9} {result['us_per_id']:>6} µs/ID  {result['rows_per_s']:>8} lignes/s  "
+                f"index {result['index_mb']} Mo"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    async def main() -> None:
+        rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+        batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+        await db.connect()
+        try:
+            results = await run(rows, batch_size)
+        finally:
+            await db.disconnect()
+        legacy, monotonic = results["legacy"], results["monotonic"]
+        logger.info(
+            f"✅ IDs croissants : débit x{monotonic['rows_per_s'] / legacy['rows_per_s']:.2f}, "
+            f"génération x{legacy['us_per_id'] / monotonic['us_per_id']:.2f}, "
+            f"index {monotonic['index_mb']} Mo contre {legacy['index_mb']} Mo"
+        )
+
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Curseurs de pagination opaques.
+
+Un curseur encode la position de la dernière ligne renvoyée (keyset) : la page
+suivante reprend strictement après elle, sans OFFSET. Il est opaque pour
+l'appelant (agent, client API) qui se contente de le renvoyer tel quel.
+"""
+import base64
+import json
+import os
+from typing import Optional
+
+
+def encode_cursor(payload: dict) -> str:
+    """Encoder une position en curseur opaque (base64 url-safe, sans padding)"""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Décoder un curseur opaque
+
+    Raises:
+        ValueError: si le curseur est invalide
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Curseur invalide") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Curseur invalide")
+    return payload
+
+
+# Taille de page maximale des listes paginées (outils MCP, API)
+MAX_PAGE_SIZE = int(os.getenv("DB_MAX_PAGE_SIZE", 200))
+
+
+def page_size(limit: Optional[int], default: int = 50) -> int:
+    """Taille de page demandée, bornée à [1, MAX_PAGE_SIZE]"""
+    if not limit:
+        return default
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def encode_keyset(row, *fields: str) -> str:
+    """Curseur de la page suivante : valeurs de la clé de tri de la dernière ligne"""
+    return encode_cursor({"k": [row[field] for field in fields]})
+
+
+def decode_keyset(cursor: str, size: int) -> list:
+    """
+    Valeurs de la clé de tri contenues dans un curseur encode_keyset()
+
+    Raises:
+        ValueError: si le curseur est invalide
+    """
+    keys = decode_cursor(cursor).get("k")
+    if not isinstance(keys, list) or len(keys) != size:
+        raise ValueError("Curseur invalide")
+    return keys
+
+
+def paginate(rows: list, limit: int, *fields: str) -> tuple[list, Optional[str]]:
+    """
+    Découper le résultat d'une requête LIMIT limit + 1 en (page, curseur suivant)
+
+    La ligne en plus indique seulement qu'il reste une page : elle n'est pas renvoyée.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_keyset(page[-1], *fields)
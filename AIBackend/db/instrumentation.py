@@ -0,0 +1,187 @@
+"""
+Instrumentation des requêtes SQL : latences, nombre de lignes et slow-query log.
+
+Chaque requête est normalisée en empreinte (fingerprint : littéraux et
+paramètres remplacés par ?), puis agrégée par empreinte et par méthode
+appelante (ex: Task.get_kanban_board). Les requêtes qui dépassent le seuil
+DB_SLOW_QUERY_MS sont journalisées avec leur plan EXPLAIN (ANALYZE, BUFFERS).
+"""
+import bisect
+import logging
+import os
+import re
+import sys
+from collections import deque
+from datetime import datetime, timezone
+
+logger = logging.getLogger("db.slow_query")
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+# Bornes supérieures des buckets de l'histogramme (ms), le dernier bucket est +inf
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Nombre max d'empreintes / d'appelants suivis (au-delà : agrégés dans "<other>")
+MAX_TRACKED_KEYS = 500
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|%\(\w+\)s|\$\d+")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+# Modules ignorés pour retrouver la méthode appelante
+_INTERNAL_MODULES = ("db.connection", "db.instrumentation", "db.resilience", "db.ranking", "contextlib", "asyncio")
+
+
+def fingerprint(sql: str) -> str:
+    """Normaliser une requête : littéraux et paramètres → ?, espaces compactés"""
+    sql = _COMMENT_RE.sub(" ", sql)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def find_caller() -> str:
+    """Méthode (hors couche connexion) à l'origine de la requête, ex: db.tables.task.Task.find_by_id"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_INTERNAL_MODULES):
+            return f"{module}.{frame.f_code.co_qualname}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+class QueryStats:
+    """Agrégats d'une empreinte ou d'un appelant : compteurs + histogramme de latence"""
+
+    __slots__ = ("calls", "errors", "rows", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def add(self, duration_ms: float, rows: int, error: bool) -> None:
+        self.calls += 1
+        self.errors += error
+        self.rows += max(rows, 0)
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, duration_ms)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Percentile approché (borne supérieure du bucket)"""
+        if not self.calls:
+            return 0.0
+        target = q * self.calls
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return min(float(bound), self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        labels = [f"le_{b}ms" for b in HISTOGRAM_BUCKETS_MS] + ["inf"]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class QueryInstrumentation:
+    """Collecteur global des statistiques de requêtes"""
+
+    def __init__(self):
+        self.enabled = os.getenv("DB_INSTRUMENTATION", "true").lower() != "false"
+        self.slow_query_ms = float(os.getenv("DB_SLOW_QUERY_MS", 500))
+        self.explain_slow_queries = os.getenv("DB_SLOW_QUERY_EXPLAIN", "true").lower() != "false"
+        self.explain_cooldown_s = float(os.getenv("DB_SLOW_QUERY_EXPLAIN_COOLDOWN", 300))
+        self.reset()
+
+    def reset(self) -> None:
+        self.by_fingerprint: dict[str, QueryStats] = {}
+        self.by_caller: dict[str, QueryStats] = {}
+        self.slow_queries: deque = deque(maxlen=100)
+        self._last_explain: dict[str, float] = {}
+
+    @staticmethod
+    def _stats_for(table: dict[str, QueryStats], key: str) -> QueryStats:
+        stats = table.get(key)
+        if stats is None:
+            if len(table) >= MAX_TRACKED_KEYS:
+                key = "<other>"
+                stats = table.get(key)
+            if stats is None:
+                stats = table[key] = QueryStats()
+        return stats
+
+    def record(self, sql: str, caller: str, duration_ms: float, rows: int, error: bool = False) -> dict | None:
+        """
+        Enregistrer une exécution
+
+        Returns:
+            L'entrée du slow-query log si la requête dépasse le seuil, sinon None
+        """
+        fp = fingerprint(sql)
+        self._stats_for(self.by_fingerprint, fp).add(duration_ms, rows, error)
+        self._stats_for(self.by_caller, caller).add(duration_ms, rows, error)
+
+        if duration_ms < self.slow_query_ms:
+            return None
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "fingerprint": fp,
+            "caller": caller,
+            "duration_ms": round(duration_ms, 3),
+            "rows": rows,
+            "plan": None,
+        }
+        self.slow_queries.append(entry)
+        logger.warning(f"🐢 Requête lente ({duration_ms:.0f} ms, {caller}): {fp}")
+        return entry
+
+    def should_explain(self, entry: dict, now: float) -> bool:
+        """Limiter la capture EXPLAIN à une fois par empreinte et par période"""
+        if not self.explain_slow_queries:
+            return False
+        last = self._last_explain.get(entry["fingerprint"])
+        if last is not None and now - last < self.explain_cooldown_s:
+            return False
+        self._last_explain[entry["fingerprint"]] = now
+        return True
+
+    def get_stats(self, top: int = 50) -> dict:
+        """Statistiques agrégées (empreintes et appelants triés par temps total)"""
+        def _top(table: dict[str, QueryStats]) -> list[dict]:
+            ranked = sorted(table.items(), key=lambda kv: -kv[1].total_ms)[:top]
+            return [{"key": key, **stats.to_dict()} for key, stats in ranked]
+
+        return {
+            "slow_query_ms": self.slow_query_ms,
+            "by_fingerprint": _top(self.by_fingerprint),
+            "by_caller": _top(self.by_caller),
+            "slow_queries": list(self.slow_queries),
+        }
+
+
+# Collecteur global
+instrumentation = QueryInstrumentation()
@@ -0,0 +1,383 @@
+"""
+Contrôle des plans d'exécution des requêtes des modèles (régression d'index).
+
+    python -m db.plans [workspaces]
+
+Un jeu de données synthétique (DB_PLANS_DATASET_SPACES workspaces par défaut :
+membres, sprints, colonnes, items, tâches) est chargé puis analysé (ANALYZE)
+dans une transaction annulée à la fin : rien ne reste en base, mais les tables
+sont verrouillées le temps du contrôle (base de dev ou de CI, pas la production).
+
+Chaque requête déclarée avec prepared() dans db/tables, db/ranking et db/archive
+est préparée, puis passée à EXPLAIN EXECUTE avec des valeurs réelles du jeu de
+données (choisies d'après la colonne comparée au paramètre), avec les réglages
+par défaut du planificateur : le plan est celui que la requête aurait en production.
+
+Code retour 1 si une requête lit une table en Seq Scan ou trie explicitement
+(Sort) sans figurer dans EXPECTED. Les Incremental Sort sont acceptés : le
+début de la clé de tri vient déjà d'un index (colonnes par position, puis
+tâches par rang dans chaque colonne).
+"""
+import ast
+import asyncio
+import itertools
+import logging
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any
+
+from psycopg import Rollback, sql
+
+from db.connection import db, deadline
+from db.ranking import _RANKED
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+_ROOT = Path(__file__).resolve().parent
+
+# Requêtes dont le Seq Scan / Sort est voulu : nom -> raison
+EXPECTED = {
+    "column.repair_task_counts": "recalcul de tous les compteurs (maintenance)",
+    "ranking.long_ranks.columns_tasks": "balayage de maintenance (python -m db.ranking)",
+    "ranking.long_ranks.backlog_items": "balayage de maintenance (python -m db.ranking)",
+    "ranking.long_ranks.sprint_backlog_items": "balayage de maintenance (python -m db.ranking)",
+    "backlog_item.search": "tri par pertinence des seuls résultats de la recherche",
+    "task.get_by_sprint": "tâches d'un sprint (bornées) triées par colonne puis rang",
+    "sprint.get_tasks": "tâches d'un sprint (bornées) triées par colonne puis rang",
+    "sprint.get_tasks.archived": "tâches d'un sprint archivé (bornées) triées par colonne puis rang",
+    "sprint_backlog_item.get_tasks": "tâches d'un item (quelques lignes) triées par colonne",
+    "ranking.rebalance.lock.columns_tasks": "rééquilibrage : verrou de toutes les lignes du groupe",
+    "ranking.rebalance.lock.backlog_items": "rééquilibrage : verrou de toutes les lignes du groupe",
+    "ranking.rebalance.lock.sprint_backlog_items": "rééquilibrage : verrou de toutes les lignes du groupe",
+    "space.get_members": "tous les membres du workspace (non paginé)",
+    "user.get_all": "liste complète des utilisateurs (administration)",
+}
+
+# Requêtes sans plan (COPY...)
+_EXPLAINABLE_RE = re.compile(r"^\s*(select|with|insert|update|delete)\b", re.I)
+
+# Taille du jeu de données synthétique (workspaces ; ~180 tâches et 100 items par workspace)
+PLANS_DATASET_SPACES = int(os.getenv("DB_PLANS_DATASET_SPACES", 500))
+
+# Au-delà de ce nombre de lignes (estimé), un Sort ou un Seq Scan est une régression ;
+# en deçà (5 colonnes, 20 items d'un sprint, tables d'archive vides), il est moins cher qu'un index
+PLANS_MAX_ROWS = int(os.getenv("DB_PLANS_MAX_ROWS", 500))
+
+# Jeu de données (IDs préfixés "plans-") : par workspace 10 utilisateurs, 4 membres, 4 sprints
+# (actif, 2 terminés, à venir) de 20 items, 5 colonnes de board et 4 par sprint, 100 items et une
+# tâche par item ou item de sprint. Le workspace n°1 est 50 fois plus gros (1000 membres,
+# 5000 items, 1000 tâches par colonne) : c'est lui qu'interrogent les requêtes contrôlées.
+_DATASET = [
+    """
+    INSERT INTO users (id, email, password_hash, name, created_at)
+    SELECT 'plans-u-' || n, 'plans-' || n || '@example.test', 'x', 'Plans user ' || lpad(n::text, 6, '0'),
+           LOCALTIMESTAMP - n * interval '1 minute'
+    FROM generate_series(1, 10 * %(spaces)s) n
+    """,
+    """
+    INSERT INTO spaces (id, name, methodology, owner_id, created_at)
+    SELECT 'plans-s-' || s, 'Plans ' || s, (CASE WHEN mod(s, 2) = 0 THEN 'SCRUM' ELSE 'KANBAN' END)::"Methodology",
+           'plans-u-' || (10 * s), LOCALTIMESTAMP - s * interval '1 hour'
+    FROM generate_series(1, %(spaces)s) s
+    """,
+    """
+    INSERT INTO space_members (id, space_id, user_id)
+    SELECT 'plans-m-' || s || '-' || m, 'plans-s-' || s, 'plans-u-' || CASE WHEN s = 1 THEN m ELSE 10 * s - m END
+    FROM generate_series(1, %(spaces)s) s, generate_series(1, CASE WHEN s = 1 THEN 1000 ELSE 4 END) m
+    """,
+    """
+    INSERT INTO sprints (id, space_id, name, status, start_date, end_date)
+    SELECT 'plans-sp-' || s || '-' || k, 'plans-s-' || s, 'Sprint ' || k,
+           (ARRAY['ACTIVE', 'COMPLETED', 'COMPLETED', 'PLANNING'])[k]::"SprintStatus",
+           CURRENT_DATE - 14 * k, CURRENT_DATE - 14 * k + 14
+    FROM generate_series(1, %(spaces)s) s, generate_series(1, 4) k
+    """,
+    # Statistiques à jour avant chaque table qui les référence (contrôles de clés étrangères par index)
+    "ANALYZE users, spaces, sprints",
+    """
+    INSERT INTO backlog_items (id, space_id, title, description, sequence_number, position, assignee_id,
+                               created_by_id, rank)
+    SELECT 'plans-bi-' || s || '-' || i, 'plans-s-' || s, 'Item ' || i, 'Synthetic backlog item', i, i,
+           'plans-u-' || (10 * s - mod(i, 4)), 'plans-u-' || (10 * s), '4' || lpad(i::text, 4, '0')
+    FROM generate_series(1, %(spaces)s) s, generate_series(1, CASE WHEN s = 1 THEN 5000 ELSE 100 END) i
+    """,
+    "ANALYZE backlog_items",
+    """
+    INSERT INTO sprint_backlog_items (id, sprint_id, backlog_item_id, story_points, position, rank)
+    SELECT 'plans-sbi-' || s || '-' || k || '-' || i, 'plans-sp-' || s || '-' || k,
+           'plans-bi-' || s || '-' || ((k - 1) * CASE WHEN s = 1 THEN 1000 ELSE 20 END + i),
+           mod(i, 8) + 1, i, '4' || lpad(i::text, 4, '0')
+    FROM generate_series(1, %(spaces)s) s, generate_series(1, 4) k,
+         generate_series(1, CASE WHEN s = 1 THEN 1000 ELSE 20 END) i
+    """,
+    "ANALYZE sprint_backlog_items",
+    """
+    INSERT INTO columns (id, space_id, name, position)
+    SELECT 'plans-c-' || s || '-' || p, 'plans-s-' || s, 'Column ' || p, p
+    FROM generate_series(1, %(spaces)s) s, generate_series(0, 4) p
+    """,
+    """
+    INSERT INTO columns (id, sprint_id, name, position)
+    SELECT 'plans-c-' || s || '-' || k || '-' || p, 'plans-sp-' || s || '-' || k, 'Column ' || p, p
+    FROM generate_series(1, %(spaces)s) s, generate_series(1, 4) k, generate_series(0, 3) p
+    """,
+    "ANALYZE columns",
+    """
+    INSERT INTO tasks (id, backlog_item_id, assignee_id)
+    SELECT 'plans-t-' || bi.id, bi.id, bi.assignee_id FROM backlog_items bi WHERE bi.id LIKE 'plans-%%'
+    """,
+    """
+    INSERT INTO tasks (id, sprint_backlog_item_id, assignee_id)
+    SELECT 'plans-t-' || sbi.id, sbi.id, NULL FROM sprint_backlog_items sbi WHERE sbi.id LIKE 'plans-%%'
+    """,
+    "ANALYZE tasks",
+    # Placements en masse : compteurs et read model recalculés d'un coup (au lieu d'un trigger par ligne)
+    "ALTER TABLE columns_tasks DISABLE TRIGGER USER",
+    """
+    INSERT INTO columns_tasks (id, column_id, task_id, position, rank, moved_at)
+    SELECT 'plans-ct-' || bi.id, 'plans-c-' || bi.space_id || '-' || mod(bi.position, 5), 'plans-t-' || bi.id,
+           bi.position, bi.rank, LOCALTIMESTAMP - bi.position * interval '1 hour'
+    FROM (SELECT id, substr(space_id, 9) AS space_id, position, rank FROM backlog_items WHERE id LIKE 'plans-%%') bi
+    """,
+    """
+    INSERT INTO columns_tasks (id, column_id, task_id, position, rank)
+    SELECT 'plans-ct-' || sbi.id, 'plans-c-' || substr(sbi.sprint_id, 10) || '-' || mod(sbi.position, 4),
+           'plans-t-' || sbi.id, sbi.position, sbi.rank
+    FROM sprint_backlog_items sbi WHERE sbi.id LIKE 'plans-%%'
+    """,
+    "ALTER TABLE columns_tasks ENABLE TRIGGER USER",
+    """
+    UPDATE columns c SET task_count = placed.count
+    FROM (SELECT column_id, count(*) AS count FROM columns_tasks GROUP BY column_id) placed
+    WHERE c.id = placed.column_id AND c.id LIKE 'plans-%%'
+    """,
+    "SELECT board_cards_rebuild()",
+    "ANALYZE",
+]
+
+# Valeurs réelles du jeu de données (gros workspace), par colonne comparée au paramètre
+_SAMPLES: dict[str, Any] = {
+    "space_id": "plans-s-1",
+    "sprint_id": "plans-sp-1-1",
+    "column_id": "plans-c-1-1",
+    "task_id": "plans-t-plans-bi-1-2500",
+    "backlog_item_id": "plans-bi-1-2500",
+    "sprint_backlog_item_id": "plans-sbi-1-1-500",
+    "user_id": "plans-u-10",
+    "owner_id": "plans-u-10",
+    "assignee_id": "plans-u-9",
+    "created_by_id": "plans-u-10",
+    "email": "plans-10@example.test",
+    "name": "Plans user 000500",
+    "rank": "42500",
+    "sequence_number": 2500,
+    "status": "ACTIVE",
+}
+
+# Valeur de "id" selon la table
+_SAMPLE_IDS = {
+    "users": "plans-u-10",
+    "spaces": "plans-s-1",
+    "sprints": "plans-sp-1-1",
+    "columns": "plans-c-1-1",
+    "tasks": "plans-t-plans-bi-1-2500",
+    "backlog_items": "plans-bi-1-2500",
+    "sprint_backlog_items": "plans-sbi-1-1-500",
+    "columns_tasks": "plans-ct-plans-bi-1-2500",
+}
+
+# Colonne comparée juste avant un paramètre : "t.col = %s", "col <> %s", "(a, b) > (%s, %s)"...
+_COMPARED_RE = re.compile(r"([\w.]+)\s*(?:=|<>|!=|<=|>=|<|>|IS DISTINCT FROM)\s*$", re.I)
+_TUPLE_RE = re.compile(r"\(([\w.\s,]+)\)\s*(?:=|<=|>=|<|>)\s*\(([^()]*)$")
+_TABLE_RE = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.I)
+
+
+def collect_statements() -> dict[str, str]:
+    """Requêtes prepared() des modèles, du classement et de l'archivage, lues dans le code source : {nom: SQL}"""
+    statements = {}
+    for path in sorted((_ROOT / "tables").glob("*.py")) + [_ROOT / "ranking.py", _ROOT / "archive.py"]:
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "prepared" and len(node.args) == 2:
+                statements.update(_expand(*node.args))
+    return statements
+
+
+def _expand(name: ast.expr, sql: ast.expr) -> list[tuple[str, str]]:
+    """(nom, SQL) d'un appel prepared() : littéraux, ou f-strings de db/ranking pour chaque table ordonnée"""
+    if isinstance(name, ast.Constant) and isinstance(sql, ast.Constant):
+        return [(name.value, sql.value)]
+    code = compile(ast.fix_missing_locations(ast.Expression(ast.Tuple([name, sql], ast.Load()))), "<prepared>", "eval")
+    try:
+        return [
+            eval(code, {}, {"table": table, "group": group, "key": key})
+            for table, (group, key) in _RANKED.items()
+        ]
+    except NameError as e:
+        logger.warning(f"⚠️ Requête non évaluable ignorée: {e}")
+        return []
+
+
+def _numbered(sql: str) -> str:
+    """Placeholders psycopg (%s) -> paramètres PostgreSQL ($1, $2...) pour PREPARE"""
+    counter = itertools.count(1)
+    return re.sub(r"%%|%s", lambda m: "%" if m.group() == "%%" else f"${next(counter)}", sql)
+
+
+def _column_at(text: str) -> str | None:
+    """Colonne (avec alias éventuel) comparée au paramètre qui suit `text`"""
+    match = _TUPLE_RE.search(text)
+    if match:
+        columns = [column.strip() for column in match.group(1).split(",")]
+        index = match.group(2).count(",")
+        return columns[index] if index < len(columns) else None
+    match = _COMPARED_RE.search(text)
+    return match.group(1) if match else None
+
+
+def _table_of(query: str, text: str, alias: str | None) -> str | None:
+    """Table d'un alias de la requête (sans alias : dernière table citée avant le paramètre)"""
+    if alias is not None:
+        for table, table_alias in _TABLE_RE.findall(query):
+            if alias in (table, table_alias):
+                return table
+        return None
+    tables = _TABLE_RE.findall(text)
+    return tables[-1][0] if tables else None
+
+
+def _parameters(query: str, types: list[str]) -> list[sql.Composable]:
+    """
+    Valeurs des paramètres (%s) d'une requête, en SQL typé : échantillon du jeu de données
+    d'après la colonne comparée, sinon une valeur passe-partout du type
+    """
+    values = []
+    positions = [m.start() for m in re.finditer(r"%%|%s", query) if m.group() == "%s"]
+    for position, type_name in zip(positions, types):
+        text = query[:position]
+        value = None
+        column = _column_at(text)
+        if column is not None:
+            alias, _, name = column.rpartition(".")
+            if name == "id":
+                value = _SAMPLE_IDS.get(_table_of(query, text, alias or None))
+            else:
+                value = _SAMPLES.get(name)
+        if value is None:
+            if type_name in ("integer", "bigint", "smallint", "numeric", "double precision"):
+                value = 20
+            elif type_name == "boolean":
+                value = True
+            elif type_name.startswith(("timestamp", "date")):
+                values.append(sql.SQL("LOCALTIMESTAMP::{}").format(sql.SQL(type_name)))
+                continue
+            elif type_name.endswith("[]"):
+                value = [_SAMPLE_IDS["tasks"]]
+            elif type_name not in ("text", "character varying", "unknown"):
+                # Enum : première valeur
+                values.append(sql.SQL("(enum_range(NULL::{0}))[1]").format(sql.SQL(type_name)))
+                continue
+            else:
+                value = "plans"
+        values.append(sql.SQL("{}::{}").format(sql.Literal(value), sql.SQL(type_name)))
+    return values
+
+
+async def load_dataset(cur, spaces: int = PLANS_DATASET_SPACES) -> None:
+    """Charger le jeu de données synthétique (dans la transaction en cours) et mettre à jour les statistiques"""
+    for statement in _DATASET:
+        await cur.execute(statement, {"spaces": spaces})
+
+
+def find_problems(plan: dict, sizes: dict[str, float]) -> list[str]:
+    """
+    Seq Scan d'une table et Sort de plus de PLANS_MAX_ROWS lignes (estimations) d'un plan
+    (format JSON), nœuds enfants compris ; `sizes` : lignes par table
+    """
+    problems = []
+    if plan["Node Type"] == "Seq Scan" and sizes.get(plan["Relation Name"], 0) > PLANS_MAX_ROWS:
+        problems.append(f"Seq Scan sur {plan['Relation Name']}")
+    elif plan["Node Type"] == "Sort" and plan["Plan Rows"] > PLANS_MAX_ROWS:
+        problems.append(f"Sort ({', '.join(plan.get('Sort Key', []))}, {plan['Plan Rows']} lignes)")
+    for child in plan.get("Plans", []):
+        problems.extend(find_problems(child, sizes))
+    return problems
+
+
+async def check_plans(spaces: int = PLANS_DATASET_SPACES) -> dict[str, list[str]]:
+    """
+    EXPLAIN de chaque requête sur le jeu de données synthétique, dans une transaction
+    annulée (les requêtes ne sont pas exécutées, le jeu de données disparaît)
+
+    Returns:
+        {nom: [problèmes]} pour les requêtes en régression (hors EXPECTED)
+    """
+    failures = {}
+    with deadline(None):
+        async with db.checkout() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cur:
+                    await load_dataset(cur, spaces)
+                    await cur.execute(
+                        "SELECT relname, reltuples FROM pg_class"
+                        " WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+                    )
+                    sizes = {row["relname"]: row["reltuples"] for row in await cur.fetchall()}
+                    for name, query in sorted(collect_statements().items()):
+                        if not _EXPLAINABLE_RE.match(query):
+                            continue
+                        try:
+                            async with conn.transaction():
+                                await cur.execute(f"PREPARE plans_check AS {_numbered(query)}")
+                                try:
+                                    await cur.execute(
+                                        "SELECT parameter_types::text[] AS types FROM pg_prepared_statements"
+                                        " WHERE name = 'plans_check'"
+                                    )
+                                    types = (await cur.fetchone())["types"]
+                                    explain = sql.SQL("EXPLAIN (FORMAT JSON) EXECUTE plans_check")
+                                    if types:
+                                        explain += sql.SQL("({})").format(
+                                            sql.SQL(", ").join(_parameters(query, types))
+                                        )
+                                    await cur.execute(explain)
+                                    row = await cur.fetchone()
+                                finally:
+                                    await cur.execute("DEALLOCATE plans_check")
+                        except Exception as e:
+                            logger.warning(f"⚠️ {name}: EXPLAIN impossible ({e})")
+                            continue
+                        problems = find_problems(row["QUERY PLAN"][0]["Plan"], sizes)
+                        if not problems:
+                            logger.info(f"✅ {name}")
+                        elif name in EXPECTED:
+                            logger.info(f"➖ {name}: {', '.join(problems)} (attendu : {EXPECTED[name]})")
+                        else:
+                            logger.error(f"❌ {name}: {', '.join(problems)}")
+                            failures[name] = problems
+                raise Rollback()
+    return failures
+
+
+if __name__ == "__main__":
+    async def main() -> int:
+        spaces = int(sys.argv[1]) if len(sys.argv) > 1 else PLANS_DATASET_SPACES
+        await db.connect()
+        try:
+            failures = await check_plans(spaces)
+        finally:
+            await db.disconnect()
+        if failures:
+            logger.error(f"❌ {len(failures)} requête(s) sans index adapté")
+            return 1
+        logger.info("✅ Toutes les requêtes sont servies par un index")
+        return 0
+
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,302 @@
+"""
+Rangs fractionnaires (style LexoRank) pour l'ordre des lignes.
+
+L'ordre de columns_tasks, backlog_items et sprint_backlog_items suit la colonne
+`rank` (texte, collation "C") : une chaîne base 36 comparée en ordre
+lexicographique. Pour insérer entre deux lignes, on calcule une clé strictement
+comprise entre leurs rangs : un réordonnancement ne met à jour qu'une ligne,
+sans renuméroter la colonne ni le backlog.
+
+Ajout en fin de groupe (le cas le plus courant) : le premier chiffre d'une clé
+donne le nombre de chiffres qui le suivent ('1x', '2xx'...), et rank_after
+incrémente ce nombre avec retenue au lieu de couper en deux l'espace restant.
+N ajouts donnent des clés d'environ log36(N) + 1 caractères.
+
+Les clés s'allongent quand on insère toujours au même endroit au milieu ou en
+tête : au-delà de DB_RANK_MAX_LENGTH caractères, le groupe (colonne,
+workspace, sprint) est rééquilibré en tâche de fond avec des clés courtes et
+régulièrement espacées.
+
+Les lignes insérées sans rang (backend Node, anciennes requêtes) sont placées
+en fin de groupe par le trigger `assign_rank` (fonction SQL rank_after, même
+règle que rank_after ici).
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import sys
+from typing import Optional
+
+from db.connection import (
+    current_shard, db, execute_many, execute_one, execute_query, execute_write, on_shard, transaction
+)
+from db.statements import prepared
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+_BASE = len(DIGITS)
+
+# Longueur de clé au-delà de laquelle le groupe est rééquilibré
+RANK_MAX_LENGTH = int(os.getenv("DB_RANK_MAX_LENGTH", 24))
+
+# Tables ordonnées par rang : colonne de groupe, colonne identifiant la ligne déplacée
+# (départage des rangs égaux, comme les index (groupe, rank, clé))
+_RANKED = {
+    "columns_tasks": ("column_id", "task_id"),
+    "backlog_items": ("space_id", "id"),
+    "sprint_backlog_items": ("sprint_id", "id"),
+}
+
+# Verrou consultatif d'un groupe (colonne, workspace, sprint), relâché au commit : sérialise
+# les déplacements (Task.move...) et le rééquilibrage du groupe. Clé : group_lock_key()
+GROUP_LOCK_QUERY = prepared("ranking.lock", "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))")
+
+
+def group_lock_key(table: str, group_id: str) -> str:
+    """Clé du verrou consultatif d'un groupe ("columns_tasks:<colonne>"...)"""
+    return f"{table}:{group_id}"
+
+
+# Rééquilibrages en cours (table, groupe) : un seul à la fois par groupe
+_pending: dict[tuple[str, str], asyncio.Task] = {}
+
+
+def rank_after(before: Optional[str]) -> str:
+    """
+    Clé courte strictement supérieure à `before` (ajout en fin de groupe)
+
+    Le premier chiffre k annonce k chiffres : on incrémente ce nombre (sans '0'
+    final), et on passe à k + 1 chiffres quand il déborde. Une clé de tête
+    ('0...', rank_between(None, ...)) est suivie de la première clé à 1 chiffre.
+    """
+    if before is None:
+        return "11"
+    width = DIGITS.index(before[0])
+    if width == 0:
+        return "11"
+    head = before[1:1 + width].ljust(width, "0")
+    value = int(head, _BASE)
+    if before[0] + head <= before:
+        value += 1
+    if value % _BASE == 0:
+        value += 1  # Pas de '0' final
+    if value >= _BASE ** width:
+        if width == _BASE - 1:
+            return before + DIGITS[_BASE // 2]  # 35 chiffres : jamais atteint en pratique
+        width, value = width + 1, 1
+    return DIGITS[width] + _encode(value, width)
+
+
+def _encode(value: int, width: int) -> str:
+    """Nombre en base 36 sur `width` chiffres (zéros à gauche)"""
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, _BASE)
+        digits.append(DIGITS[digit])
+    return "".join(reversed(digits))
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Clé strictement comprise entre `before` et `after` (None = pas de borne)
+
+    La clé ne se termine jamais par '0' : il reste toujours de la place avant
+    elle. En cas d'égalité (insertions concurrentes), elle est placée après `before`.
+    Sans borne haute, c'est la clé d'ajout en fin de groupe (rank_after).
+    """
+    if before is not None and after is not None and before >= after:
+        after = None
+    if after is None:
+        return rank_after(before)
+    result = []
+    i = 0
+    while True:
+        low = DIGITS.index(before[i]) if before is not None and i < len(before) else 0
+        high = DIGITS.index(after[i]) if after is not None and i < len(after) else _BASE
+        if low == high:
+            result.append(DIGITS[low])
+            i += 1
+            continue
+        middle = (low + high) // 2
+        if middle > low:
+            result.append(DIGITS[middle])
+            return "".join(result)
+        # Chiffres consécutifs : le préfixe est déjà sous `after`, on continue après `before`
+        result.append(DIGITS[low])
+        after = None
+        i += 1
+
+
+def ranks_between(before: Optional[str], after: Optional[str], count: int) -> list[str]:
+    """`count` clés croissantes entre `before` et `after` (bissection / ajouts successifs : longueur en log(count))"""
+    if count <= 0:
+        return []
+    if after is None:
+        ranks = []
+        for _ in range(count):
+            before = rank_after(before)
+            ranks.append(before)
+        return ranks
+    middle = rank_between(before, after)
+    left = (count - 1) // 2
+    return ranks_between(before, middle, left) + [middle] + ranks_between(middle, after, count - 1 - left)
+
+
+def spread_ranks(count: int) -> list[str]:
+    """
+    `count` clés courtes, de même longueur et régulièrement espacées (rééquilibrage),
+    préfixées par leur nombre de chiffres comme celles de rank_after
+    """
+    width = 1
+    while _BASE ** width < 2 * (count + 1):
+        width += 1
+    step = _BASE ** width // (count + 1)
+    # Sans les '0' finaux : l'ordre est conservé et la clé reste valide
+    return [DIGITS[width] + _encode(step * index, width).rstrip("0") for index in range(1, count + 1)]
+
+
+async def rank_at(table: str, group_id: str, index: Optional[int], exclude_id: str = None) -> str:
+    """
+    Rang à donner à une ligne pour qu'elle soit à la position `index` de son groupe
+
+    Args:
+        table: Table ordonnée (columns_tasks, backlog_items, sprint_backlog_items)
+        group_id: Colonne / workspace / sprint
+        index: Position voulue (0 = en tête, None = à la fin)
+        exclude_id: Ligne déplacée (ignorée dans le calcul des voisines)
+    """
+    group, key = _RANKED[table]
+    before = after = None
+    if index is not None:
+        neighbours = await execute_query(prepared(f"ranking.neighbours.{table}", f"""
+            SELECT rank FROM {table}
+            WHERE {group} = %s AND {key} IS DISTINCT FROM %s
+            ORDER BY rank, {key}
+            OFFSET %s
+            LIMIT 2
+        """), (group_id, exclude_id, max(index - 1, 0)))
+        if index == 0:
+            after = neighbours[0]['rank'] if neighbours else None
+        elif neighbours:
+            before = neighbours[0]['rank']
+            after = neighbours[1]['rank'] if len(neighbours) > 1 else None
+        else:
+            index = None  # Au-delà de la fin du groupe
+    if index is None:
+        before = await last_rank(table, group_id, exclude_id)
+    rank = rank_between(before, after)
+    if len(rank) > RANK_MAX_LENGTH:
+        schedule_rebalance(table, group_id)
+    return rank
+
+
+async def last_rank(table: str, group_id: str, exclude_id: str = None) -> Optional[str]:
+    """Plus grand rang du groupe (None si le groupe est vide)"""
+    group, key = _RANKED[table]
+    result = await execute_one(prepared(f"ranking.last_rank.{table}", f"""
+        SELECT MAX(rank) AS rank FROM {table}
+        WHERE {group} = %s AND {key} IS DISTINCT FROM %s
+    """), (group_id, exclude_id))
+    return result['rank'] if result else None
+
+
+async def rebalance(table: str, group_id: str) -> int:
+    """
+    Redonner des rangs courts et régulièrement espacés à tout un groupe (ordre conservé)
+
+    Returns:
+        Nombre de lignes rééquilibrées
+    """
+    group, key = _RANKED[table]
+    async with transaction() as uow:
+        await uow.acquire()
+        # Verrou des déplacements du groupe : attend le commit de celui qui a allongé les clés,
+        # la requête suivante (nouvel instantané) voit son rang
+        await execute_write(GROUP_LOCK_QUERY, (group_lock_key(table, group_id),), returning=False)
+        # Verrouiller les lignes puis trier : avec FOR UPDATE, un ORDER BY au même niveau trie
+        # les versions lues avant l'attente (écritures sans verrou consultatif, backend Node)
+        rows = await execute_query(prepared(f"ranking.rebalance.lock.{table}", f"""
+            WITH locked AS (
+                SELECT id, rank, {key} AS tiebreak FROM {table}
+                WHERE {group} = %s
+                FOR UPDATE
+            )
+            SELECT id FROM locked
+            ORDER BY rank, tiebreak
+        """), (group_id,))
+        ranks = spread_ranks(len(rows))
+        await execute_many(
+            prepared(f"ranking.rebalance.update.{table}", f"UPDATE {table} SET rank = %s WHERE id = %s"),
+            [(rank, row['id']) for rank, row in zip(ranks, rows)]
+        )
+    logger.info(f"⚖️ Rangs rééquilibrés: {table} {group_id} ({len(rows)} lignes)")
+    return len(rows)
+
+
+def schedule_rebalance(table: str, group_id: str) -> None:
+    """
+    Rééquilibrer le groupe en tâche de fond (hors de l'unité de travail en cours)
+
+    La tâche tourne dans un contexte vide (seul le shard est conservé) : elle a
+    sa propre transaction et attend, grâce au verrou du groupe, le commit de la
+    requête qui a allongé les clés.
+    """
+    pending = (table, group_id)
+    if pending in _pending:
+        return
+    task = asyncio.create_task(_run_rebalance(table, group_id, current_shard()), context=contextvars.Context())
+    _pending[pending] = task
+    task.add_done_callback(lambda _: _pending.pop(pending, None))
+
+
+async def _run_rebalance(table: str, group_id: str, shard: Optional[str]) -> None:
+    try:
+        async with on_shard(shard):
+            await rebalance(table, group_id)
+    except Exception as e:
+        # Pas bloquant : les clés longues restent valides, le prochain déplacement réessaiera
+        logger.warning(f"⚠️ Rééquilibrage {table} {group_id} échoué: {e}")
+
+
+async def rebalance_long_ranks(limit: int = 100) -> int:
+    """
+    Rééquilibrer tous les groupes dont une clé dépasse RANK_MAX_LENGTH
+    (y compris ceux allongés par le trigger, pour les insertions du backend Node),
+    sur chaque shard
+
+    Returns:
+        Nombre de groupes rééquilibrés
+    """
+    count = 0
+    for shard in db.shard_names():
+        async with on_shard(shard):
+            for table, (group, _) in _RANKED.items():
+                groups = await execute_query(prepared(f"ranking.long_ranks.{table}", f"""
+                    SELECT DISTINCT {group} AS group_id FROM {table}
+                    WHERE length(rank) > %s
+                    LIMIT %s
+                """), (RANK_MAX_LENGTH, limit))
+                for row in groups:
+                    await rebalance(table, row['group_id'])
+                    count += 1
+    return count
+
+
+if __name__ == "__main__":
+    # Passe de rééquilibrage ponctuelle (cron) : python -m db.ranking
+    async def main():
+        await db.connect()
+        try:
+            count = await rebalance_long_ranks()
+            logger.info(f"✅ {count} groupe(s) rééquilibré(s)")
+        finally:
+            await db.disconnect()
+
+    asyncio.run(main())
@@ -0,0 +1,196 @@
+"""
+Résilience de la connexion PostgreSQL : erreurs transitoires, retry et disjoncteur.
+
+- is_transient() / is_connection_error() classent les erreurs psycopg.
+- retry() ré-exécute une lecture idempotente avec un backoff exponentiel
+  à jitter complet (les processus ne réessaient pas tous en même temps).
+- CircuitBreaker coupe après N erreurs de connexion consécutives : les appels
+  échouent immédiatement (DatabaseUnavailable) au lieu de s'empiler sur une base
+  arrêtée, et une seule sonde en tâche de fond teste la base jusqu'à son retour.
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from psycopg import OperationalError, errors
+from psycopg_pool import PoolTimeout
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+T = TypeVar("T")
+
+# SQLSTATE : base arrêtée / redémarrée (classe 08 = connection exception)
+_CONNECTION_SQLSTATES = ("57P01", "57P02", "57P03")
+# SQLSTATE : conflits réessayables sans que la base soit en cause
+_RETRYABLE_SQLSTATES = ("40001", "40P01")
+
+
+class DatabaseUnavailable(OperationalError):
+    """Le disjoncteur est ouvert : la base est considérée indisponible"""
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    """Erreur de connexion (socket mort, base arrêtée/redémarrée) : compte pour le disjoncteur"""
+    if isinstance(exc, (DatabaseUnavailable, PoolTimeout)):
+        return False  # PoolTimeout : le pool a déjà attendu, la saturation n'est pas une panne
+    if not isinstance(exc, OperationalError):
+        return False
+    if isinstance(exc, errors.QueryCanceled):
+        return False  # statement_timeout / annulation : la base répond
+    sqlstate = getattr(exc, "sqlstate", None)
+    # Sans SQLSTATE : erreur côté client (connexion perdue, serveur injoignable)
+    return sqlstate is None or sqlstate.startswith("08") or sqlstate in _CONNECTION_SQLSTATES
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Erreur qui peut disparaître en réessayant (connexion perdue, sérialisation, deadlock)"""
+    if is_connection_error(exc):
+        return True
+    return getattr(exc, "sqlstate", None) in _RETRYABLE_SQLSTATES
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Backoff exponentiel à jitter complet : uniforme dans [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def retry(
+    fn: Callable[[], Awaitable[T]],
+    attempts: int,
+    base_delay: float,
+    max_delay: float,
+    remaining: Callable[[], Optional[float]] = lambda: None,
+) -> T:
+    """
+    Exécuter fn() en réessayant les erreurs transitoires
+
+    Args:
+        fn: Opération idempotente (lecture)
+        attempts: Nombre total d'essais
+        base_delay: Délai de base du backoff (s)
+        max_delay: Délai max entre deux essais (s)
+        remaining: Temps restant avant l'échéance (s, None sans délai) :
+                   on n'attend jamais au-delà
+    """
+    for attempt in range(attempts):
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt + 1 >= attempts or not is_transient(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            left = remaining()
+            if left is not None and delay >= left:
+                raise
+            logger.warning(f"🔁 Erreur transitoire ({type(e).__name__}), nouvel essai dans {delay * 1000:.0f} ms")
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur : closed (normal) → open (échec immédiat) → closed.
+
+    Ouvert après `failure_threshold` erreurs de connexion consécutives. Tant
+    qu'il est ouvert, une sonde tourne en tâche de fond avec un intervalle
+    croissant et jitteré ; il se referme dès qu'elle réussit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[None]],
+        failure_threshold: int = 5,
+        reset_timeout: float = 5.0,
+        max_reset_timeout: float = 60.0,
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._probe_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    def before_call(self) -> None:
+        """Échouer immédiatement si le disjoncteur est ouvert"""
+        if self.state == self.OPEN:
+            raise DatabaseUnavailable(f"Base de données indisponible ({self.name}) : {self.last_error}")
+
+    def record_success(self) -> None:
+        self.failures = 0
+
+    def record_failure(self, exc: BaseException) -> None:
+        """Compter une erreur de connexion (ouvre le disjoncteur au seuil)"""
+        self.failures += 1
+        self.last_error = f"{type(exc).__name__}: {exc}"
+        if self.state == self.CLOSED and self.failures >= self.failure_threshold:
+            self._trip()
+
+    def _trip(self) -> None:
+        self.state = self.OPEN
+        self.trips += 1
+        self.opened_at = time.monotonic()
+        logger.error(f"🔴 Disjoncteur {self.name} ouvert après {self.failures} erreurs : {self.last_error}")
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    def _close(self) -> None:
+        downtime = time.monotonic() - self.opened_at if self.opened_at else 0.0
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        logger.info(f"🟢 Disjoncteur {self.name} refermé (base de nouveau joignable après {downtime:.1f}s)")
+
+    async def _probe_loop(self) -> None:
+        """Sonder la base jusqu'à ce qu'elle réponde (une seule sonde par processus)"""
+        attempt = 0
+        while self.state == self.OPEN:
+            # Jitter : les sous-processus des agents ne sondent pas tous en même temps
+            delay = min(self.max_reset_timeout, self.reset_timeout * (2 ** attempt))
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            try:
+                await self.probe()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                attempt += 1
+                continue
+            self._close()
+
+    async def stop(self) -> None:
+        """Arrêter la sonde (fermeture de l'application)"""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def get_stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "open_for_s": round(time.monotonic() - self.opened_at, 1) if self.opened_at else 0.0,
+            "last_error": self.last_error,
+        }
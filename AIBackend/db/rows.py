@@ -0,0 +1,90 @@
+"""
+Lignes compactes (row factory) pour psycopg.
+
+Au lieu d'un dict par ligne (table de hachage + clés répétées), chaque ligne
+est un objet à __slots__ qui ne contient que le tuple de valeurs. Le type de
+ligne est généré une fois par liste de colonnes et partagé par toutes les
+lignes du résultat (et des requêtes suivantes qui ont les mêmes colonnes).
+
+Les lignes restent des Mapping en lecture : row['title'], row.get('x'),
+'x' in row, cls(**row) et dict(row) fonctionnent comme avec dict_row.
+Elles sont aussi accessibles par attribut (row.title) et par position (row[0], row[2:5]).
+"""
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Sequence
+
+from psycopg.rows import no_result
+
+# Nombre de types de lignes gardés en cache (un par liste de colonnes distincte)
+MAX_ROW_TYPES = 1024
+
+
+class Row(Mapping):
+    """Ligne en lecture seule adossée à un tuple (vue compatible dict)"""
+
+    __slots__ = ("_values",)
+
+    # Définis sur chaque type généré par row_type()
+    _fields: tuple[str, ...] = ()  # Colonnes du résultat, dans l'ordre
+    _index: dict[str, int] = {}  # Colonne → position (doublons : la dernière gagne)
+
+    @classmethod
+    def _make(cls, values: Sequence[Any]) -> 'Row':
+        row = object.__new__(cls)
+        row._values = tuple(values)
+        return row
+
+    def __getitem__(self, key: str | int | slice) -> Any:
+        if isinstance(key, (int, slice)):
+            return self._values[key]
+        return self._values[self._index[key]]
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self._values[self._index[name]]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"Row({', '.join(f'{k}={v!r}' for k, v in self.items())})"
+
+    def __reduce__(self):
+        return _rebuild_row, (self._fields, self._values)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Copie en dict (sérialisation JSON, modification)"""
+        return {name: self._values[index] for name, index in self._index.items()}
+
+
+def _rebuild_row(fields: tuple[str, ...], values: tuple) -> Row:
+    return row_type(fields)._make(values)
+
+
+@lru_cache(maxsize=MAX_ROW_TYPES)
+def row_type(fields: tuple[str, ...]) -> type[Row]:
+    """Type de ligne (partagé) pour une liste de colonnes"""
+    return type("Row", (Row,), {
+        "__slots__": (),
+        "_fields": fields,
+        "_index": {name: position for position, name in enumerate(fields)},
+    })
+
+
+def slotted_row(cursor) -> Callable[[Sequence[Any]], Row]:
+    """Row factory psycopg : une ligne Row compacte par enregistrement"""
+    description = cursor.description
+    if description is None:
+        return no_result
+    return row_type(tuple(column.name for column in description))._make
@@ -0,0 +1,63 @@
+"""
+Registre des requêtes nommées (prepared statements).
+
+Les requêtes fixes des modèles (db/tables) sont déclarées avec `prepared()`.
+La couche connexion les exécute avec `prepare=True` : psycopg les prépare
+côté serveur une seule fois par connexion du pool, puis les ré-exécute sans
+re-parsing ni re-planification. Le registre compte les exécutions par nom.
+"""
+from collections import Counter
+
+
+class Statement(str):
+    """Requête SQL nommée (reste une str, utilisable partout où une requête l'est)"""
+
+    name: str
+
+    def __new__(cls, name: str, sql: str) -> 'Statement':
+        obj = super().__new__(cls, sql)
+        obj.name = name
+        return obj
+
+
+class StatementRegistry:
+    """Registre des requêtes nommées avec compteur d'exécutions"""
+
+    def __init__(self):
+        self._statements: dict[str, Statement] = {}
+        self._hits: Counter = Counter()
+
+    def register(self, name: str, sql: str) -> Statement:
+        """
+        Déclarer (ou retrouver) une requête nommée
+
+        Raises:
+            ValueError: si le nom est déjà pris par une requête différente
+        """
+        statement = self._statements.get(name)
+        if statement is not None:
+            if statement != sql:
+                raise ValueError(f"Requête '{name}' déjà déclarée avec un SQL différent")
+            return statement
+        statement = self._statements[name] = Statement(name, sql)
+        return statement
+
+    def record_hit(self, statement: Statement) -> None:
+        """Compter une exécution de la requête"""
+        self._hits[statement.name] += 1
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def get_stats(self) -> dict[str, int]:
+        """Nombre d'exécutions par requête nommée (les plus utilisées en premier)"""
+        return {name: self._hits[name] for name in sorted(self._statements, key=lambda n: -self._hits[n])}
+
+
+# Registre global
+registry = StatementRegistry()
+
+
+def prepared(name: str, sql: str) -> Statement:
+    """Déclarer une requête nommée dans le registre global"""
+    return registry.register(name, sql)
@@ -8,6 +8,7 @@ from .sprint import Sprint
 from .sprint_backlog_item import SprintBacklogItem
 from .task import Task
 from .column import Column
+from .board_card import BoardCard
 
 __all__ = [
     "User",
@@ -17,4 +18,5 @@ __all__ = [
     "SprintBacklogItem",
     "Task",
     "Column",
+    "BoardCard",
 ]
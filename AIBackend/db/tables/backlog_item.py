@@ -3,13 +3,27 @@ Modèle BacklogItem - Product Backlog (liste globale des user stories)
 """
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from db.connection import execute_query, execute_one, execute_write
-from utils import generate_cuid
+from db.connection import (
+    Pipeline,
+    copy_rows,
+    execute_query,
+    execute_one,
+    execute_write,
+    pipeline,
+    routed,
+    snapshot,
+    transaction,
+)
+from db.cursors import MAX_PAGE_SIZE, decode_keyset, page_size, paginate
+from db.ranking import last_rank, rank_at, ranks_between
+from db.statements import prepared
+from db.tables import identity
+from utils import generate_cuid, generate_cuids
 
 
-@dataclass
+@dataclass(slots=True)
 class BacklogItem:
     """Item du Product Backlog"""
     id: str
@@ -17,72 +31,313 @@ class BacklogItem:
     title: str
     created_by_id: str
     sequence_number: int  # Numéro de référence unique (#1, #2, #3...)
-    position: int  # Ordre de priorité dans le backlog
+    position: int  # Obsolète (plus écrit, 0) : l'ordre du backlog est donné par rank
     description: Optional[str] = None
     assignee_id: Optional[str] = None
+    rank: Optional[str] = None  # Rang fractionnaire : ordre réel du backlog (db/ranking.py)
     created_at: datetime = None
     
     @classmethod
-    async def find_by_id(cls, item_id: str) -> Optional['BacklogItem']:
-        """Récupérer un item par ID"""
-        query = "SELECT * FROM backlog_items WHERE id = %s"
+    def _from_row(cls, row: dict | None) -> Optional['BacklogItem']:
+        return identity.add(cls(**row), ("sequence", row['space_id'], row['sequence_number'])) if row else None
+    
+    @classmethod
+    @routed("item_id", "backlog_items")
+    async def find_by_id(cls, item_id: str, pipe: Pipeline = None) -> Optional['BacklogItem']:
+        """Récupérer un item par ID (PendingResult si pipe est fourni)"""
+        item = identity.get(cls, item_id)
+        if item is not None:
+            return identity.cached(item, pipe)
+        query = prepared("backlog_item.find_by_id", "SELECT * FROM backlog_items WHERE id = %s")
+        if pipe is not None:
+            return pipe.execute_one(query, (item_id,), transform=cls._from_row)
         result = await execute_one(query, (item_id,))
-        return cls(**result) if result else None
+        return cls._from_row(result)
     
     @classmethod
-    async def find_by_sequence(cls, space_id: str, sequence_number: int) -> Optional['BacklogItem']:
-        """Récupérer un item par son numéro (#123)"""
-        query = """
+    @routed("space_id")
+    async def find_by_sequence(
+        cls,
+        space_id: str,
+        sequence_number: int,
+        pipe: Pipeline = None
+    ) -> Optional['BacklogItem']:
+        """Récupérer un item par son numéro (#123) (PendingResult si pipe est fourni)"""
+        item = identity.get(cls, ("sequence", space_id, sequence_number))
+        if item is not None:
+            return identity.cached(item, pipe)
+        query = prepared("backlog_item.find_by_sequence", """
             SELECT * FROM backlog_items 
             WHERE space_id = %s AND sequence_number = %s
-        """
+        """)
+        if pipe is not None:
+            return pipe.execute_one(query, (space_id, sequence_number), transform=cls._from_row)
         result = await execute_one(query, (space_id, sequence_number))
-        return cls(**result) if result else None
+        return cls._from_row(result)
     
     @classmethod
+    @routed("space_id")
     async def get_by_space(cls, space_id: str) -> list[dict]:
         """Récupérer tous les items du backlog avec infos complètes"""
-        query = """
-            SELECT 
-                bi.*,
-                creator.name as created_by_name,
-                assignee.name as assignee_name
+        return [row async for row in cls.iter_by_space(space_id)]
+    
+    @classmethod
+    @routed("space_id")
+    async def iter_by_space(cls, space_id: str, fetch_size: int = None) -> AsyncIterator[dict]:
+        """
+        Comme get_by_space, page par page (mémoire constante pour les gros backlogs)
+        Pages de get_page (fetch_size items, max DB_MAX_PAGE_SIZE) lues dans un même
+        instantané : chaque page suit l'index (space_id, rank, id), sans tri en mémoire.
+        """
+        cursor = None
+        async with snapshot():
+            while True:
+                rows, cursor = await cls.get_page(space_id, fetch_size or MAX_PAGE_SIZE, cursor)
+                for row in rows:
+                    yield row
+                if cursor is None:
+                    return
+    
+    @classmethod
+    @routed("space_id")
+    async def get_page(
+        cls,
+        space_id: str,
+        limit: int = None,
+        cursor: str = None
+    ) -> tuple[list[dict], Optional[str]]:
+        """
+        Une page du backlog, dans l'ordre du backlog (pagination keyset sur (rank, id), sans OFFSET)
+        
+        Args:
+            space_id: ID du workspace
+            limit: Taille de la page (défaut: 50, max: DB_MAX_PAGE_SIZE)
+            cursor: Curseur renvoyé avec la page précédente
+        
+        Returns:
+            (items, curseur de la page suivante ou None)
+        
+        Raises:
+            ValueError: si le curseur est invalide
+        """
+        limit = page_size(limit)
+        if cursor is None:
+            query = prepared("backlog_item.get_page", """
+                SELECT 
+                    bi.*,
+                    creator.name as created_by_name,
+                    assignee.name as assignee_name
+                FROM backlog_items bi
+                LEFT JOIN users creator ON bi.created_by_id = creator.id
+                LEFT JOIN users assignee ON bi.assignee_id = assignee.id
+                WHERE bi.space_id = %s
+                ORDER BY bi.rank ASC, bi.id
+                LIMIT %s
+            """)
+            params = (space_id, limit + 1)
+        else:
+            query = prepared("backlog_item.get_page.after", """
+                SELECT 
+                    bi.*,
+                    creator.name as created_by_name,
+                    assignee.name as assignee_name
+                FROM backlog_items bi
+                LEFT JOIN users creator ON bi.created_by_id = creator.id
+                LEFT JOIN users assignee ON bi.assignee_id = assignee.id
+                WHERE bi.space_id = %s
+                  AND (bi.rank, bi.id) > (%s, %s)
+                ORDER BY bi.rank ASC, bi.id
+                LIMIT %s
+            """)
+            params = (space_id, *decode_keyset(cursor, 2), limit + 1)
+        rows = await execute_query(query, params)
+        return paginate(rows, limit, "rank", "id")
+    
+    @classmethod
+    @routed("space_id")
+    async def count_by_space(cls, space_id: str) -> int:
+        """Nombre d'items du backlog d'un workspace"""
+        query = prepared("backlog_item.count_by_space", "SELECT COUNT(*) AS count FROM backlog_items WHERE space_id = %s")
+        result = await execute_one(query, (space_id,))
+        return result['count'] if result else 0
+    
+    @classmethod
+    @routed("space_id")
+    async def search(cls, space_id: str, query: str, limit: int = None) -> list[dict]:
+        """
+        Recherche plein texte dans le titre et la description (français et anglais)
+        
+        Utilise l'index GIN backlog_items_search_idx : le vecteur est calculé par
+        backlog_item_search_vector(), le titre pèse plus que la description.
+        
+        Args:
+            space_id: ID du workspace
+            query: Texte recherché (syntaxe web : "expression exacte", -exclu, or)
+            limit: Nombre de résultats (défaut: 10, max: DB_MAX_PAGE_SIZE)
+        
+        Returns:
+            Items triés par pertinence (score décroissant), avec `score`
+        """
+        sql = prepared("backlog_item.search", """
+            SELECT
+                bi.id,
+                bi.sequence_number,
+                bi.title,
+                bi.description,
+                bi.assignee_id,
+                assignee.name as assignee_name,
+                ts_rank_cd(backlog_item_search_vector(bi.title, bi.description), q) AS score
             FROM backlog_items bi
-            LEFT JOIN users creator ON bi.created_by_id = creator.id
+            CROSS JOIN backlog_item_search_query(%s) q
             LEFT JOIN users assignee ON bi.assignee_id = assignee.id
             WHERE bi.space_id = %s
-            ORDER BY bi.position ASC
-        """
-        return await execute_query(query, (space_id,))
+              AND backlog_item_search_vector(bi.title, bi.description) @@ q
+            ORDER BY score DESC, bi.rank ASC, bi.id
+            LIMIT %s
+        """)
+        return await execute_query(sql, (query, space_id, page_size(limit, default=10)))
     
     @classmethod
+    @routed("space_id")
     async def create(
         cls,
         space_id: str,
         title: str,
         created_by_id: str,
         description: str = None,
-        assignee_id: str = None
+        assignee_id: str = None,
+        pipe: Pipeline = None
     ) -> str:
-        """Créer un nouvel item dans le backlog"""
+        """Créer un nouvel item dans le backlog (mis en file si pipe est fourni)"""
         item_id = generate_cuid()
-        query = """
+        query = prepared("backlog_item.create", """
             INSERT INTO backlog_items (
                 id, space_id, title, description, assignee_id, created_by_id
             )
             VALUES (%s, %s, %s, %s, %s, %s)
             RETURNING id
+        """)
+        params = (item_id, space_id, title, description, assignee_id, created_by_id)
+        if pipe is not None:
+            pipe.execute_write(query, params)
+            return item_id
+        return await execute_write(query, params)
+    
+    @classmethod
+    @routed("space_id")
+    async def bulk_create(
+        cls,
+        space_id: str,
+        created_by_id: str,
+        items: list[dict],
+        create_tasks: bool = False,
+        column_id: str = None
+    ) -> list[dict]:
+        """
+        Importer des items en masse via COPY (une seule transaction pour le lot)
+        
+        Args:
+            space_id: ID du workspace
+            created_by_id: ID du créateur des items
+            items: [{"title": ..., "description": ..., "assignee_id": ...}, ...]
+            create_tasks: Si True, crée aussi une tâche KANBAN par item
+            column_id: Colonne où placer les tâches (défaut: première colonne du workspace)
+        
+        Returns:
+            [{"id", "sequence_number", "title", "task_id"}, ...] dans l'ordre d'entrée
         """
-        return await execute_write(
-            query,
-            (item_id, space_id, title, description, assignee_id, created_by_id)
-        )
+        from db.tables.column import Column
+        
+        if not items:
+            return []
+        for index, item in enumerate(items):
+            if not item.get("title"):
+                raise ValueError(f"Item {index}: title requis")
+        
+        async with transaction() as uow:
+            # Toutes les requêtes du lot sur la connexion de la transaction (primaire)
+            await uow.acquire()
+            
+            # Numéros de séquence, dernier rang et colonne cible en un aller-retour
+            async with pipeline() as pipe:
+                pending_sequences = pipe.execute_query(prepared("backlog_item.bulk_create.sequence_numbers", """
+                    SELECT nextval(pg_get_serial_sequence('backlog_items', 'sequence_number')) AS sequence_number
+                    FROM generate_series(1, %s)
+                """), (len(items),))
+                pending_last = pipe.execute_one(prepared("backlog_item.bulk_create.last_rank", """
+                    SELECT MAX(rank) AS rank
+                    FROM backlog_items
+                    WHERE space_id = %s
+                """), (space_id,))
+                pending_column = None
+                if create_tasks and not column_id:
+                    pending_column = await Column.get_first_column_for_space(space_id, pipe=pipe)
+            
+            sequence_numbers = sorted(row['sequence_number'] for row in pending_sequences.result())
+            # Rangs du lot après le dernier item : courts (bissection) et sans toucher aux autres
+            ranks = ranks_between(pending_last.result()['rank'], None, len(items))
+            if pending_column is not None:
+                first_column = pending_column.result()
+                column_id = first_column['id'] if first_column else None
+            
+            # IDs du lot en un appel, croissants : insertions groupées en fin d'index
+            item_ids = generate_cuids(len(items))
+            task_ids = generate_cuids(len(items)) if create_tasks else [None] * len(items)
+            created = [
+                {
+                    "id": item_id,
+                    "sequence_number": sequence_number,
+                    "title": item["title"],
+                    "task_id": task_id,
+                }
+                for item, sequence_number, item_id, task_id in zip(items, sequence_numbers, item_ids, task_ids)
+            ]
+            
+            await copy_rows(
+                "backlog_items",
+                (
+                    "id", "space_id", "title", "description",
+                    "sequence_number", "rank", "assignee_id", "created_by_id"
+                ),
+                (
+                    (
+                        row["id"], space_id, item["title"], item.get("description"), row["sequence_number"],
+                        ranks[index], item.get("assignee_id"), created_by_id
+                    )
+                    for index, (item, row) in enumerate(zip(items, created))
+                )
+            )
+            
+            if create_tasks:
+                await copy_rows(
+                    "tasks",
+                    ("id", "backlog_item_id", "assignee_id"),
+                    ((row["task_id"], row["id"], item.get("assignee_id")) for item, row in zip(items, created))
+                )
+                if column_id:
+                    task_ranks = ranks_between(await last_rank("columns_tasks", column_id), None, len(created))
+                    placement_ids = generate_cuids(len(created))
+                    await copy_rows(
+                        "columns_tasks",
+                        ("id", "column_id", "task_id", "position", "rank"),
+                        (
+                            (placement_ids[index], column_id, row["task_id"], index, task_ranks[index])
+                            for index, row in enumerate(created)
+                        )
+                    )
+        
+        return created
     
+    @routed("self.space_id")
     async def update(self, **kwargs) -> None:
         """Mettre à jour l'item"""
         allowed = {'title', 'description', 'assignee_id', 'position'}
         updates = {k: v for k, v in kwargs.items() if k in allowed}
         
+        # Changement de position : nouveau rang (voir move)
+        if 'position' in updates:
+            await self.move(updates.pop('position'))
+        
         if not updates:
             return
         
@@ -91,8 +346,12 @@ class BacklogItem:
         
         query = f"UPDATE backlog_items SET {set_clause} WHERE id = %s"
         await execute_write(query, values, returning=False)
+        identity.evict(BacklogItem, self.id)
     
+    @routed("self.space_id")
     async def move(self, new_position: int) -> None:
-        """Changer la position dans le Product Backlog"""
-        query = "UPDATE backlog_items SET position = %s WHERE id = %s"
-        await execute_write(query, (new_position, self.id), returning=False)
+        """Changer la position dans le Product Backlog (0 = en tête) : seul le rang de l'item est réécrit"""
+        rank = await rank_at("backlog_items", self.space_id, new_position, exclude_id=self.id)
+        query = prepared("backlog_item.move", "UPDATE backlog_items SET rank = %s WHERE id = %s")
+        await execute_write(query, (rank, self.id), returning=False)
+        identity.evict(BacklogItem, self.id)
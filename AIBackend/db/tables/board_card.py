@@ -0,0 +1,61 @@
+"""
+Modèle BoardCard - Read model dénormalisé des boards (une ligne par tâche placée)
+
+La table board_cards est maintenue par triggers (migration add_board_cards) dans
+la transaction de chaque écriture, quel que soit le client (AIBackend, backend
+Node) : l'application ne l'écrit jamais directement. Les boards la lisent par
+l'index (column_id, rank, task_id) au lieu de joindre six tables.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from db.connection import db, execute_one, on_shard, transaction
+from db.statements import prepared
+
+
+@dataclass(slots=True)
+class BoardCard:
+    """Carte d'un board (tâche placée dans une colonne)"""
+    task_id: str
+    column_id: str
+    column_name: str
+    column_position: int
+    position: int  # Obsolète (plus écrit, 0) : l'ordre de la colonne est donné par rank
+    moved_at: datetime
+    task_created_at: datetime
+    item_id: str  # Item du backlog affiché (direct en KANBAN, via le sprint backlog item en SCRUM)
+    title: str
+    sequence_number: int
+    item_created_at: datetime
+    space_id: Optional[str] = None
+    sprint_id: Optional[str] = None
+    rank: Optional[str] = None
+    assignee_id: Optional[str] = None
+    assignee_name: Optional[str] = None
+    backlog_item_id: Optional[str] = None
+    sprint_backlog_item_id: Optional[str] = None
+    description: Optional[str] = None
+    story_points: Optional[int] = None
+    item_assignee_id: Optional[str] = None
+    item_assignee_name: Optional[str] = None
+    
+    @classmethod
+    async def rebuild(cls) -> int:
+        """
+        Reconstruire tout le read model depuis les tables normalisées (trigger
+        désactivé, import SQL brut...). Bloque les écritures de cartes le temps
+        de la reconstruction : à lancer hors pic.
+        
+        Returns:
+            Nombre de cartes
+        """
+        query = prepared("board_card.rebuild", "SELECT board_cards_rebuild() AS count")
+        count = 0
+        for shard in db.shard_names():
+            # Écriture : transaction sur le primaire (ni replica, ni nouvelle tentative)
+            async with on_shard(shard), transaction() as uow:
+                await uow.acquire()
+                result = await execute_one(query)
+            count += result['count'] if result else 0
+        return count
@@ -5,11 +5,34 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
-from db.connection import execute_query, execute_one, execute_write
+from db.connection import (
+    Pipeline, db, execute_query, execute_many, execute_one, execute_write, on_shard, routed, snapshot, transaction
+)
+from db.cursors import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from db.statements import prepared
 from utils import generate_cuid
 
 
-@dataclass
+def column_task_cursor(column_id: str, task) -> str:
+    """Curseur opaque de la page suivante d'une colonne (après `task`)"""
+    return encode_cursor({"c": column_id, "r": task['rank'], "t": task['id']})
+
+
+def parse_column_task_cursor(cursor: str) -> tuple[str, str, str]:
+    """
+    Décoder un curseur de colonne en (column_id, rank, task_id)
+    
+    Raises:
+        ValueError: si le curseur est invalide
+    """
+    payload = decode_cursor(cursor)
+    try:
+        return str(payload["c"]), str(payload["r"]), str(payload["t"])
+    except KeyError as e:
+        raise ValueError("Curseur invalide") from e
+
+
+@dataclass(slots=True)
 class Column:
     """Colonne kanban"""
     id: str
@@ -18,49 +41,57 @@ class Column:
     space_id: Optional[str] = None  # NULL si colonne de sprint
     sprint_id: Optional[str] = None  # NULL si colonne de space
     wip_limit: Optional[int] = None  # Limite Work In Progress (NULL = illimité)
+    task_count: int = 0  # Nombre de tâches (compteur maintenu par trigger sur columns_tasks)
     created_at: datetime = None
     
     @classmethod
+    @routed("column_id", "columns")
     async def find_by_id(cls, column_id: str) -> Optional['Column']:
         """Récupérer une colonne par ID"""
-        query = "SELECT * FROM columns WHERE id = %s"
+        query = prepared("column.find_by_id", "SELECT * FROM columns WHERE id = %s")
         result = await execute_one(query, (column_id,))
         return cls(**result) if result else None
     
     @classmethod
+    @routed("space_id")
     async def get_by_space(cls, space_id: str) -> list['Column']:
         """Récupérer toutes les colonnes d'un workspace KANBAN"""
-        query = """
+        query = prepared("column.get_by_space", """
             SELECT * FROM columns
             WHERE space_id = %s
             ORDER BY position ASC
-        """
+        """)
         results = await execute_query(query, (space_id,))
         return [cls(**row) for row in results]
     
     @classmethod
-    async def get_first_column_for_space(cls, space_id: str) -> Optional[dict]:
-        """Récupérer la première colonne (To Do) d'un workspace"""
-        query = """
+    @routed("space_id")
+    async def get_first_column_for_space(cls, space_id: str, pipe: Pipeline = None) -> Optional[dict]:
+        """Récupérer la première colonne (To Do) d'un workspace (PendingResult si pipe est fourni)"""
+        query = prepared("column.get_first_column_for_space", """
             SELECT * FROM columns
             WHERE space_id = %s
             ORDER BY position ASC
             LIMIT 1
-        """
+        """)
+        if pipe is not None:
+            return pipe.execute_one(query, (space_id,))
         return await execute_one(query, (space_id,))
     
     @classmethod
+    @routed("sprint_id", "sprints")
     async def get_by_sprint(cls, sprint_id: str) -> list['Column']:
         """Récupérer toutes les colonnes d'un sprint SCRUM"""
-        query = """
+        query = prepared("column.get_by_sprint", """
             SELECT * FROM columns
             WHERE sprint_id = %s
             ORDER BY position ASC
-        """
+        """)
         results = await execute_query(query, (sprint_id,))
         return [cls(**row) for row in results]
     
     @classmethod
+    @routed("space_id")
     async def create_for_space(
         cls,
         space_id: str,
@@ -70,14 +101,15 @@ class Column:
     ) -> str:
         """Créer une colonne pour un workspace KANBAN"""
         column_id = generate_cuid()
-        query = """
+        query = prepared("column.create_for_space", """
             INSERT INTO columns (id, space_id, name, position, wip_limit)
             VALUES (%s, %s, %s, %s, %s)
             RETURNING id
-        """
+        """)
         return await execute_write(query, (column_id, space_id, name, position, wip_limit))
     
     @classmethod
+    @routed("sprint_id", "sprints")
     async def create_for_sprint(
         cls,
         sprint_id: str,
@@ -87,39 +119,110 @@ class Column:
     ) -> str:
         """Créer une colonne pour un sprint SCRUM"""
         column_id = generate_cuid()
-        query = """
+        query = prepared("column.create_for_sprint", """
             INSERT INTO columns (id, sprint_id, name, position, wip_limit)
             VALUES (%s, %s, %s, %s, %s)
             RETURNING id
-        """
+        """)
         return await execute_write(query, (column_id, sprint_id, name, position, wip_limit))
     
+    @routed("self.id", "columns")
     async def get_tasks(self) -> list[dict]:
-        """Récupérer toutes les tâches de cette colonne"""
-        query = """
-            SELECT 
-                ct.position,
-                ct.moved_at,
-                t.*,
-                bi.title,
-                bi.sequence_number,
-                bi.description,
-                assignee.name as assignee_name
-            FROM columns_tasks ct
-            JOIN tasks t ON ct.task_id = t.id
-            JOIN backlog_items bi ON t.backlog_item_id = bi.id
-            LEFT JOIN users assignee ON t.assignee_id = assignee.id
-            WHERE ct.column_id = %s
-            ORDER BY ct.position ASC
         """
-        return await execute_query(query, (self.id,))
+        Récupérer toutes les tâches de cette colonne (KANBAN comme SCRUM)
+        Pages de get_tasks_page lues dans un même instantané : chaque page suit
+        l'index (column_id, rank, task_id) de board_cards, sans tri en mémoire.
+        """
+        tasks, after = [], (None, None)
+        async with snapshot():
+            while True:
+                page, next_cursor = await Column.get_tasks_page(self.id, MAX_PAGE_SIZE, *after)
+                tasks.extend(page)
+                if next_cursor is None:
+                    return tasks
+                after = page[-1]['rank'], page[-1]['id']
+    
+    @classmethod
+    @routed("column_id", "columns")
+    async def get_tasks_page(
+        cls,
+        column_id: str,
+        limit: int = 20,
+        after_rank: str = None,
+        after_task_id: str = None
+    ) -> tuple[list[dict], Optional[str]]:
+        """
+        Récupérer une page de tâches d'une colonne (pagination keyset, sans OFFSET)
+    
+        Args:
+            column_id: ID de la colonne
+            limit: Taille de la page
+            after_rank, after_task_id: Dernière tâche de la page précédente
     
+        Returns:
+            (tâches, curseur de la page suivante ou None)
+        """
+        # Tâches KANBAN comme SCRUM, lues dans le read model board_cards (une seule table)
+        if after_task_id is None:
+            query = prepared("column.get_tasks_page", """
+                SELECT
+                    bc.position,
+                    bc.rank,
+                    bc.moved_at,
+                    bc.task_id AS id,
+                    bc.assignee_id,
+                    bc.backlog_item_id,
+                    bc.sprint_backlog_item_id,
+                    bc.task_created_at AS created_at,
+                    bc.title,
+                    bc.sequence_number,
+                    bc.description,
+                    bc.story_points,
+                    bc.assignee_name
+                FROM board_cards bc
+                WHERE bc.column_id = %s
+                ORDER BY bc.rank ASC, bc.task_id
+                LIMIT %s
+            """)
+            params = (column_id, limit + 1)
+        else:
+            query = prepared("column.get_tasks_page.after", """
+                SELECT
+                    bc.position,
+                    bc.rank,
+                    bc.moved_at,
+                    bc.task_id AS id,
+                    bc.assignee_id,
+                    bc.backlog_item_id,
+                    bc.sprint_backlog_item_id,
+                    bc.task_created_at AS created_at,
+                    bc.title,
+                    bc.sequence_number,
+                    bc.description,
+                    bc.story_points,
+                    bc.assignee_name
+                FROM board_cards bc
+                WHERE bc.column_id = %s
+                  AND (bc.rank, bc.task_id) > (%s, %s)
+                ORDER BY bc.rank ASC, bc.task_id
+                LIMIT %s
+            """)
+            params = (column_id, after_rank, after_task_id, limit + 1)
+    
+        # Une ligne de plus que demandé : indique s'il reste une page
+        rows = await execute_query(query, params)
+        tasks = rows[:limit]
+        next_cursor = column_task_cursor(column_id, tasks[-1]) if len(rows) > limit else None
+        return tasks, next_cursor
+    
+    @routed("self.id", "columns")
     async def get_task_count(self) -> int:
-        """Compter le nombre de tâches dans la colonne"""
-        query = "SELECT COUNT(*) as count FROM columns_tasks WHERE column_id = %s"
+        """Nombre de tâches dans la colonne (compteur maintenu par trigger, O(1))"""
+        query = prepared("column.get_task_count", "SELECT task_count FROM columns WHERE id = %s")
         result = await execute_one(query, (self.id,))
-        return result['count'] if result else 0
+        return result['task_count'] if result else 0
     
+    @routed("self.id", "columns")
     async def is_wip_exceeded(self) -> bool:
         """Vérifier si la limite WIP est dépassée"""
         if self.wip_limit is None:
@@ -127,6 +230,62 @@ class Column:
         count = await self.get_task_count()
         return count > self.wip_limit
     
+    @classmethod
+    @routed("space_id")
+    @routed("sprint_id", "sprints")
+    async def get_load(cls, space_id: str = None, sprint_id: str = None) -> list[dict]:
+        """
+        Charge des colonnes d'un workspace KANBAN ou d'un sprint SCRUM (sans compter les tâches)
+        
+        Returns:
+            [{"id", "name", "position", "wip_limit", "task_count"}, ...] par position
+        """
+        if sprint_id is not None:
+            query = prepared("column.get_load_by_sprint", """
+                SELECT id, name, position, wip_limit, task_count FROM columns
+                WHERE sprint_id = %s
+                ORDER BY position ASC
+            """)
+            return await execute_query(query, (sprint_id,))
+        query = prepared("column.get_load_by_space", """
+            SELECT id, name, position, wip_limit, task_count FROM columns
+            WHERE space_id = %s
+            ORDER BY position ASC
+        """)
+        return await execute_query(query, (space_id,))
+    
+    @classmethod
+    async def repair_task_counts(cls) -> list[dict]:
+        """
+        Recalculer les compteurs qui ont dérivé (trigger désactivé, import SQL brut...)
+        columns_tasks est verrouillée en mode SHARE pendant le recomptage : les
+        déplacements attendent le commit, aucun n'est compté deux fois ni oublié.
+        
+        Returns:
+            [{"id", "task_count", "previous"}, ...] : colonnes corrigées
+        """
+        lock = prepared("column.repair_task_counts.lock", "LOCK TABLE columns_tasks IN SHARE MODE")
+        drifted = prepared("column.repair_task_counts", """
+            SELECT c.id, COUNT(ct.id)::int AS task_count, c.task_count AS previous
+            FROM columns c
+            LEFT JOIN columns_tasks ct ON ct.column_id = c.id
+            GROUP BY c.id
+            HAVING c.task_count <> COUNT(ct.id)
+        """)
+        update = prepared("column.repair_task_counts.update", "UPDATE columns SET task_count = %s WHERE id = %s")
+        repaired = []
+        for shard in db.shard_names():
+            # Verrou, recomptage et corrections dans une transaction sur le primaire
+            async with on_shard(shard), transaction() as uow:
+                await uow.acquire()
+                await execute_write(lock, returning=False)
+                rows = await execute_query(drifted)
+                if rows:
+                    await execute_many(update, [(row['task_count'], row['id']) for row in rows])
+                repaired.extend(rows)
+        return repaired
+    
+    @routed("self.id", "columns")
     async def update(self, **kwargs) -> None:
         """Mettre à jour la colonne"""
         allowed = {'name', 'position', 'wip_limit'}
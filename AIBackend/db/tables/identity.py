@@ -0,0 +1,59 @@
+"""
+Identity map de l'unité de travail (un appel d'outil MCP / une requête API).
+
+Les find_by_* des modèles retournent l'instance déjà chargée pour la même clé
+au lieu de relire la base : un même Space ou BacklogItem n'est lu qu'une fois
+par transaction(), et tous les appelants partagent la même instance. Hors
+transaction() (scripts), rien n'est mis en cache.
+
+Les écritures passant par les modèles évincent l'objet (et ses alias : numéro
+de séquence, sprint actif...). Column n'est pas mis en cache : son compteur
+task_count est modifié par trigger à chaque déplacement.
+"""
+from typing import Any, Optional, TypeVar
+
+from db.connection import PendingResult, current_unit_of_work
+
+T = TypeVar("T")
+
+
+def _objects() -> Optional[dict]:
+    uow = current_unit_of_work()
+    return uow.identity_map if uow is not None else None
+
+
+def get(cls: type[T], key: Any) -> Optional[T]:
+    """Instance de `cls` déjà chargée pour `key` (id ou alias), sinon None"""
+    objects = _objects()
+    if objects is None:
+        return None
+    return objects.get((cls, key))
+
+
+def add(obj: Optional[T], *aliases: Any) -> Optional[T]:
+    """Enregistrer un objet chargé sous son id (et ses alias) ; retourne l'objet"""
+    objects = _objects()
+    if obj is None or objects is None:
+        return obj
+    cls = type(obj)
+    # Une instance déjà connue reste la référence (modifications en mémoire conservées)
+    obj = objects.setdefault((cls, obj.id), obj)
+    for alias in aliases:
+        objects[(cls, alias)] = obj
+    return obj
+
+
+def evict(cls: type, key: Any) -> None:
+    """Retirer l'objet (id ou alias) et toutes les clés qui pointent vers lui"""
+    objects = _objects()
+    if not objects:
+        return
+    obj = objects.pop((cls, key), None)
+    if obj is not None:
+        for other in [k for k, v in objects.items() if v is obj]:
+            del objects[other]
+
+
+def cached(obj: T, pipe=None) -> T | PendingResult:
+    """Objet en cache, sous la forme attendue par l'appelant (PendingResult si pipe est fourni)"""
+    return PendingResult.resolved(obj) if pipe is not None else obj
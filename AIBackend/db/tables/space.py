@@ -5,11 +5,14 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
-from db.connection import execute_query, execute_one, execute_write
+from db.connection import Pipeline, execute_query, execute_one, execute_write, fan_out, routed
+from db.cursors import decode_keyset, page_size, paginate
+from db.statements import prepared
+from db.tables import identity
 from utils import generate_cuid
 
 
-@dataclass
+@dataclass(slots=True)
 class Space:
     """Modèle workspace"""
     id: str
@@ -20,11 +23,24 @@ class Space:
     git_repo_url: Optional[str] = None  # URL du repo Git (optionnel)
     
     @classmethod
-    async def find_by_id(cls, space_id: str) -> Optional['Space']:
-        """Récupérer un workspace par ID"""
-        query = "SELECT id, name, methodology, owner_id, created_at, git_repo_url FROM spaces WHERE id = %s"
+    def _from_row(cls, row: dict | None) -> Optional['Space']:
+        return identity.add(cls(**row)) if row else None
+    
+    @classmethod
+    @routed("space_id")
+    async def find_by_id(cls, space_id: str, pipe: Pipeline = None) -> Optional['Space']:
+        """Récupérer un workspace par ID (PendingResult si pipe est fourni)"""
+        space = identity.get(cls, space_id)
+        if space is not None:
+            return identity.cached(space, pipe)
+        query = prepared(
+            "space.find_by_id",
+            "SELECT id, name, methodology, owner_id, created_at, git_repo_url FROM spaces WHERE id = %s"
+        )
+        if pipe is not None:
+            return pipe.execute_one(query, (space_id,), transform=cls._from_row)
         result = await execute_one(query, (space_id,))
-        return cls(**result) if result else None
+        return cls._from_row(result)
     
     @classmethod
     async def create(
@@ -35,29 +51,78 @@ class Space:
     ) -> str:
         """Créer un nouveau workspace"""
         space_id = generate_cuid()
-        query = """
+        query = prepared("space.create", """
             INSERT INTO spaces (id, name, methodology, owner_id)
             VALUES (%s, %s, %s, %s)
             RETURNING id
-        """
+        """)
         return await execute_write(query, (space_id, name, methodology, owner_id))
     
     @classmethod
     async def get_by_user(cls, user_id: str) -> list['Space']:
-        """Récupérer tous les workspaces d'un utilisateur (propriétaire ou membre)"""
-        query = """
-            SELECT DISTINCT s.*
+        """Récupérer tous les workspaces d'un utilisateur (propriétaire ou membre), tous shards confondus"""
+        query = prepared("space.get_by_user", """
+            SELECT s.*
             FROM spaces s
-            LEFT JOIN space_members sm ON s.id = sm.space_id
-            WHERE s.owner_id = %s OR sm.user_id = %s
+            WHERE s.owner_id = %s
+               OR EXISTS (SELECT 1 FROM space_members sm WHERE sm.space_id = s.id AND sm.user_id = %s)
             ORDER BY s.created_at DESC
-        """
-        results = await execute_query(query, (user_id, user_id))
+        """)
+        results = await fan_out(query, (user_id, user_id), key=lambda row: row['created_at'], reverse=True)
         return [cls(**row) for row in results]
     
+    @classmethod
+    async def get_page_by_user(
+        cls,
+        user_id: str,
+        limit: int = None,
+        cursor: str = None
+    ) -> tuple[list['Space'], Optional[str]]:
+        """
+        Une page des workspaces d'un utilisateur, du plus récent au plus ancien
+        (pagination keyset sur (created_at, id), sans OFFSET). Chaque shard
+        renvoie sa propre page, fusionnée puis recoupée à `limit`.
+        
+        Raises:
+            ValueError: si le curseur est invalide
+        """
+        limit = page_size(limit)
+        # EXISTS plutôt que LEFT JOIN + DISTINCT : le tri suit directement (created_at, id)
+        if cursor is None:
+            query = prepared("space.get_page_by_user", """
+                SELECT s.*
+                FROM spaces s
+                WHERE (
+                    s.owner_id = %s
+                    OR EXISTS (SELECT 1 FROM space_members sm WHERE sm.space_id = s.id AND sm.user_id = %s)
+                )
+                ORDER BY s.created_at DESC, s.id DESC
+                LIMIT %s
+            """)
+            params = (user_id, user_id, limit + 1)
+        else:
+            query = prepared("space.get_page_by_user.after", """
+                SELECT s.*
+                FROM spaces s
+                WHERE (
+                    s.owner_id = %s
+                    OR EXISTS (SELECT 1 FROM space_members sm WHERE sm.space_id = s.id AND sm.user_id = %s)
+                )
+                  AND (s.created_at, s.id) < (%s, %s)
+                ORDER BY s.created_at DESC, s.id DESC
+                LIMIT %s
+            """)
+            params = (user_id, user_id, *decode_keyset(cursor, 2), limit + 1)
+        rows = await fan_out(
+            query, params, key=lambda row: (row['created_at'], row['id']), reverse=True, limit=limit + 1
+        )
+        rows, next_cursor = paginate(rows, limit, "created_at", "id")
+        return [cls(**row) for row in rows], next_cursor
+    
+    @routed("self.id")
     async def get_members(self) -> list[dict]:
         """Récupérer tous les membres du workspace avec leurs infos"""
-        query = """
+        query = prepared("space.get_members", """
             SELECT 
                 sm.id,
                 sm.scrum_role,
@@ -69,18 +134,19 @@ class Space:
             JOIN users u ON sm.user_id = u.id
             WHERE sm.space_id = %s
             ORDER BY sm.joined_at ASC
-        """
+        """)
         return await execute_query(query, (self.id,))
     
+    @routed("self.id")
     async def add_member(
         self,
         user_id: str,
         scrum_role: str = None
     ) -> str:
         """Ajouter un membre au workspace"""
-        query = """
+        query = prepared("space.add_member", """
             INSERT INTO space_members (space_id, user_id, scrum_role)
             VALUES (%s, %s, %s)
             RETURNING id
-        """
+        """)
         return await execute_write(query, (self.id, user_id, scrum_role))
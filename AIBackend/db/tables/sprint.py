@@ -5,11 +5,13 @@ from dataclasses import dataclass
 from datetime import date, datetime
 from typing import Optional
 
-from db.connection import execute_query, execute_one, execute_write
+from db.connection import Pipeline, execute_query, execute_one, execute_write, routed
+from db.statements import prepared
+from db.tables import identity
 from utils import generate_cuid
 
 
-@dataclass
+@dataclass(slots=True)
 class Sprint:
     """Modèle Sprint"""
     id: str
@@ -20,38 +22,54 @@ class Sprint:
     status: str  # 'PLANNED', 'ACTIVE', 'COMPLETED'
     goal: Optional[str] = None
     created_at: datetime = None
+    archived_at: Optional[datetime] = None  # Sprint archivé : items, tâches et colonnes dans les tables *_archive
     
     @classmethod
+    @routed("sprint_id", "sprints")
     async def find_by_id(cls, sprint_id: str) -> Optional['Sprint']:
         """Récupérer un sprint par ID"""
-        query = "SELECT * FROM sprints WHERE id = %s"
+        sprint = identity.get(cls, sprint_id)
+        if sprint is not None:
+            return sprint
+        query = prepared("sprint.find_by_id", "SELECT * FROM sprints WHERE id = %s")
         result = await execute_one(query, (sprint_id,))
-        return cls(**result) if result else None
+        return identity.add(cls(**result)) if result else None
     
     @classmethod
+    @routed("space_id")
     async def get_by_space(cls, space_id: str) -> list['Sprint']:
         """Récupérer tous les sprints d'un workspace"""
-        query = """
+        query = prepared("sprint.get_by_space", """
             SELECT * FROM sprints 
             WHERE space_id = %s
             ORDER BY start_date DESC
-        """
+        """)
         results = await execute_query(query, (space_id,))
         return [cls(**row) for row in results]
     
     @classmethod
-    async def get_active(cls, space_id: str) -> Optional['Sprint']:
-        """Récupérer le sprint actif du workspace"""
-        query = """
+    @routed("space_id")
+    async def get_active(cls, space_id: str, pipe: Pipeline = None) -> Optional['Sprint']:
+        """Récupérer le sprint actif du workspace (PendingResult si pipe est fourni)"""
+        sprint = identity.get(cls, ("active", space_id))
+        if sprint is not None:
+            return identity.cached(sprint, pipe)
+        query = prepared("sprint.get_active", """
             SELECT * FROM sprints
             WHERE space_id = %s AND status = 'ACTIVE'
             ORDER BY start_date DESC
             LIMIT 1
-        """
-        result = await execute_one(query, (space_id,))
-        return cls(**result) if result else None
+        """)
+        
+        def _from_row(row: dict | None) -> Optional['Sprint']:
+            return identity.add(cls(**row), ("active", space_id)) if row else None
+        
+        if pipe is not None:
+            return pipe.execute_one(query, (space_id,), transform=_from_row)
+        return _from_row(await execute_one(query, (space_id,)))
     
     @classmethod
+    @routed("space_id")
     async def create(
         cls,
         space_id: str,
@@ -63,19 +81,43 @@ class Sprint:
     ) -> str:
         """Créer un nouveau sprint"""
         sprint_id = generate_cuid()
-        query = """
+        query = prepared("sprint.create", """
             INSERT INTO sprints (id, space_id, name, start_date, end_date, goal, status)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
             RETURNING id
-        """
-        return await execute_write(
+        """)
+        sprint_id = await execute_write(
             query,
             (sprint_id, space_id, name, start_date, end_date, goal, status)
         )
+        identity.evict(Sprint, ("active", space_id))
+        return sprint_id
     
+    @routed("self.space_id")
     async def get_tasks(self) -> list[dict]:
-        """Récupérer toutes les tâches du sprint avec infos"""
-        query = """
+        """Récupérer toutes les tâches du sprint avec infos (tables d'archive si le sprint est archivé)"""
+        if self.archived_at is not None:
+            query = prepared("sprint.get_tasks.archived", """
+                SELECT 
+                    t.*,
+                    sbi.story_points,
+                    bi.title as backlog_title,
+                    bi.sequence_number,
+                    assignee.name as assignee_name,
+                    ct.column_id,
+                    ct.position,
+                    c.name as column_name
+                FROM tasks_archive t
+                JOIN sprint_backlog_items_archive sbi ON t.sprint_backlog_item_id = sbi.id
+                JOIN backlog_items bi ON sbi.backlog_item_id = bi.id
+                LEFT JOIN users assignee ON t.assignee_id = assignee.id
+                LEFT JOIN columns_tasks_archive ct ON t.id = ct.task_id
+                LEFT JOIN columns_archive c ON ct.column_id = c.id
+                WHERE sbi.sprint_id = %s
+                ORDER BY c.position ASC, ct.rank ASC, t.id
+            """)
+            return await execute_query(query, (self.id,))
+        query = prepared("sprint.get_tasks", """
             SELECT 
                 t.*,
                 sbi.story_points,
@@ -92,28 +134,35 @@ class Sprint:
             LEFT JOIN columns_tasks ct ON t.id = ct.task_id
             LEFT JOIN columns c ON ct.column_id = c.id
             WHERE sbi.sprint_id = %s
-            ORDER BY c.position ASC, ct.position ASC
-        """
+            ORDER BY c.position ASC, ct.rank ASC, t.id
+        """)
         return await execute_query(query, (self.id,))
     
+    @routed("self.space_id")
     async def update_status(self, status: str) -> None:
         """Changer le statut du sprint"""
-        query = "UPDATE sprints SET status = %s WHERE id = %s"
+        query = prepared("sprint.update_status", "UPDATE sprints SET status = %s WHERE id = %s")
         await execute_write(query, (status, self.id), returning=False)
+        identity.evict(Sprint, self.id)
     
+    @routed("self.space_id")
     async def get_backlog_items(self) -> list[dict]:
-        """Récupérer les items du Sprint Backlog avec leurs story points"""
-        query = """
-            SELECT 
-                sbi.*,
-                bi.title,
-                bi.sequence_number,
-                bi.description,
-                assignee.name as assignee_name
-            FROM sprint_backlog_items sbi
-            JOIN backlog_items bi ON sbi.backlog_item_id = bi.id
-            LEFT JOIN users assignee ON bi.assignee_id = assignee.id
-            WHERE sbi.sprint_id = %s
-            ORDER BY sbi.position ASC
-        """
-        return await execute_query(query, (self.id,))
+        """Récupérer les items du Sprint Backlog avec leurs story points (archivés compris)"""
+        if self.archived_at is not None:
+            query = prepared("sprint.get_backlog_items.archived", """
+                SELECT 
+                    sbi.*,
+                    bi.title,
+                    bi.sequence_number,
+                    bi.description,
+                    assignee.name as assignee_name
+                FROM sprint_backlog_items_archive sbi
+                JOIN backlog_items bi ON sbi.backlog_item_id = bi.id
+                LEFT JOIN users assignee ON bi.assignee_id = assignee.id
+                WHERE sbi.sprint_id = %s
+                ORDER BY sbi.rank ASC, sbi.id
+            """)
+            return await execute_query(query, (self.id,))
+        # Pages keyset du sprint backlog : index (sprint_id, rank, id), sans tri en mémoire
+        from db.tables.sprint_backlog_item import SprintBacklogItem
+        return await SprintBacklogItem.get_by_sprint(self.id)
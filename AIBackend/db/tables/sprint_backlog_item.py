@@ -3,99 +3,180 @@ Modèle SprintBacklogItem - Items sélectionnés pour un sprint (SCRUM)
 """
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from db.connection import execute_query, execute_one, execute_write
+from db.connection import execute_query, execute_one, execute_write, routed, snapshot
+from db.cursors import MAX_PAGE_SIZE, decode_keyset, page_size, paginate
+from db.ranking import rank_at
+from db.statements import prepared
 
 
-@dataclass
+@dataclass(slots=True)
 class SprintBacklogItem:
     """Item du Sprint Backlog"""
     id: str
     sprint_id: str
     backlog_item_id: str
-    position: int
+    position: int  # Obsolète (plus écrit, 0) : l'ordre du sprint backlog est donné par rank
     story_points: Optional[int] = None
+    rank: Optional[str] = None  # Rang fractionnaire : ordre réel du sprint backlog (db/ranking.py)
     added_at: datetime = None
     
     @classmethod
+    @routed("item_id", "sprint_backlog_items")
     async def find_by_id(cls, item_id: str) -> Optional['SprintBacklogItem']:
         """Récupérer un sprint backlog item par ID"""
-        query = "SELECT * FROM sprint_backlog_items WHERE id = %s"
+        query = prepared("sprint_backlog_item.find_by_id", "SELECT * FROM sprint_backlog_items WHERE id = %s")
         result = await execute_one(query, (item_id,))
         return cls(**result) if result else None
     
     @classmethod
+    @routed("sprint_id", "sprints")
     async def get_by_sprint(cls, sprint_id: str) -> list[dict]:
         """Récupérer tous les items du sprint backlog avec infos complètes"""
-        query = """
-            SELECT 
-                sbi.*,
-                bi.title,
-                bi.description,
-                bi.sequence_number,
-                bi.assignee_id,
-                assignee.name as assignee_name,
-                creator.name as created_by_name
-            FROM sprint_backlog_items sbi
-            JOIN backlog_items bi ON sbi.backlog_item_id = bi.id
-            LEFT JOIN users assignee ON bi.assignee_id = assignee.id
-            LEFT JOIN users creator ON bi.created_by_id = creator.id
-            WHERE sbi.sprint_id = %s
-            ORDER BY sbi.position ASC
+        return [row async for row in cls.iter_by_sprint(sprint_id)]
+    
+    @classmethod
+    @routed("sprint_id", "sprints")
+    async def iter_by_sprint(cls, sprint_id: str, fetch_size: int = None) -> AsyncIterator[dict]:
+        """
+        Comme get_by_sprint, page par page (mémoire constante)
+        Pages de get_page_by_sprint lues dans un même instantané : chaque page suit
+        l'index (sprint_id, rank, id), sans tri en mémoire.
+        """
+        cursor = None
+        async with snapshot():
+            while True:
+                rows, cursor = await cls.get_page_by_sprint(sprint_id, fetch_size or MAX_PAGE_SIZE, cursor)
+                for row in rows:
+                    yield row
+                if cursor is None:
+                    return
+    
+    @classmethod
+    @routed("sprint_id", "sprints")
+    async def get_page_by_sprint(
+        cls,
+        sprint_id: str,
+        limit: int = None,
+        cursor: str = None
+    ) -> tuple[list[dict], Optional[str]]:
         """
-        return await execute_query(query, (sprint_id,))
+        Une page du sprint backlog (pagination keyset sur (rank, id), sans OFFSET)
+        
+        Returns:
+            (items, curseur de la page suivante ou None)
+        
+        Raises:
+            ValueError: si le curseur est invalide
+        """
+        limit = page_size(limit)
+        if cursor is None:
+            query = prepared("sprint_backlog_item.get_page_by_sprint", """
+                SELECT 
+                    sbi.*,
+                    bi.title,
+                    bi.description,
+                    bi.sequence_number,
+                    bi.assignee_id,
+                    assignee.name as assignee_name,
+                    creator.name as created_by_name
+                FROM sprint_backlog_items sbi
+                JOIN backlog_items bi ON sbi.backlog_item_id = bi.id
+                LEFT JOIN users assignee ON bi.assignee_id = assignee.id
+                LEFT JOIN users creator ON bi.created_by_id = creator.id
+                WHERE sbi.sprint_id = %s
+                ORDER BY sbi.rank ASC, sbi.id
+                LIMIT %s
+            """)
+            params = (sprint_id, limit + 1)
+        else:
+            query = prepared("sprint_backlog_item.get_page_by_sprint.after", """
+                SELECT 
+                    sbi.*,
+                    bi.title,
+                    bi.description,
+                    bi.sequence_number,
+                    bi.assignee_id,
+                    assignee.name as assignee_name,
+                    creator.name as created_by_name
+                FROM sprint_backlog_items sbi
+                JOIN backlog_items bi ON sbi.backlog_item_id = bi.id
+                LEFT JOIN users assignee ON bi.assignee_id = assignee.id
+                LEFT JOIN users creator ON bi.created_by_id = creator.id
+                WHERE sbi.sprint_id = %s
+                  AND (sbi.rank, sbi.id) > (%s, %s)
+                ORDER BY sbi.rank ASC, sbi.id
+                LIMIT %s
+            """)
+            params = (sprint_id, *decode_keyset(cursor, 2), limit + 1)
+        rows = await execute_query(query, params)
+        return paginate(rows, limit, "rank", "id")
     
     @classmethod
+    @routed("backlog_item_id", "backlog_items")
     async def get_by_backlog_item(cls, backlog_item_id: str) -> list['SprintBacklogItem']:
         """Récupérer tous les sprints où cet item a été utilisé"""
-        query = """
+        query = prepared("sprint_backlog_item.get_by_backlog_item", """
             SELECT * FROM sprint_backlog_items
             WHERE backlog_item_id = %s
             ORDER BY added_at DESC
-        """
+        """)
         results = await execute_query(query, (backlog_item_id,))
         return [cls(**row) for row in results]
     
     @classmethod
+    @routed("sprint_id", "sprints")
     async def add_to_sprint(
         cls,
         sprint_id: str,
         backlog_item_id: str,
         story_points: int = None,
-        position: int = 0
+        position: int = None
     ) -> str:
-        """Ajouter un item du Product Backlog au Sprint Backlog"""
-        query = """
-            INSERT INTO sprint_backlog_items (sprint_id, backlog_item_id, story_points, position)
+        """Ajouter un item du Product Backlog au Sprint Backlog (position: 0 = en tête, None = à la fin)"""
+        rank = await rank_at("sprint_backlog_items", sprint_id, position)
+        query = prepared("sprint_backlog_item.add_to_sprint", """
+            INSERT INTO sprint_backlog_items (sprint_id, backlog_item_id, story_points, rank)
             VALUES (%s, %s, %s, %s)
             RETURNING id
-        """
-        return await execute_write(query, (sprint_id, backlog_item_id, story_points, position))
+        """)
+        return await execute_write(query, (sprint_id, backlog_item_id, story_points, rank))
     
     @classmethod
+    @routed("sprint_id", "sprints")
     async def is_in_sprint(cls, sprint_id: str, backlog_item_id: str) -> bool:
         """Vérifier si un item est déjà dans le sprint"""
-        query = """
+        query = prepared("sprint_backlog_item.is_in_sprint", """
             SELECT id FROM sprint_backlog_items
             WHERE sprint_id = %s AND backlog_item_id = %s
-        """
+        """)
         result = await execute_one(query, (sprint_id, backlog_item_id))
         return result is not None
     
+    @routed("self.sprint_id", "sprints")
     async def update_story_points(self, story_points: int) -> None:
         """Mettre à jour l'estimation en story points"""
-        query = "UPDATE sprint_backlog_items SET story_points = %s WHERE id = %s"
+        query = prepared(
+            "sprint_backlog_item.update_story_points",
+            "UPDATE sprint_backlog_items SET story_points = %s WHERE id = %s"
+        )
         await execute_write(query, (story_points, self.id), returning=False)
     
+    @routed("self.sprint_id", "sprints")
     async def update_position(self, position: int) -> None:
-        """Mettre à jour la position dans le sprint backlog"""
-        query = "UPDATE sprint_backlog_items SET position = %s WHERE id = %s"
-        await execute_write(query, (position, self.id), returning=False)
+        """Mettre à jour la position dans le sprint backlog (0 = en tête) : seul le rang de l'item est réécrit"""
+        rank = await rank_at("sprint_backlog_items", self.sprint_id, position, exclude_id=self.id)
+        query = prepared(
+            "sprint_backlog_item.update_position",
+            "UPDATE sprint_backlog_items SET rank = %s WHERE id = %s"
+        )
+        await execute_write(query, (rank, self.id), returning=False)
     
+    @routed("self.sprint_id", "sprints")
     async def get_tasks(self) -> list[dict]:
         """Récupérer toutes les tâches créées pour cet item de sprint"""
-        query = """
+        query = prepared("sprint_backlog_item.get_tasks", """
             SELECT 
                 t.*,
                 assignee.name as assignee_name,
@@ -107,16 +188,17 @@ class SprintBacklogItem:
             LEFT JOIN columns_tasks ct ON t.id = ct.task_id
             LEFT JOIN columns c ON ct.column_id = c.id
             WHERE t.sprint_backlog_item_id = %s
-            ORDER BY c.position ASC, ct.position ASC
-        """
+            ORDER BY c.position ASC, ct.rank ASC, t.id
+        """)
         return await execute_query(query, (self.id,))
     
+    @routed("sprint_id", "sprints")
     async def get_total_story_points_for_sprint(sprint_id: str) -> int:
         """Calculer le total des story points pour un sprint"""
-        query = """
+        query = prepared("sprint_backlog_item.get_total_story_points_for_sprint", """
             SELECT COALESCE(SUM(story_points), 0) as total
             FROM sprint_backlog_items
             WHERE sprint_id = %s
-        """
+        """)
         result = await execute_one(query, (sprint_id,))
         return result['total'] if result else 0
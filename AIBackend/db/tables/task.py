@@ -3,13 +3,90 @@ Modèle Task - Tâches kanban liées au backlog
 """
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from db.connection import execute_query, execute_one, execute_write
+from db.connection import (
+    Pipeline, execute_query, execute_one, execute_write, pipeline, routed, stream_query, transaction
+)
+from db.ranking import GROUP_LOCK_QUERY, group_lock_key, rank_at
+from db.rows import row_type
+from db.tables.column import column_task_cursor
+from db.statements import prepared
+from db.tables import identity
 from utils import generate_cuid
 
 
-@dataclass
+# Tâches d'un sprint (partagé par get_by_sprint et iter_by_sprint)
+_GET_BY_SPRINT_QUERY = prepared("task.get_by_sprint", """
+    SELECT 
+        t.*,
+        sbi.story_points,
+        bi.title,
+        bi.sequence_number,
+        bi.description,
+        assignee.name as assignee_name,
+        ct.column_id,
+        ct.position,
+        ct.rank,
+        ct.moved_at,
+        c.name as column_name
+    FROM tasks t
+    JOIN sprint_backlog_items sbi ON t.sprint_backlog_item_id = sbi.id
+    JOIN backlog_items bi ON sbi.backlog_item_id = bi.id
+    LEFT JOIN users assignee ON t.assignee_id = assignee.id
+    LEFT JOIN columns_tasks ct ON t.id = ct.task_id
+    LEFT JOIN columns c ON ct.column_id = c.id
+    WHERE sbi.sprint_id = %s
+    ORDER BY c.position ASC, ct.rank ASC, ct.task_id
+""")
+
+# Colonnes des requêtes de board : d'abord la colonne (SELECT * FROM columns),
+# puis la tâche, renommée comme dans l'ancien format {column, tasks}
+_COLUMN_FIELDS = ("id", "space_id", "sprint_id", "name", "wip_limit", "position", "task_count", "created_at")
+_KANBAN_TASK_FIELDS = (
+    "position", "rank", "moved_at", "id", "assignee_id", "backlog_item_id", "sprint_backlog_item_id",
+    "created_at", "title", "sequence_number", "description", "assignee_name",
+)
+_SPRINT_TASK_FIELDS = _KANBAN_TASK_FIELDS + ("story_points",)
+
+
+def _build_board(rows: list, task_fields: tuple[str, ...], summary: bool = False) -> dict:
+    """
+    Regrouper les lignes (colonne, tâche) triées par colonne en
+    {nom: {column, tasks, total, cursor}}
+    
+    total : compteur de la colonne (columns.task_count) en mode résumé,
+    nombre de tâches chargées sinon.
+    """
+    column_type = row_type(_COLUMN_FIELDS)
+    task_type = row_type(task_fields)
+    width = len(_COLUMN_FIELDS)
+    board = {}
+    current_id = None
+    entry = None
+    for row in rows:
+        if row['id'] != current_id:
+            current_id = row['id']
+            entry = board[row['name']] = {
+                'column': column_type._make(row[:width]),
+                'tasks': [],
+                'total': row['task_count'] if summary else 0,
+                'cursor': None,
+            }
+        if row['task_id'] is not None:  # Colonne vide : une ligne sans tâche
+            entry['tasks'].append(task_type._make(row[width:]))
+    for entry in board.values():
+        if not summary:
+            entry['total'] = len(entry['tasks'])
+        elif entry['tasks'] and entry['total'] > len(entry['tasks']):
+            # Suite de la colonne : reprendre après la dernière tâche renvoyée
+            entry['cursor'] = column_task_cursor(entry['column']['id'], entry['tasks'][-1])
+    return board
+
+
+
+
+@dataclass(slots=True)
 class Task:
     """Tâche kanban"""
     id: str
@@ -19,134 +96,200 @@ class Task:
     created_at: datetime = None
     
     @classmethod
-    async def find_by_id(cls, task_id: str) -> Optional['Task']:
-        """Récupérer une tâche par ID"""
-        query = "SELECT * FROM tasks WHERE id = %s"
+    def _from_row(cls, row: dict | None) -> Optional['Task']:
+        return identity.add(cls(**row)) if row else None
+    
+    @classmethod
+    @routed("task_id", "tasks")
+    async def find_by_id(cls, task_id: str, pipe: Pipeline = None) -> Optional['Task']:
+        """Récupérer une tâche par ID (PendingResult si pipe est fourni)"""
+        task = identity.get(cls, task_id)
+        if task is not None:
+            return identity.cached(task, pipe)
+        query = prepared("task.find_by_id", "SELECT * FROM tasks WHERE id = %s")
+        if pipe is not None:
+            return pipe.execute_one(query, (task_id,), transform=cls._from_row)
         result = await execute_one(query, (task_id,))
-        return cls(**result) if result else None
+        return cls._from_row(result)
     
     @classmethod
+    @routed("backlog_item_id", "backlog_items")
     async def get_by_backlog_item(cls, backlog_item_id: str) -> list['Task']:
         """Récupérer toutes les tâches d'un item du backlog"""
-        query = """
+        query = prepared("task.get_by_backlog_item", """
             SELECT * FROM tasks
             WHERE backlog_item_id = %s
-        """
+        """)
         results = await execute_query(query, (backlog_item_id,))
         return [cls(**row) for row in results]
     
     @classmethod
+    @routed("sprint_id", "sprints")
     async def get_by_sprint(cls, sprint_id: str) -> list[dict]:
         """Récupérer toutes les tâches d'un sprint avec infos complètes"""
-        query = """
-            SELECT 
-                t.*,
-                sbi.story_points,
-                bi.title,
-                bi.sequence_number,
-                bi.description,
-                assignee.name as assignee_name,
-                ct.column_id,
-                ct.position,
-                ct.moved_at,
-                c.name as column_name
-            FROM tasks t
-            JOIN sprint_backlog_items sbi ON t.sprint_backlog_item_id = sbi.id
-            JOIN backlog_items bi ON sbi.backlog_item_id = bi.id
-            LEFT JOIN users assignee ON t.assignee_id = assignee.id
-            LEFT JOIN columns_tasks ct ON t.id = ct.task_id
-            LEFT JOIN columns c ON ct.column_id = c.id
-            WHERE sbi.sprint_id = %s
-            ORDER BY c.position ASC, ct.position ASC
-        """
-        return await execute_query(query, (sprint_id,))
+        return await execute_query(_GET_BY_SPRINT_QUERY, (sprint_id,))
     
     @classmethod
-    async def get_kanban_board(cls, space_id: str) -> dict:
-        """Récupérer le board kanban complet avec colonnes (KANBAN mode)"""
-        # Récupérer toutes les colonnes du space
-        columns_query = """
-            SELECT * FROM columns
-            WHERE space_id = %s
-            ORDER BY position ASC
+    @routed("sprint_id", "sprints")
+    async def iter_by_sprint(cls, sprint_id: str, fetch_size: int = None) -> AsyncIterator[dict]:
+        """Comme get_by_sprint, en streaming (mémoire constante)"""
+        async for row in stream_query(_GET_BY_SPRINT_QUERY, (sprint_id,), fetch_size):
+            yield row
+    
+    @classmethod
+    @routed("space_id")
+    async def get_kanban_board(cls, space_id: str, limit: int = None) -> dict:
         """
-        columns = await execute_query(columns_query, (space_id,))
+        Récupérer le board kanban avec colonnes (KANBAN mode), en une seule requête
+        (cartes lues dans le read model board_cards, maintenu par triggers)
+        
+        Args:
+            space_id: ID du workspace
+            limit: Mode résumé : seulement les `limit` premières tâches de chaque
+                   colonne (+ nombre de tâches et curseur de la suite)
         
-        # Pour chaque colonne, récupérer les tâches
-        board = {}
-        for column in columns:
-            tasks_query = """
+        Returns:
+            {nom: {"column", "tasks", "total", "cursor"}} (cursor: None si tout est chargé)
+        """
+        if limit is None:
+            query = prepared("task.get_kanban_board", """
                 SELECT 
-                    ct.position,
-                    ct.moved_at,
-                    t.*,
-                    bi.title,
-                    bi.sequence_number,
-                    bi.description,
-                    assignee.name as assignee_name
-                FROM columns_tasks ct
-                JOIN tasks t ON ct.task_id = t.id
-                JOIN backlog_items bi ON t.backlog_item_id = bi.id
-                LEFT JOIN users assignee ON t.assignee_id = assignee.id
-                WHERE ct.column_id = %s
-                ORDER BY ct.position ASC
-            """
-            tasks = await execute_query(tasks_query, (column['id'],))
-            board[column['name']] = {
-                'column': column,
-                'tasks': tasks
-            }
+                    c.id, c.space_id, c.sprint_id, c.name, c.wip_limit, c.position, c.task_count, c.created_at,
+                    bc.position AS task_position,
+                    bc.rank AS task_rank,
+                    bc.moved_at,
+                    bc.task_id,
+                    bc.assignee_id,
+                    bc.backlog_item_id,
+                    bc.sprint_backlog_item_id,
+                    bc.task_created_at,
+                    bc.title,
+                    bc.sequence_number,
+                    bc.description,
+                    bc.assignee_name
+                FROM columns c
+                LEFT JOIN board_cards bc ON bc.column_id = c.id
+                WHERE c.space_id = %s
+                ORDER BY c.position ASC, c.id, bc.rank ASC, bc.task_id
+            """)
+            rows = await execute_query(query, (space_id,))
+            return _build_board(rows, _KANBAN_TASK_FIELDS)
         
-        return board
+        # Top-N par colonne (LATERAL ... LIMIT sur l'index (column_id, rank, task_id) de board_cards),
+        # nombre de tâches lu dans le compteur de la colonne
+        query = prepared("task.get_kanban_board.summary", """
+            SELECT 
+                c.id, c.space_id, c.sprint_id, c.name, c.wip_limit, c.position, c.task_count, c.created_at,
+                tk.*
+            FROM columns c
+            LEFT JOIN LATERAL (
+                SELECT 
+                    bc.position AS task_position,
+                    bc.rank AS task_rank,
+                    bc.moved_at,
+                    bc.task_id,
+                    bc.assignee_id,
+                    bc.backlog_item_id,
+                    bc.sprint_backlog_item_id,
+                    bc.task_created_at,
+                    bc.title,
+                    bc.sequence_number,
+                    bc.description,
+                    bc.assignee_name
+                FROM board_cards bc
+                WHERE bc.column_id = c.id
+                ORDER BY bc.rank ASC, bc.task_id
+                LIMIT %s
+            ) tk ON true
+            WHERE c.space_id = %s
+            ORDER BY c.position ASC, c.id, tk.task_rank ASC, tk.task_id
+        """)
+        rows = await execute_query(query, (limit, space_id))
+        return _build_board(rows, _KANBAN_TASK_FIELDS, summary=True)
     
     @classmethod
-    async def get_sprint_board(cls, sprint_id: str) -> dict:
-        """Récupérer le board kanban d'un sprint avec colonnes (SCRUM mode)"""
-        # Récupérer toutes les colonnes du sprint
-        columns_query = """
-            SELECT * FROM columns
-            WHERE sprint_id = %s
-            ORDER BY position ASC
+    @routed("sprint_id", "sprints")
+    async def get_sprint_board(cls, sprint_id: str, limit: int = None) -> dict:
         """
-        columns = await execute_query(columns_query, (sprint_id,))
+        Récupérer le board kanban d'un sprint avec colonnes (SCRUM mode), en une seule requête
+        
+        Args:
+            sprint_id: ID du sprint
+            limit: Mode résumé (voir get_kanban_board)
         
-        # Pour chaque colonne, récupérer les tâches
-        board = {}
-        for column in columns:
-            tasks_query = """
+        Returns:
+            {nom: {"column", "tasks", "total", "cursor"}}
+        """
+        if limit is None:
+            query = prepared("task.get_sprint_board", """
                 SELECT 
-                    ct.position,
-                    ct.moved_at,
-                    t.*,
-                    bi.title,
-                    sbi.story_points,
-                    bi.sequence_number,
-                    bi.description,
-                    assignee.name as assignee_name
-                FROM columns_tasks ct
-                JOIN tasks t ON ct.task_id = t.id
-                JOIN sprint_backlog_items sbi ON t.sprint_backlog_item_id = sbi.id
-                JOIN backlog_items bi ON sbi.backlog_item_id = bi.id
-                LEFT JOIN users assignee ON t.assignee_id = assignee.id
-                WHERE ct.column_id = %s
-                ORDER BY ct.position ASC
-            """
-            tasks = await execute_query(tasks_query, (column['id'],))
-            board[column['name']] = {
-                'column': column,
-                'tasks': tasks
-            }
+                    c.id, c.space_id, c.sprint_id, c.name, c.wip_limit, c.position, c.task_count, c.created_at,
+                    bc.position AS task_position,
+                    bc.rank AS task_rank,
+                    bc.moved_at,
+                    bc.task_id,
+                    bc.assignee_id,
+                    bc.backlog_item_id,
+                    bc.sprint_backlog_item_id,
+                    bc.task_created_at,
+                    bc.title,
+                    bc.sequence_number,
+                    bc.description,
+                    bc.assignee_name,
+                    bc.story_points
+                FROM columns c
+                LEFT JOIN board_cards bc ON bc.column_id = c.id
+                WHERE c.sprint_id = %s
+                ORDER BY c.position ASC, c.id, bc.rank ASC, bc.task_id
+            """)
+            rows = await execute_query(query, (sprint_id,))
+            return _build_board(rows, _SPRINT_TASK_FIELDS)
         
-        return board
+        query = prepared("task.get_sprint_board.summary", """
+            SELECT 
+                c.id, c.space_id, c.sprint_id, c.name, c.wip_limit, c.position, c.task_count, c.created_at,
+                tk.*
+            FROM columns c
+            LEFT JOIN LATERAL (
+                SELECT 
+                    bc.position AS task_position,
+                    bc.rank AS task_rank,
+                    bc.moved_at,
+                    bc.task_id,
+                    bc.assignee_id,
+                    bc.backlog_item_id,
+                    bc.sprint_backlog_item_id,
+                    bc.task_created_at,
+                    bc.title,
+                    bc.sequence_number,
+                    bc.description,
+                    bc.assignee_name,
+                    bc.story_points
+                FROM board_cards bc
+                WHERE bc.column_id = c.id
+                ORDER BY bc.rank ASC, bc.task_id
+                LIMIT %s
+            ) tk ON true
+            WHERE c.sprint_id = %s
+            ORDER BY c.position ASC, c.id, tk.task_rank ASC, tk.task_id
+        """)
+        rows = await execute_query(query, (limit, sprint_id))
+        return _build_board(rows, _SPRINT_TASK_FIELDS, summary=True)
     
     @classmethod
+    @routed("backlog_item_id", "backlog_items")
+    @routed("sprint_backlog_item_id", "sprint_backlog_items")
     async def create(
         cls,
         assignee_id: str = None,
         backlog_item_id: str = None,
-        sprint_backlog_item_id: str = None
+        sprint_backlog_item_id: str = None,
+        pipe: Pipeline = None
     ) -> str:
-        """Créer une nouvelle tâche (KANBAN: backlog_item_id, SCRUM: sprint_backlog_item_id)"""
+        """
+        Créer une nouvelle tâche (KANBAN: backlog_item_id, SCRUM: sprint_backlog_item_id)
+        Mise en file si pipe est fourni (l'ID est généré côté client, il est retourné directement)
+        """
         # Validation: au moins un des deux IDs requis
         if not backlog_item_id and not sprint_backlog_item_id:
             raise ValueError("backlog_item_id ou sprint_backlog_item_id requis")
@@ -154,39 +297,123 @@ class Task:
         # Générer un CUID pour l'ID
         task_id = generate_cuid()
         
-        query = """
+        query = prepared("task.create", """
             INSERT INTO tasks (id, backlog_item_id, sprint_backlog_item_id, assignee_id)
             VALUES (%s, %s, %s, %s)
             RETURNING id
+        """)
+        params = (task_id, backlog_item_id, sprint_backlog_item_id, assignee_id)
+        if pipe is not None:
+            pipe.execute_write(query, params)
+            return task_id
+        return await execute_write(query, params)
+    
+    @routed("self.id", "tasks")
+    async def move_to_column(self, column_id: str, position: int = None, pipe: Pipeline = None) -> None:
         """
-        return await execute_write(query, (task_id, backlog_item_id, sprint_backlog_item_id, assignee_id))
+        Déplacer la tâche vers une colonne (drag & drop kanban) - mis en file si pipe est fourni
+        
+        Args:
+            column_id: Colonne cible
+            position: Place dans la colonne (0 = en haut, None = en bas). Avec pipe,
+                      la tâche est ajoutée en bas (rang attribué par le trigger)
+        """
+        # Seul le rang de cette tâche est écrit : les autres tâches de la colonne ne bougent pas
+        rank = None
+        if pipe is None:
+            rank = await rank_at("columns_tasks", column_id, position, exclude_id=self.id)
+        # Upsert sur task_id (UNIQUE) : insertion ou déplacement en un seul aller-retour
+        ct_id = generate_cuid()
+        query = prepared("task.move_to_column", """
+            INSERT INTO columns_tasks (id, column_id, task_id, rank)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (task_id) DO UPDATE
+            SET column_id = EXCLUDED.column_id,
+                rank = EXCLUDED.rank,
+                moved_at = CURRENT_TIMESTAMP
+        """)
+        params = (ct_id, column_id, self.id, rank)
+        if pipe is not None:
+            pipe.execute_write(query, params, returning=False)
+            return
+        await execute_write(query, params, returning=False)
     
-    async def move_to_column(self, column_id: str, position: int = 0) -> None:
-        """Déplacer la tâche vers une colonne (drag & drop kanban)"""
-        # Vérifier si la tâche existe déjà dans columns_tasks
-        check_query = "SELECT id FROM columns_tasks WHERE task_id = %s"
-        existing = await execute_one(check_query, (self.id,))
+    @routed("self.id", "tasks")
+    async def move(self, column_id: str, position: int = None) -> Optional[dict]:
+        """
+        Déplacer la tâche en respectant la limite WIP de la colonne cible
+        
+        Les déplacements vers une même colonne sont sérialisés par un verrou
+        consultatif (pg_advisory_xact_lock) : la lecture du compteur, le calcul du
+        rang et l'upsert se font après le verrou, dans la même transaction, sans
+        dépassement ni rang en double concurrents. En bas : un aller-retour ;
+        à une position : trois (verrou, voisines, upsert).
         
-        if existing:
-            # Mettre à jour la colonne et la position
-            update_query = """
-                UPDATE columns_tasks
-                SET column_id = %s, position = %s, moved_at = CURRENT_TIMESTAMP
-                WHERE task_id = %s
-            """
-            await execute_write(update_query, (column_id, position, self.id), returning=False)
-        else:
-            # Créer l'entrée avec un ID CUID
-            ct_id = generate_cuid()
-            insert_query = """
-                INSERT INTO columns_tasks (id, column_id, task_id, position)
-                VALUES (%s, %s, %s, %s)
-            """
-            await execute_write(insert_query, (ct_id, column_id, self.id, position), returning=False)
+        Args:
+            column_id: Colonne cible
+            position: Place dans la colonne (0 = en haut, None = en bas)
+        
+        Returns:
+            {"moved", "count", "wip_limit"} : moved=False si la limite WIP est atteinte,
+            count = occupation de la colonne après l'opération ; None si la colonne n'existe pas
+        """
+        # Verrou par colonne (partagé avec le rééquilibrage), relâché au commit ;
+        # la requête suivante voit les déplacements commités
+        lock_params = (group_lock_key("columns_tasks", column_id),)
+        query = prepared("task.move", """
+            WITH target AS (
+                SELECT
+                    c.wip_limit,
+                    -- Compteur maintenu par trigger, sans la tâche si elle est déjà dans la colonne
+                    c.task_count - (
+                        SELECT COUNT(*) FROM columns_tasks
+                        WHERE column_id = c.id AND task_id = %s
+                    ) AS occupancy
+                FROM columns c
+                WHERE c.id = %s
+            ), moved AS (
+                INSERT INTO columns_tasks (id, column_id, task_id, rank)
+                SELECT %s, %s, %s, COALESCE(%s, rank_after((
+                    SELECT MAX(rank) FROM columns_tasks WHERE column_id = %s AND task_id <> %s
+                )))
+                FROM target
+                WHERE target.wip_limit IS NULL OR target.occupancy < target.wip_limit
+                ON CONFLICT (task_id) DO UPDATE
+                SET column_id = EXCLUDED.column_id,
+                    rank = EXCLUDED.rank,
+                    moved_at = CURRENT_TIMESTAMP
+                RETURNING 1
+            )
+            SELECT
+                EXISTS (SELECT 1 FROM moved) AS moved,
+                target.occupancy + (SELECT COUNT(*) FROM moved) AS count,
+                target.wip_limit
+            FROM target
+        """)
+
+        def params(rank: Optional[str]) -> tuple:
+            return (
+                self.id, column_id,
+                generate_cuid(), column_id, self.id, rank, column_id, self.id
+            )
+
+        if position is None:
+            # En bas : rang calculé dans la requête (rank_after), après le verrou
+            async with pipeline() as pipe:
+                pipe.execute_write(GROUP_LOCK_QUERY, lock_params, returning=False)
+                pending = pipe.execute_one(query, params(None))
+            return pending.result()
+        # À une position : voisines lues après le verrou, dans la même transaction
+        async with transaction() as uow:
+            await uow.acquire()
+            await execute_write(GROUP_LOCK_QUERY, lock_params, returning=False)
+            rank = await rank_at("columns_tasks", column_id, position, exclude_id=self.id)
+            return await execute_one(query, params(rank))
     
+    @routed("self.id", "tasks")
     async def get_column(self) -> Optional[dict]:
         """Récupérer la colonne actuelle de la tâche"""
-        query = """
+        query = prepared("task.get_column", """
             SELECT 
                 c.*,
                 ct.position,
@@ -194,11 +421,13 @@ class Task:
             FROM columns_tasks ct
             JOIN columns c ON ct.column_id = c.id
             WHERE ct.task_id = %s
-        """
+        """)
         return await execute_one(query, (self.id,))
     
+    @routed("self.id", "tasks")
     async def assign(self, assignee_id: str) -> None:
         """Assigner la tâche à un utilisateur"""
-        query = "UPDATE tasks SET assignee_id = %s WHERE id = %s"
+        query = prepared("task.assign", "UPDATE tasks SET assignee_id = %s WHERE id = %s")
         await execute_write(query, (assignee_id, self.id), returning=False)
+        identity.evict(Task, self.id)
 
@@ -1,15 +1,40 @@
 """
 Modèle User - Gestion des utilisateurs
 """
+import asyncio
+import contextvars
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from db.connection import execute_query, execute_one, execute_write
+from db.connection import (
+    db, execute_many, execute_query, execute_one, execute_write, on_shard, routed, stream_query
+)
+from db.cursors import decode_keyset, page_size, paginate
+from db.statements import prepared
+from db.tables import identity
 from utils import generate_cuid
 
 
-@dataclass
+# Tous les utilisateurs (partagé par get_all et iter_all)
+_GET_ALL_QUERY = prepared("user.get_all", "SELECT * FROM users ORDER BY created_at DESC")
+
+# Copie d'un utilisateur sur un shard (réécrite seulement si elle a changé)
+_REPLICATE_QUERY = prepared("user.replicate", """
+    INSERT INTO users (id, email, password_hash, name, role, avatar_url, created_at)
+    VALUES (%s, %s, %s, %s, %s::"UserRole", %s, %s)
+    ON CONFLICT (id) DO UPDATE
+    SET email = EXCLUDED.email,
+        password_hash = EXCLUDED.password_hash,
+        name = EXCLUDED.name,
+        role = EXCLUDED.role,
+        avatar_url = EXCLUDED.avatar_url
+    WHERE (users.email, users.password_hash, users.name, users.role, users.avatar_url)
+          IS DISTINCT FROM (EXCLUDED.email, EXCLUDED.password_hash, EXCLUDED.name, EXCLUDED.role, EXCLUDED.avatar_url)
+""")
+
+
+@dataclass(slots=True)
 class User:
     """Modèle utilisateur"""
     id: str
@@ -22,31 +47,169 @@ class User:
     @classmethod
     async def find_by_id(cls, user_id: str) -> Optional['User']:
         """Récupérer un utilisateur par ID"""
-        query = "SELECT * FROM users WHERE id = %s"
+        user = identity.get(cls, user_id)
+        if user is not None:
+            return user
+        query = prepared("user.find_by_id", "SELECT * FROM users WHERE id = %s")
         result = await execute_one(query, (user_id,))
-        return cls(**result) if result else None
+        return identity.add(cls(**result)) if result else None
     
     @classmethod
     async def find_by_email(cls, email: str) -> Optional['User']:
         """Récupérer un utilisateur par email"""
-        query = "SELECT * FROM users WHERE email = %s"
+        query = prepared("user.find_by_email", "SELECT * FROM users WHERE email = %s")
         result = await execute_one(query, (email,))
         return cls(**result) if result else None
     
     @classmethod
     async def create(cls, email: str, password_hash: str, name: str, role: str = 'USER') -> str:
-        """Créer un nouvel utilisateur"""
+        """
+        Créer un nouvel utilisateur (base par défaut), copié aussitôt sur chaque shard
+        
+        Dans une transaction() annulée ensuite, les copies déjà écrites sur les
+        shards restent (sans effet : aucun workspace ne les référence).
+        """
         user_id = generate_cuid()
-        query = """
+        query = prepared("user.create", """
             INSERT INTO users (id, email, password_hash, name, role)
             VALUES (%s, %s, %s, %s, %s)
             RETURNING id
+        """)
+        async with on_shard(None):
+            user_id = await execute_write(query, (user_id, email, password_hash, name, role))
+        await cls.replicate([user_id])
+        return user_id
+    
+    @classmethod
+    async def replicate(cls, user_ids: list[str] = None) -> int:
+        """
+        Copier les utilisateurs de la base par défaut sur chaque shard : `users` est
+        une table de référence (membres, propriétaires, assignés des workspaces d'un
+        shard y ont une clé étrangère). Upsert idempotent ; sans `user_ids`, tous les
+        utilisateurs (rattrapage de ceux créés par le backend Node).
+        Les utilisateurs supprimés de la base par défaut ne sont pas retirés des shards.
+        
+        Returns:
+            Nombre d'utilisateurs copiés par shard (0 sans shards)
         """
-        return await execute_write(query, (user_id, email, password_hash, name, role))
+        shards = db.shard_names()[1:]
+        if not shards:
+            return 0
+        async with on_shard(None):
+            if user_ids is None:
+                rows = await execute_query(_GET_ALL_QUERY)
+            else:
+                query = prepared("user.find_many", "SELECT * FROM users WHERE id = ANY(%s)")
+                rows = await execute_query(query, (user_ids,))
+        if not rows:
+            return 0
+        params = [
+            (row['id'], row['email'], row['password_hash'], row['name'], row['role'], row['avatar_url'], row['created_at'])
+            for row in rows
+        ]
+
+        async def copy_to(shard: str) -> None:
+            async with on_shard(shard):
+                await execute_many(_REPLICATE_QUERY, params)
+
+        # Contexte vide : chaque shard commite seul, hors de la transaction() en cours
+        await asyncio.gather(*(
+            asyncio.create_task(copy_to(shard), context=contextvars.Context()) for shard in shards
+        ))
+        return len(rows)
     
     @classmethod
     async def get_all(cls) -> list['User']:
         """Récupérer tous les utilisateurs"""
-        query = "SELECT * FROM users ORDER BY created_at DESC"
-        results = await execute_query(query)
+        results = await execute_query(_GET_ALL_QUERY)
         return [cls(**row) for row in results]
+    
+    @classmethod
+    async def iter_all(cls, fetch_size: int = None) -> AsyncIterator['User']:
+        """Comme get_all, en streaming (mémoire constante)"""
+        async for row in stream_query(_GET_ALL_QUERY, fetch_size=fetch_size):
+            yield cls(**row)
+    
+    @classmethod
+    async def get_page(cls, limit: int = None, cursor: str = None) -> tuple[list['User'], Optional[str]]:
+        """
+        Une page des utilisateurs, du plus récent au plus ancien
+        (pagination keyset sur (created_at, id), sans OFFSET)
+        
+        Raises:
+            ValueError: si le curseur est invalide
+        """
+        limit = page_size(limit)
+        if cursor is None:
+            query = prepared("user.get_page", """
+                SELECT * FROM users
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+            """)
+            params = (limit + 1,)
+        else:
+            query = prepared("user.get_page.after", """
+                SELECT * FROM users
+                WHERE (created_at, id) < (%s, %s)
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+            """)
+            params = (*decode_keyset(cursor, 2), limit + 1)
+        rows, next_cursor = paginate(await execute_query(query, params), limit, "created_at", "id")
+        return [cls(**row) for row in rows], next_cursor
+    
+    @classmethod
+    @routed("space_id")
+    async def get_directory_page(
+        cls,
+        space_id: str = None,
+        limit: int = None,
+        cursor: str = None
+    ) -> tuple[list[dict], Optional[str]]:
+        """
+        Annuaire (id, name, email) par ordre alphabétique, éventuellement limité aux
+        membres d'un workspace (pagination keyset sur (name, id), sans OFFSET)
+        
+        Raises:
+            ValueError: si le curseur est invalide
+        """
+        limit = page_size(limit, default=100)
+        after = decode_keyset(cursor, 2) if cursor is not None else None
+        if space_id is not None:
+            if after is None:
+                query = prepared("user.get_directory_page.space", """
+                    SELECT u.id, u.name, u.email
+                    FROM users u
+                    INNER JOIN space_members sm ON u.id = sm.user_id
+                    WHERE sm.space_id = %s
+                    ORDER BY u.name, u.id
+                    LIMIT %s
+                """)
+                params = (space_id, limit + 1)
+            else:
+                query = prepared("user.get_directory_page.space.after", """
+                    SELECT u.id, u.name, u.email
+                    FROM users u
+                    INNER JOIN space_members sm ON u.id = sm.user_id
+                    WHERE sm.space_id = %s
+                      AND (u.name, u.id) > (%s, %s)
+                    ORDER BY u.name, u.id
+                    LIMIT %s
+                """)
+                params = (space_id, *after, limit + 1)
+        elif after is None:
+            query = prepared("user.get_directory_page", """
+                SELECT id, name, email FROM users
+                ORDER BY name, id
+                LIMIT %s
+            """)
+            params = (limit + 1,)
+        else:
+            query = prepared("user.get_directory_page.after", """
+                SELECT id, name, email FROM users
+                WHERE (name, id) > (%s, %s)
+                ORDER BY name, id
+                LIMIT %s
+            """)
+            params = (*after, limit + 1)
+        return paginate(await execute_query(query, params), limit, "name", "id")
@@ -6,10 +6,15 @@ import logging
 import sys
 import os
 from typing import Any
-from dotenv import load_dotenv
 
-# Charger les variables d'environnement
-load_dotenv()
+# Charger les variables d'environnement (avant les modules qui les lisent)
+import utils.env  # noqa: F401
+
+from mcp.server import Server
+from mcp.types import Tool, TextContent
+
+from db.connection import DatabaseUnavailable, DeadlineExceeded, db, deadline, transaction
+from db.tables import Space
 
 # Configurer un logger simple pour MCP (pas de Rich car stdio)
 logging.basicConfig(
@@ -19,16 +24,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger("administration_mcp")
 
-from mcp.server import Server
-from mcp.types import Tool, TextContent
-
-from db.connection import db
-from db.tables import Space
-
 
 # Créer le serveur MCP
 administration_mcp = Server("administration-mcp")
 
+# Délai max (s) des requêtes SQL d'un appel d'outil
+TOOL_TIMEOUT = float(os.getenv("MCP_TOOL_TIMEOUT", 30))
+
 
 # ═══════════════════════════════════════════════════════════════
 # 🏢 OUTILS ADMINISTRATION (WORKSPACES)
@@ -58,11 +60,13 @@ async def list_administration_tools() -> list[Tool]:
         ),
         Tool(
             name="get_user_spaces",
-            description="Récupérer tous les workspaces d'un utilisateur",
+            description="Récupérer les workspaces d'un utilisateur (du plus récent au plus ancien), page par page",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "user_id": {"type": "string", "description": "ID de l'utilisateur"}
+                    "user_id": {"type": "string", "description": "ID de l'utilisateur"},
+                    "cursor": {"type": "string", "description": "Curseur de la page suivante (renvoyé par get_user_spaces)"},
+                    "limit": {"type": "integer", "description": "Nombre de workspaces par page (défaut: 50)"}
                 },
                 "required": ["user_id"]
             }
@@ -92,44 +96,59 @@ async def call_administration_tool(name: str, arguments: dict[str, Any]) -> list
     await db.connect()  # S'assurer que la connexion est active
     
     try:
-        # ─── Spaces ──────────────────────────────────────────────────
-        if name == "create_space":
-            space_id = await Space.create(
-                name=arguments["name"],
-                owner_id=arguments["owner_id"],
-                methodology=arguments.get("methodology", "KANBAN")
-            )
-            space = await Space.find_by_id(space_id)
-            return [TextContent(
-                type="text",
-                text=f"✅ Workspace créé : {space.name} (ID: {space_id}, méthodologie: {space.methodology})"
-            )]
+        # Un seul commit par appel d'outil (rollback si exception), borné par MCP_TOOL_TIMEOUT
+        async with deadline(TOOL_TIMEOUT), transaction():
+            # ─── Spaces ──────────────────────────────────────────────────
+            if name == "create_space":
+                space_id = await Space.create(
+                    name=arguments["name"],
+                    owner_id=arguments["owner_id"],
+                    methodology=arguments.get("methodology", "KANBAN")
+                )
+                space = await Space.find_by_id(space_id)
+                return [TextContent(
+                    type="text",
+                    text=f"✅ Workspace créé : {space.name} (ID: {space_id}, méthodologie: {space.methodology})"
+                )]
         
-        elif name == "get_user_spaces":
-            spaces = await Space.get_by_user(arguments["user_id"])
-            if not spaces:
-                return [TextContent(type="text", text="Aucun workspace trouvé pour cet utilisateur")]
+            elif name == "get_user_spaces":
+                try:
+                    spaces, next_cursor = await Space.get_page_by_user(
+                        arguments["user_id"], arguments.get("limit"), arguments.get("cursor")
+                    )
+                except ValueError:
+                    return [TextContent(type="text", text="❌ Curseur invalide - relance get_user_spaces sans cursor")]
+                if not spaces:
+                    return [TextContent(type="text", text="Aucun workspace trouvé pour cet utilisateur")]
             
-            result = f"📁 {len(spaces)} workspace(s) trouvé(s):\n\n"
-            for space in spaces:
-                result += f"- {space.name} ({space.methodology}) - ID: {space.id}\n"
-            return [TextContent(type="text", text=result)]
+                result = f"📁 {len(spaces)} workspace(s) trouvé(s):\n\n"
+                for space in spaces:
+                    result += f"- {space.name} ({space.methodology}) - ID: {space.id}\n"
+                if next_cursor:
+                    result += f"\n➡️ Suite : get_user_spaces cursor=\"{next_cursor}\""
+                return [TextContent(type="text", text=result)]
         
-        elif name == "get_space_info":
-            space = await Space.find_by_id(arguments["space_id"])
-            if not space:
-                return [TextContent(type="text", text="❌ Workspace introuvable")]
+            elif name == "get_space_info":
+                space = await Space.find_by_id(arguments["space_id"])
+                if not space:
+                    return [TextContent(type="text", text="❌ Workspace introuvable")]
             
-            members = await space.get_members()
-            result = f"🏢 {space.name}\n"
-            result += f"Méthodologie: {space.methodology}\n"
-            result += f"Propriétaire: {space.owner_id}\n"
-            result += f"Membres: {len(members)}\n"
-            return [TextContent(type="text", text=result)]
+                members = await space.get_members()
+                result = f"🏢 {space.name}\n"
+                result += f"Méthodologie: {space.methodology}\n"
+                result += f"Propriétaire: {space.owner_id}\n"
+                result += f"Membres: {len(members)}\n"
+                return [TextContent(type="text", text=result)]
         
-        else:
-            return [TextContent(type="text", text=f"❌ Outil inconnu : {name}")]
+            else:
+                return [TextContent(type="text", text=f"❌ Outil inconnu : {name}")]
             
+    except DeadlineExceeded as e:
+        logger.warning(f"⏱️ Délai dépassé dans l'outil {name}: {e}")
+        return [TextContent(type="text", text=f"⏱️ Délai dépassé ({TOOL_TIMEOUT:.0f}s) : la base de données n'a pas répondu à temps, réessaie plus tard")]
+    except DatabaseUnavailable as e:
+        logger.warning(f"🔴 Base indisponible pour l'outil {name}: {e}")
+        return [TextContent(type="text", text="🔴 Base de données momentanément indisponible, réessaie dans quelques secondes")]
     except Exception as e:
         logger.error(f"Erreur dans l'outil {name}: {e}")
         return [TextContent(type="text", text=f"❌ Erreur : {str(e)}")]
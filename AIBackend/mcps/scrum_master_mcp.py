@@ -6,10 +6,15 @@ import logging
 import sys
 import os
 from typing import Any
-from dotenv import load_dotenv
 
-# Charger les variables d'environnement
-load_dotenv()
+# Charger les variables d'environnement (avant les modules qui les lisent)
+import utils.env  # noqa: F401
+
+from mcp.server import Server
+from mcp.types import Tool, TextContent
+
+from db.connection import DatabaseUnavailable, DeadlineExceeded, db, deadline, transaction
+from db.tables import Sprint, SprintBacklogItem
 
 # Configurer un logger simple pour MCP (pas de Rich car stdio)
 logging.basicConfig(
@@ -19,16 +24,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger("scrum_master_mcp")
 
-from mcp.server import Server
-from mcp.types import Tool, TextContent
-
-from db.connection import db
-from db.tables import Sprint, SprintBacklogItem
-
 
 # Créer le serveur MCP
 scrum_master_mcp = Server("scrum-master-mcp")
 
+# Délai max (s) des requêtes SQL d'un appel d'outil
+TOOL_TIMEOUT = float(os.getenv("MCP_TOOL_TIMEOUT", 30))
+
 
 # ═══════════════════════════════════════════════════════════════
 # 🏃 OUTILS SCRUM (SPRINTS)
@@ -62,18 +64,20 @@ async def list_scrum_tools() -> list[Tool]:
                     "sprint_id": {"type": "string", "description": "ID du sprint"},
                     "backlog_item_id": {"type": "string", "description": "ID de l'item du Product Backlog"},
                     "story_points": {"type": "integer", "description": "Estimation en story points"},
-                    "position": {"type": "integer", "description": "Position dans le sprint backlog"}
+                    "position": {"type": "integer", "description": "Position dans le sprint backlog (0 = en tête)", "default": 0}
                 },
                 "required": ["sprint_id", "backlog_item_id"]
             }
         ),
         Tool(
             name="get_sprint_backlog",
-            description="Récupérer le Sprint Backlog complet d'un sprint",
+            description="Récupérer le Sprint Backlog d'un sprint, page par page. Pour la suite, passer le cursor renvoyé.",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "sprint_id": {"type": "string", "description": "ID du sprint"}
+                    "sprint_id": {"type": "string", "description": "ID du sprint"},
+                    "cursor": {"type": "string", "description": "Curseur de la page suivante (renvoyé par get_sprint_backlog)"},
+                    "limit": {"type": "integer", "description": "Nombre d'items par page (défaut: 50)"}
                 },
                 "required": ["sprint_id"]
             }
@@ -114,72 +118,87 @@ async def call_scrum_tool(name: str, arguments: dict[str, Any]) -> list[TextCont
     await db.connect()  # S'assurer que la connexion est active
     
     try:
-        # ─── Sprints ─────────────────────────────────────────────────
-        if name == "create_sprint":
-            from datetime import datetime
-            sprint_id = await Sprint.create(
-                space_id=arguments["space_id"],
-                name=arguments["name"],
-                start_date=datetime.strptime(arguments["start_date"], "%Y-%m-%d").date(),
-                end_date=datetime.strptime(arguments["end_date"], "%Y-%m-%d").date(),
-                goal=arguments.get("goal"),
-                status="PLANNING"
-            )
-            sprint = await Sprint.find_by_id(sprint_id)
-            return [TextContent(
-                type="text",
-                text=f"✅ Sprint créé : {sprint.name} (ID: {sprint_id}, status: {sprint.status})"
-            )]
-
-        elif name == "add_to_sprint_backlog":
-            # Vérifier si déjà dans le sprint
-            exists = await SprintBacklogItem.is_in_sprint(
-                arguments["sprint_id"],
-                arguments["backlog_item_id"]
-            )
-            if exists:
-                return [TextContent(type="text", text="❌ Cet item est déjà dans le sprint")]
-
-            sbi_id = await SprintBacklogItem.add_to_sprint(
-                sprint_id=arguments["sprint_id"],
-                backlog_item_id=arguments["backlog_item_id"],
-                story_points=arguments.get("story_points"),
-                position=arguments.get("position", 0)
-            )
-            return [TextContent(
-                type="text",
-                text=f"✅ Item ajouté au Sprint Backlog (ID: {sbi_id})"
-            )]
-
-        elif name == "get_sprint_backlog":
-            items = await SprintBacklogItem.get_by_sprint(arguments["sprint_id"])
-            if not items:
-                return [TextContent(type="text", text="📋 Sprint Backlog vide")]
-
-            result = f"📋 Sprint Backlog ({len(items)} items):\n\n"
-            for item in items:
-                sp = f" ({item['story_points']} SP)" if item.get('story_points') else ""
-                assignee = f" → {item['assignee_name']}" if item.get('assignee_name') else ""
-                result += f"#{item['sequence_number']} - {item['title']}{sp}{assignee}\n"
-            return [TextContent(type="text", text=result)]
-
-        elif name == "start_sprint":
-            sprint = await Sprint.find_by_id(arguments["sprint_id"])
-            if not sprint:
-                return [TextContent(type="text", text="❌ Sprint introuvable")]
-            await sprint.update_status("ACTIVE")
-            return [TextContent(type="text", text=f"✅ Sprint {sprint.name} démarré")]
-
-        elif name == "complete_sprint":
-            sprint = await Sprint.find_by_id(arguments["sprint_id"])
-            if not sprint:
-                return [TextContent(type="text", text="❌ Sprint introuvable")]
-            await sprint.update_status("COMPLETED")
-            return [TextContent(type="text", text=f"✅ Sprint {sprint.name} terminé")]
-
-        else:
-            return [TextContent(type="text", text=f"❌ Outil inconnu : {name}")]
+        # Un seul commit par appel d'outil (rollback si exception), borné par MCP_TOOL_TIMEOUT
+        async with deadline(TOOL_TIMEOUT), transaction():
+            # ─── Sprints ─────────────────────────────────────────────────
+            if name == "create_sprint":
+                from datetime import datetime
+                sprint_id = await Sprint.create(
+                    space_id=arguments["space_id"],
+                    name=arguments["name"],
+                    start_date=datetime.strptime(arguments["start_date"], "%Y-%m-%d").date(),
+                    end_date=datetime.strptime(arguments["end_date"], "%Y-%m-%d").date(),
+                    goal=arguments.get("goal"),
+                    status="PLANNING"
+                )
+                sprint = await Sprint.find_by_id(sprint_id)
+                return [TextContent(
+                    type="text",
+                    text=f"✅ Sprint créé : {sprint.name} (ID: {sprint_id}, status: {sprint.status})"
+                )]
+
+            elif name == "add_to_sprint_backlog":
+                # Vérifier si déjà dans le sprint
+                exists = await SprintBacklogItem.is_in_sprint(
+                    arguments["sprint_id"],
+                    arguments["backlog_item_id"]
+                )
+                if exists:
+                    return [TextContent(type="text", text="❌ Cet item est déjà dans le sprint")]
+
+                sbi_id = await SprintBacklogItem.add_to_sprint(
+                    sprint_id=arguments["sprint_id"],
+                    backlog_item_id=arguments["backlog_item_id"],
+                    story_points=arguments.get("story_points"),
+                    position=arguments.get("position", 0)
+                )
+                return [TextContent(
+                    type="text",
+                    text=f"✅ Item ajouté au Sprint Backlog (ID: {sbi_id})"
+                )]
+
+            elif name == "get_sprint_backlog":
+                try:
+                    items, next_cursor = await SprintBacklogItem.get_page_by_sprint(
+                        arguments["sprint_id"], arguments.get("limit"), arguments.get("cursor")
+                    )
+                except ValueError:
+                    return [TextContent(type="text", text="❌ Curseur invalide - relance get_sprint_backlog sans cursor")]
+                if not items:
+                    return [TextContent(type="text", text="📋 Sprint Backlog vide")]
+
+                result = f"📋 Sprint Backlog ({len(items)} items):\n\n"
+                for item in items:
+                    sp = f" ({item['story_points']} SP)" if item.get('story_points') else ""
+                    assignee = f" → {item['assignee_name']}" if item.get('assignee_name') else ""
+                    result += f"#{item['sequence_number']} - {item['title']}{sp}{assignee}\n"
+                if next_cursor:
+                    result += f"\n➡️ Suite : get_sprint_backlog cursor=\"{next_cursor}\""
+                return [TextContent(type="text", text=result)]
+
+            elif name == "start_sprint":
+                sprint = await Sprint.find_by_id(arguments["sprint_id"])
+                if not sprint:
+                    return [TextContent(type="text", text="❌ Sprint introuvable")]
+                await sprint.update_status("ACTIVE")
+                return [TextContent(type="text", text=f"✅ Sprint {sprint.name} démarré")]
+
+            elif name == "complete_sprint":
+                sprint = await Sprint.find_by_id(arguments["sprint_id"])
+                if not sprint:
+                    return [TextContent(type="text", text="❌ Sprint introuvable")]
+                await sprint.update_status("COMPLETED")
+                return [TextContent(type="text", text=f"✅ Sprint {sprint.name} terminé")]
+
+            else:
+                return [TextContent(type="text", text=f"❌ Outil inconnu : {name}")]
             
+    except DeadlineExceeded as e:
+        logger.warning(f"⏱️ Délai dépassé dans l'outil {name}: {e}")
+        return [TextContent(type="text", text=f"⏱️ Délai dépassé ({TOOL_TIMEOUT:.0f}s) : la base de données n'a pas répondu à temps, réessaie plus tard")]
+    except DatabaseUnavailable as e:
+        logger.warning(f"🔴 Base indisponible pour l'outil {name}: {e}")
+        return [TextContent(type="text", text="🔴 Base de données momentanément indisponible, réessaie dans quelques secondes")]
     except Exception as e:
         logger.error(f"Erreur dans l'outil {name}: {e}")
         return [TextContent(type="text", text=f"❌ Erreur : {str(e)}")]
@@ -8,35 +8,73 @@ import logging
 import sys
 import os
 from typing import Any
-from dotenv import load_dotenv
 
-# Charger les variables d'environnement
-load_dotenv()
-
-# Configurer un logger simple pour MCP (pas de Rich car stdio)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    stream=sys.stderr  # Logs sur stderr pour ne pas interférer avec stdio MCP
-)
-logger = logging.getLogger("workflow_mcp")
+# Charger les variables d'environnement (avant les modules qui les lisent)
+import utils.env  # noqa: F401
 
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 
-from db.connection import db
+from db.connection import DatabaseUnavailable, DeadlineExceeded, db, deadline, pipeline, transaction
 from db.tables import (
     BacklogItem,
     Task,
     Column,
 )
+from db.cursors import encode_keyset
+from db.tables.column import column_task_cursor, parse_column_task_cursor
 from db.tables.space import Space
 from db.tables.sprint import Sprint
 
+# Configurer un logger simple pour MCP (pas de Rich car stdio)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    stream=sys.stderr  # Logs sur stderr pour ne pas interférer avec stdio MCP
+)
+logger = logging.getLogger("workflow_mcp")
+
 
 # Créer le serveur MCP
 workflow_mcp = Server("workflow-mcp")
 
+# Délai max (s) des requêtes SQL d'un appel d'outil
+TOOL_TIMEOUT = float(os.getenv("MCP_TOOL_TIMEOUT", 30))
+# Tâches listées par colonne dans un board (le reste : total + curseur)
+BOARD_TASKS_PER_COLUMN = int(os.getenv("MCP_BOARD_TASKS_PER_COLUMN", 5))
+# Taille max (caractères) de la réponse d'un outil, quelle que soit la taille du board
+OUTPUT_MAX_CHARS = int(os.getenv("MCP_OUTPUT_MAX_CHARS", 8000))
+
+
+def _format_board(board: dict, budget: int) -> str:
+    """
+    Afficher les colonnes d'un board résumé (Task.get_*_board(limit=...))
+    
+    Chaque colonne donne son nombre exact de tâches ; les suivantes se
+    récupèrent avec get_column_tasks(cursor=...). Passé `budget` caractères,
+    seuls les en-têtes de colonnes sont affichés.
+    """
+    result = ""
+    for column_name, data in board.items():
+        column = data['column']
+        wip = f" (WIP: {column['wip_limit']})" if column.get('wip_limit') else ""
+        result += f"🔹 **{column_name}**{wip} ({data['total']} tâches)\n"
+        shown = 0
+        if len(result) < budget:
+            for task in data['tasks']:
+                points = f" [{task['story_points']} pts]" if task.get('story_points') else ""
+                # Ajouter les IDs en format JSON caché pour que l'agent puisse les parser
+                ids_json = f"{{\"task_id\":\"{task['id']}\",\"column_id\":\"{column['id']}\",\"item_seq\":{task['sequence_number']}}}"
+                result += f"  • #{task['sequence_number']}: {task['title']}{points} <!-- {ids_json} -->\n"
+                shown += 1
+        if shown < data['total']:
+            if shown and data['cursor']:
+                result += f"  ... et {data['total'] - shown} autres (get_column_tasks cursor=\"{data['cursor']}\")\n"
+            else:
+                result += f"  ... {data['total'] - shown} tâches (get_column_tasks column_id=\"{column['id']}\")\n"
+        result += "\n"
+    return result
+
 
 # ═══════════════════════════════════════════════════════════════
 # 📋 OUTILS KANBAN/SCRUM (BACKLOG, TASKS, COLONNES)
@@ -85,17 +123,59 @@ async def list_workflow_tools() -> list[Tool]:
                 "required": ["space_id", "title", "created_by_id"]
             }
         ),
+        Tool(
+            name="bulk_create_backlog_items",
+            description="Créer plusieurs items du Product Backlog en une seule opération (import / migration). Peut aussi créer une tâche KANBAN par item.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "space_id": {"type": "string", "description": "ID du workspace (OBLIGATOIRE - du contexte)"},
+                    "created_by_id": {"type": "string", "description": "ID du créateur (user_id du contexte)"},
+                    "items": {
+                        "type": "array",
+                        "description": "Items à créer",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": {"type": "string", "description": "Titre de l'item"},
+                                "description": {"type": "string", "description": "Description détaillée"},
+                                "assignee_id": {"type": "string", "description": "ID de l'assigné (optionnel)"}
+                            },
+                            "required": ["title"]
+                        }
+                    },
+                    "create_tasks": {"type": "boolean", "description": "Créer aussi une tâche par item (défaut: false)"},
+                    "column_id": {"type": "string", "description": "Colonne des tâches créées (défaut: première colonne)"}
+                },
+                "required": ["space_id", "items"]
+            }
+        ),
         Tool(
             name="get_backlog",
-            description="Récupérer le Product Backlog complet d'un workspace",
+            description="Récupérer le Product Backlog d'un workspace, page par page (dans l'ordre de priorité). Pour la suite, passer le cursor renvoyé.",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "space_id": {"type": "string", "description": "ID du workspace (OBLIGATOIRE - du contexte)"}
+                    "space_id": {"type": "string", "description": "ID du workspace (OBLIGATOIRE - du contexte)"},
+                    "cursor": {"type": "string", "description": "Curseur de la page suivante (renvoyé par get_backlog)"},
+                    "limit": {"type": "integer", "description": "Nombre d'items par page (défaut: 50)"}
                 },
                 "required": ["space_id"]
             }
         ),
+        Tool(
+            name="search_backlog",
+            description="Rechercher des items du Product Backlog par mots-clés (titre et description, FR/EN), triés par pertinence. À préférer à get_backlog pour retrouver une story.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "space_id": {"type": "string", "description": "ID du workspace (OBLIGATOIRE - du contexte)"},
+                    "query": {"type": "string", "description": "Mots-clés (\"expression exacte\", -mot pour exclure, or)"},
+                    "limit": {"type": "integer", "description": "Nombre de résultats (défaut: 10)"}
+                },
+                "required": ["space_id", "query"]
+            }
+        ),
         Tool(
             name="update_backlog_item",
             description="Mettre à jour un item du backlog",
@@ -138,7 +218,7 @@ async def list_workflow_tools() -> list[Tool]:
                 "properties": {
                     "task_id": {"type": "string", "description": "ID de la tâche"},
                     "column_id": {"type": "string", "description": "ID de la colonne destination"},
-                    "position": {"type": "integer", "description": "Position dans la colonne", "default": 0}
+                    "position": {"type": "integer", "description": "Position dans la colonne (0 = en haut)", "default": 0}
                 },
                 "required": ["task_id", "column_id"]
             }
@@ -184,13 +264,14 @@ async def list_workflow_tools() -> list[Tool]:
         ),
         Tool(
             name="get_column_tasks",
-            description="Récupérer toutes les tâches d'une colonne",
+            description="Récupérer les tâches d'une colonne, page par page. Pour la suite d'une colonne du board, passer le cursor indiqué par get_board.",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "column_id": {"type": "string", "description": "ID de la colonne"}
-                },
-                "required": ["column_id"]
+                    "column_id": {"type": "string", "description": "ID de la colonne (première page)"},
+                    "cursor": {"type": "string", "description": "Curseur de la page suivante (renvoyé par get_board ou get_column_tasks)"},
+                    "limit": {"type": "integer", "description": "Nombre de tâches par page (défaut: 20)"}
+                }
             }
         ),
     ]
@@ -207,319 +288,409 @@ async def call_workflow_tool(name: str, arguments: dict[str, Any]) -> list[TextC
     await db.connect()  # S'assurer que la connexion est active
     
     try:
-        # ─── Outil intelligent get_board ─────────────────────────────
-        if name == "get_board":
-            space_id = arguments.get("space_id")
-            if not space_id:
-                return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire. Utilise le space_id du contexte utilisateur.")]
+        # Un seul commit par appel d'outil (rollback si exception), borné par MCP_TOOL_TIMEOUT
+        async with deadline(TOOL_TIMEOUT), transaction():
+            # ─── Outil intelligent get_board ─────────────────────────────
+            if name == "get_board":
+                space_id = arguments.get("space_id")
+                if not space_id:
+                    return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire. Utilise le space_id du contexte utilisateur.")]
             
-            # Récupérer les infos du workspace pour connaître la méthodologie
-            space = await Space.find_by_id(space_id)
-            if not space:
-                return [TextContent(type="text", text=f"❌ Workspace '{space_id}' introuvable")]
+                # Workspace (méthodologie) et sprint actif en un aller-retour
+                async with pipeline() as pipe:
+                    pending_space = await Space.find_by_id(space_id, pipe=pipe)
+                    pending_sprint = await Sprint.get_active(space_id, pipe=pipe)
+                space = pending_space.result()
+                if not space:
+                    return [TextContent(type="text", text=f"❌ Workspace '{space_id}' introuvable")]
             
-            methodology = space.methodology
-            result = f"📊 **Board - {space.name}** (Méthodologie: {methodology})\n\n"
+                methodology = space.methodology
+                result = f"📊 **Board - {space.name}** (Méthodologie: {methodology})\n\n"
             
-            # Ajouter un mapping des colonnes en commentaire HTML pour que l'agent puisse parser les column_id
-            columns_mapping = []
+                # Ajouter un mapping des colonnes en commentaire HTML pour que l'agent puisse parser les column_id
+                columns_mapping = []
             
-            if methodology == "SCRUM":
-                # Mode SCRUM: récupérer le sprint actif et son board
-                active_sprint = await Sprint.get_active(space_id)
+                if methodology == "SCRUM":
+                    # Mode SCRUM: board du sprint actif
+                    active_sprint = pending_sprint.result()
                 
-                if not active_sprint:
-                    # Pas de sprint actif - afficher le product backlog
-                    items = await BacklogItem.get_by_space(space_id)
-                    result += "⚠️ **Aucun sprint actif** - Voici le Product Backlog:\n\n"
-                    if items:
-                        result += f"📋 Product Backlog ({len(items)} items):\n"
-                        for item in items[:10]:
-                            assignee = f" → {item['assignee_name']}" if item.get('assignee_name') else ""
-                            result += f"  • #{item['sequence_number']}: {item['title']}{assignee}\n"
-                        if len(items) > 10:
-                            result += f"  ... et {len(items) - 10} autres items\n"
+                    if not active_sprint:
+                        # Pas de sprint actif - afficher le product backlog
+                        items, next_cursor = await BacklogItem.get_page(space_id, limit=10)
+                        result += "⚠️ **Aucun sprint actif** - Voici le Product Backlog:\n\n"
+                        if items:
+                            total = await BacklogItem.count_by_space(space_id) if next_cursor else len(items)
+                            result += f"📋 Product Backlog ({total} items):\n"
+                            for item in items:
+                                assignee = f" → {item['assignee_name']}" if item.get('assignee_name') else ""
+                                result += f"  • #{item['sequence_number']}: {item['title']}{assignee}\n"
+                            if next_cursor:
+                                result += f"  ... et {total - len(items)} autres items (get_backlog cursor=\"{next_cursor}\")\n"
+                        else:
+                            result += "📋 Product Backlog vide\n"
+                        result += "\n💡 Crée un sprint avec le Scrum Master pour commencer à travailler."
                     else:
-                        result += "📋 Product Backlog vide\n"
-                    result += "\n💡 Crée un sprint avec le Scrum Master pour commencer à travailler."
-                else:
-                    # Sprint actif trouvé - afficher son board
-                    result += f"🏃 **Sprint actif**: {active_sprint.name}"
-                    if active_sprint.goal:
-                        result += f"\n📎 Objectif: {active_sprint.goal}"
-                    result += f"\n📅 Du {active_sprint.start_date} au {active_sprint.end_date}\n\n"
+                        # Sprint actif trouvé - afficher son board
+                        result += f"🏃 **Sprint actif**: {active_sprint.name}"
+                        if active_sprint.goal:
+                            result += f"\n📎 Objectif: {active_sprint.goal}"
+                        result += f"\n📅 Du {active_sprint.start_date} au {active_sprint.end_date}\n\n"
                     
-                    # Récupérer le board du sprint
-                    board = await Task.get_sprint_board(active_sprint.id)
+                        # Récupérer le board du sprint
+                        board = await Task.get_sprint_board(active_sprint.id, limit=BOARD_TASKS_PER_COLUMN)
                     
-                    # Construire le mapping des colonnes
-                    if board:
-                        for column_name, data in board.items():
-                            columns_mapping.append({"name": column_name, "id": data['column']['id']})
+                        # Construire le mapping des colonnes
+                        if board:
+                            for column_name, data in board.items():
+                                columns_mapping.append({"name": column_name, "id": data['column']['id']})
                     
-                    if board:
-                        for column_name, data in board.items():
-                            wip = f" (WIP: {data['column']['wip_limit']})" if data['column'].get('wip_limit') else ""
-                            result += f"🔹 **{column_name}**{wip} ({len(data['tasks'])} tâches)\n"
-                            for task in data['tasks'][:5]:
-                                points = f" [{task.get('story_points', '?')} pts]" if task.get('story_points') else ""
-                                # Ajouter les IDs en format JSON caché pour que l'agent puisse les parser
-                                ids_json = f"{{\"task_id\":\"{task['id']}\",\"column_id\":\"{data['column']['id']}\",\"item_seq\":{task['sequence_number']}}}"
-                                result += f"  • #{task['sequence_number']}: {task['title']}{points} <!-- {ids_json} -->\n"
-                            if len(data['tasks']) > 5:
-                                result += f"  ... et {len(data['tasks']) - 5} autres\n"
-                            result += "\n"
-                    else:
-                        result += "📋 Board du sprint vide - Ajoute des items au Sprint Backlog.\n"
+                        if board:
+                            result += _format_board(board, OUTPUT_MAX_CHARS - len(result))
+                        else:
+                            result += "📋 Board du sprint vide - Ajoute des items au Sprint Backlog.\n"
                     
-                    # Ajouter un résumé du Sprint Backlog
-                    sprint_items = await active_sprint.get_backlog_items()
-                    if sprint_items:
-                        total_points = sum(item.get('story_points', 0) or 0 for item in sprint_items)
-                        result += f"\n📊 Sprint Backlog: {len(sprint_items)} items, {total_points} story points"
+                        # Ajouter un résumé du Sprint Backlog
+                        sprint_items = await active_sprint.get_backlog_items()
+                        if sprint_items:
+                            total_points = sum(item.get('story_points', 0) or 0 for item in sprint_items)
+                            result += f"\n📊 Sprint Backlog: {len(sprint_items)} items, {total_points} story points"
             
-            else:
-                # Mode KANBAN: board classique avec colonnes
-                board = await Task.get_kanban_board(space_id)
+                else:
+                    # Mode KANBAN: board classique avec colonnes
+                    board = await Task.get_kanban_board(space_id, limit=BOARD_TASKS_PER_COLUMN)
                 
-                # Construire le mapping des colonnes
-                if board:
-                    for column_name, data in board.items():
-                        columns_mapping.append({"name": column_name, "id": data['column']['id']})
+                    # Construire le mapping des colonnes
+                    if board:
+                        for column_name, data in board.items():
+                            columns_mapping.append({"name": column_name, "id": data['column']['id']})
                 
-                if not board:
-                    result += "📋 Board Kanban vide - Aucune colonne configurée.\n"
-                    result += "💡 Crée des colonnes (To Do, In Progress, Done) pour commencer."
-                else:
-                    for column_name, data in board.items():
-                        wip = f" (WIP: {data['column']['wip_limit']})" if data['column'].get('wip_limit') else ""
-                        result += f"🔹 **{column_name}**{wip} ({len(data['tasks'])} tâches)\n"
-                        for task in data['tasks'][:5]:
-                            # Ajouter les IDs en format JSON caché pour que l'agent puisse les parser
-                            ids_json = f"{{\"task_id\":\"{task['id']}\",\"column_id\":\"{data['column']['id']}\",\"item_seq\":{task['sequence_number']}}}"
-                            result += f"  • #{task['sequence_number']}: {task['title']} <!-- {ids_json} -->\n"
-                        if len(data['tasks']) > 5:
-                            result += f"  ... et {len(data['tasks']) - 5} autres\n"
-                        result += "\n"
+                    if not board:
+                        result += "📋 Board Kanban vide - Aucune colonne configurée.\n"
+                        result += "💡 Crée des colonnes (To Do, In Progress, Done) pour commencer."
+                    else:
+                        result += _format_board(board, OUTPUT_MAX_CHARS - len(result))
                 
-                # Afficher aussi le product backlog pour KANBAN
-                items = await BacklogItem.get_by_space(space_id)
-                if items:
-                    result += f"\n📋 Product Backlog ({len(items)} items disponibles)"
+                    # Afficher aussi le product backlog pour KANBAN
+                    backlog_count = await BacklogItem.count_by_space(space_id)
+                    if backlog_count:
+                        result += f"\n📋 Product Backlog ({backlog_count} items disponibles)"
             
-            # Ajouter le mapping des colonnes en commentaire HTML à la fin
-            if columns_mapping:
-                import json
-                result += f"\n\n<!-- COLUMNS_MAPPING: {json.dumps(columns_mapping)} -->"
+                # Ajouter le mapping des colonnes en commentaire HTML à la fin
+                if columns_mapping:
+                    import json
+                    result += f"\n\n<!-- COLUMNS_MAPPING: {json.dumps(columns_mapping)} -->"
             
-            return [TextContent(type="text", text=result)]
+                return [TextContent(type="text", text=result)]
         
-        elif name == "get_space_info":
-            space_id = arguments.get("space_id")
-            if not space_id:
-                return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire")]
-            
-            space = await Space.find_by_id(space_id)
-            if not space:
-                return [TextContent(type="text", text=f"❌ Workspace '{space_id}' introuvable")]
+            elif name == "get_space_info":
+                space_id = arguments.get("space_id")
+                if not space_id:
+                    return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire")]
             
-            result = f"📁 **Workspace: {space.name}**\n"
-            result += f"  • ID: {space.id}\n"
-            result += f"  • Méthodologie: {space.methodology}\n"
-            result += f"  • Propriétaire: {space.owner_id}\n"
+                space = await Space.find_by_id(space_id)
+                if not space:
+                    return [TextContent(type="text", text=f"❌ Workspace '{space_id}' introuvable")]
             
-            if space.methodology == "SCRUM":
-                active_sprint = await Sprint.get_active(space_id)
-                if active_sprint:
-                    result += f"  • Sprint actif: {active_sprint.name} (status: {active_sprint.status})\n"
-                else:
-                    result += "  • Aucun sprint actif\n"
+                result = f"📁 **Workspace: {space.name}**\n"
+                result += f"  • ID: {space.id}\n"
+                result += f"  • Méthodologie: {space.methodology}\n"
+                result += f"  • Propriétaire: {space.owner_id}\n"
             
-            return [TextContent(type="text", text=result)]
-        
-        # ─── Product Backlog ─────────────────────────────────────────
-        elif name == "create_backlog_item":
-            space_id = arguments.get("space_id")
-            created_by_id = arguments.get("created_by_id")
-            
-            if not space_id:
-                return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire. Utilise le space_id du contexte utilisateur.")]
+                if space.methodology == "SCRUM":
+                    active_sprint = await Sprint.get_active(space_id)
+                    if active_sprint:
+                        result += f"  • Sprint actif: {active_sprint.name} (status: {active_sprint.status})\n"
+                    else:
+                        result += "  • Aucun sprint actif\n"
             
-            if not created_by_id:
-                # Si created_by_id n'est pas fourni, utiliser le propriétaire du workspace
-                space = await Space.find_by_id(space_id)
-                if space:
-                    created_by_id = space.owner_id
-                    logger.info(f"✅ created_by_id récupéré du propriétaire du workspace: {created_by_id}")
-                else:
-                    return [TextContent(type="text", text=f"❌ Workspace '{space_id}' introuvable")]
-
-            item_id = await BacklogItem.create(
-                space_id=space_id,
-                title=arguments["title"],
-                created_by_id=created_by_id,
-                description=arguments.get("description"),
-                assignee_id=arguments.get("assignee_id")
-            )
-            item = await BacklogItem.find_by_id(item_id)
-            return [TextContent(
-                type="text",
-                text=f"✅ Item créé dans le Product Backlog : #{item.sequence_number} - {item.title} (workspace: {space_id})"
-            )]
+                return [TextContent(type="text", text=result)]
         
-        elif name == "get_backlog":
-            space_id = arguments.get("space_id")
-            if not space_id:
-                return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire")]
-
-            items = await BacklogItem.get_by_space(space_id)
-            if not items:
-                return [TextContent(type="text", text="📋 Product Backlog vide")]
-
-            result = f"📋 Product Backlog ({len(items)} items):\n\n"
-            for item in items:
-                assignee = f" → {item['assignee_name']}" if item.get('assignee_name') else ""
-                result += f"#{item['sequence_number']} - {item['title']}{assignee}\n"
-            return [TextContent(type="text", text=result)]
-
-        elif name == "update_backlog_item":
-            item = await BacklogItem.find_by_id(arguments["item_id"])
-            if not item:
-                return [TextContent(type="text", text="❌ Item introuvable")]
-
-            updates = {k: v for k, v in arguments.items() if k != "item_id" and v is not None}
-            await item.update(**updates)
-            return [TextContent(type="text", text=f"✅ Item #{item.sequence_number} mis à jour")]
-        
-        # ─── Tasks ───────────────────────────────────────────────────
-        elif name == "create_task":
-            space_id = arguments.get("space_id")
-            if not space_id:
-                return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire")]
+            # ─── Product Backlog ─────────────────────────────────────────
+            elif name == "create_backlog_item":
+                space_id = arguments.get("space_id")
+                created_by_id = arguments.get("created_by_id")
             
-            backlog_item_id = arguments.get("backlog_item_id")
-            sequence_number = arguments.get("sequence_number")
-            title = arguments.get("title")
+                if not space_id:
+                    return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire. Utilise le space_id du contexte utilisateur.")]
             
-            # OPTION 1: Création directe avec title (création automatique d'un backlog item)
-            if title:
-                created_by_id = arguments.get("created_by_id")
                 if not created_by_id:
+                    # Si created_by_id n'est pas fourni, utiliser le propriétaire du workspace
                     space = await Space.find_by_id(space_id)
                     if space:
                         created_by_id = space.owner_id
+                        logger.info(f"✅ created_by_id récupéré du propriétaire du workspace: {created_by_id}")
                     else:
                         return [TextContent(type="text", text=f"❌ Workspace '{space_id}' introuvable")]
-                
-                # Créer automatiquement un backlog item
-                backlog_item_id = await BacklogItem.create(
-                    space_id=space_id,
-                    title=title,
-                    created_by_id=created_by_id,
-                    description=arguments.get("description"),
-                    assignee_id=arguments.get("assignee_id")
-                )
-                item = await BacklogItem.find_by_id(backlog_item_id)
-                
-            # OPTION 2/3: Lier à un item existant (sequence_number ou backlog_item_id)
-            else:
-                if not backlog_item_id and not sequence_number:
+
+                # Création + relecture (sequence_number) en un seul aller-retour
+                async with pipeline() as pipe:
+                    item_id = await BacklogItem.create(
+                        space_id=space_id,
+                        title=arguments["title"],
+                        created_by_id=created_by_id,
+                        description=arguments.get("description"),
+                        assignee_id=arguments.get("assignee_id"),
+                        pipe=pipe
+                    )
+                    pending_item = await BacklogItem.find_by_id(item_id, pipe=pipe)
+                item = pending_item.result()
+                return [TextContent(
+                    type="text",
+                    text=f"✅ Item créé dans le Product Backlog : #{item.sequence_number} - {item.title} (workspace: {space_id})"
+                )]
+        
+            elif name == "bulk_create_backlog_items":
+                space_id = arguments.get("space_id")
+                created_by_id = arguments.get("created_by_id")
+                items = arguments.get("items") or []
+
+                if not space_id:
+                    return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire. Utilise le space_id du contexte utilisateur.")]
+                if not items:
+                    return [TextContent(type="text", text="❌ Erreur: items est vide")]
+
+                if not created_by_id:
+                    space = await Space.find_by_id(space_id)
+                    if not space:
+                        return [TextContent(type="text", text=f"❌ Workspace '{space_id}' introuvable")]
+                    created_by_id = space.owner_id
+
+                try:
+                    created = await BacklogItem.bulk_create(
+                        space_id=space_id,
+                        created_by_id=created_by_id,
+                        items=items,
+                        create_tasks=arguments.get("create_tasks", False),
+                        column_id=arguments.get("column_id")
+                    )
+                except ValueError as e:
+                    return [TextContent(type="text", text=f"❌ {e}")]
+
+                result = f"✅ {len(created)} items créés dans le Product Backlog :\n"
+                for row in created[:20]:
+                    result += f"  • #{row['sequence_number']} - {row['title']}\n"
+                if len(created) > 20:
+                    result += f"  … et {len(created) - 20} autres\n"
+                return [TextContent(type="text", text=result)]
+
+            elif name == "get_backlog":
+                space_id = arguments.get("space_id")
+                if not space_id:
+                    return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire")]
+
+                try:
+                    items, next_cursor = await BacklogItem.get_page(space_id, arguments.get("limit"), arguments.get("cursor"))
+                except ValueError:
+                    return [TextContent(type="text", text="❌ Curseur invalide - relance get_backlog sans cursor")]
+                if not items:
+                    return [TextContent(type="text", text="📋 Product Backlog vide")]
+
+                result = f"📋 Product Backlog ({len(items)} items):\n\n"
+                for index, item in enumerate(items):
+                    assignee = f" → {item['assignee_name']}" if item.get('assignee_name') else ""
+                    line = f"#{item['sequence_number']} - {item['title']}{assignee}\n"
+                    if index and len(result) + len(line) > OUTPUT_MAX_CHARS:
+                        # Budget atteint : la page suivante reprend après le dernier item affiché
+                        next_cursor = encode_keyset(items[index - 1], "rank", "id")
+                        break
+                    result += line
+                if next_cursor:
+                    result += f"\n➡️ Suite : get_backlog cursor=\"{next_cursor}\""
+                return [TextContent(type="text", text=result)]
+
+            elif name == "search_backlog":
+                space_id = arguments.get("space_id")
+                if not space_id:
+                    return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire")]
+
+                items = await BacklogItem.search(space_id, arguments["query"], arguments.get("limit"))
+                if not items:
+                    return [TextContent(type="text", text=f"🔍 Aucun item ne correspond à \"{arguments['query']}\"")]
+
+                result = f"🔍 {len(items)} résultat(s) pour \"{arguments['query']}\":\n\n"
+                for index, item in enumerate(items):
+                    assignee = f" → {item['assignee_name']}" if item.get('assignee_name') else ""
+                    line = f"#{item['sequence_number']} - {item['title']}{assignee} (ID: {item['id']})\n"
+                    if index and len(result) + len(line) > OUTPUT_MAX_CHARS:
+                        result += f"  … et {len(items) - index} autres\n"
+                        break
+                    result += line
+                return [TextContent(type="text", text=result)]
+
+            elif name == "update_backlog_item":
+                item = await BacklogItem.find_by_id(arguments["item_id"])
+                if not item:
+                    return [TextContent(type="text", text="❌ Item introuvable")]
+
+                updates = {k: v for k, v in arguments.items() if k != "item_id" and v is not None}
+                await item.update(**updates)
+                return [TextContent(type="text", text=f"✅ Item #{item.sequence_number} mis à jour")]
+        
+            # ─── Tasks ───────────────────────────────────────────────────
+            elif name == "create_task":
+                space_id = arguments.get("space_id")
+                if not space_id:
+                    return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire")]
+            
+                backlog_item_id = arguments.get("backlog_item_id")
+                sequence_number = arguments.get("sequence_number")
+                title = arguments.get("title")
+            
+                if not title and not backlog_item_id and not sequence_number:
                     return [TextContent(type="text", text="❌ Erreur: title OU sequence_number OU backlog_item_id requis")]
-                
-                # Si sequence_number fourni, résoudre en backlog_item_id
-                if sequence_number and not backlog_item_id:
-                    item = await BacklogItem.find_by_sequence(space_id, sequence_number)
+            
+                # Lectures indépendantes regroupées en un aller-retour :
+                # workspace (si created_by_id absent), item existant, première colonne
+                created_by_id = arguments.get("created_by_id")
+                async with pipeline() as pipe:
+                    pending_space = None
+                    pending_item = None
+                    if title and not created_by_id:
+                        pending_space = await Space.find_by_id(space_id, pipe=pipe)
+                    elif not title and backlog_item_id:
+                        pending_item = await BacklogItem.find_by_id(backlog_item_id, pipe=pipe)
+                    elif not title:
+                        pending_item = await BacklogItem.find_by_sequence(space_id, sequence_number, pipe=pipe)
+                    pending_column = await Column.get_first_column_for_space(space_id, pipe=pipe)
+                first_column = pending_column.result()
+            
+                # OPTION 1: Création directe avec title (création automatique d'un backlog item)
+                if title:
+                    if not created_by_id:
+                        space = pending_space.result()
+                        if not space:
+                            return [TextContent(type="text", text=f"❌ Workspace '{space_id}' introuvable")]
+                        created_by_id = space.owner_id
+            
+                # OPTION 2/3: Lier à un item existant (sequence_number ou backlog_item_id)
+                else:
+                    item = pending_item.result()
                     if not item:
+                        if backlog_item_id:
+                            return [TextContent(type="text", text=f"❌ Item {backlog_item_id} introuvable")]
                         return [TextContent(type="text", text=f"❌ Item #{sequence_number} introuvable dans ce workspace")]
                     backlog_item_id = item.id
-                
-                # Vérifier que l'item existe
-                if backlog_item_id:
-                    item = await BacklogItem.find_by_id(backlog_item_id)
-                    if not item:
-                        return [TextContent(type="text", text=f"❌ Item {backlog_item_id} introuvable")]
-            
-            # Créer la tâche
-            task_id = await Task.create(
-                backlog_item_id=backlog_item_id,
-                assignee_id=arguments.get("assignee_id")
-            )
             
-            # Placer la tâche dans la première colonne "To Do"
-            first_column = await Column.get_first_column_for_space(space_id)
-            if first_column:
-                task = await Task.find_by_id(task_id)
-                await task.move_to_column(first_column['id'])
+                # Écritures regroupées en un aller-retour et une transaction :
+                # backlog item (option 1) + tâche + placement dans la première colonne
+                async with pipeline() as pipe:
+                    if title:
+                        backlog_item_id = await BacklogItem.create(
+                            space_id=space_id,
+                            title=title,
+                            created_by_id=created_by_id,
+                            description=arguments.get("description"),
+                            assignee_id=arguments.get("assignee_id"),
+                            pipe=pipe
+                        )
+                        pending_item = await BacklogItem.find_by_id(backlog_item_id, pipe=pipe)
+                
+                    task_id = await Task.create(
+                        backlog_item_id=backlog_item_id,
+                        assignee_id=arguments.get("assignee_id"),
+                        pipe=pipe
+                    )
+                
+                    # Placer la tâche dans la première colonne "To Do"
+                    if first_column:
+                        await Task(id=task_id).move_to_column(first_column['id'], pipe=pipe)
             
-            return [TextContent(type="text", text=f"✅ Tâche créée: #{item.sequence_number} - {item.title} et placée dans '{first_column['name']}'")]
-
-        elif name == "move_task":
-            task = await Task.find_by_id(arguments["task_id"])
-            if not task:
-                return [TextContent(type="text", text="❌ Tâche introuvable")]
-
-            await task.move_to_column(
-                column_id=arguments["column_id"],
-                position=arguments.get("position", 0)
-            )
-            return [TextContent(type="text", text=f"✅ Tâche déplacée vers la colonne {arguments['column_id']}")]
-
-        elif name == "assign_task":
-            task = await Task.find_by_id(arguments["task_id"])
-            if not task:
-                return [TextContent(type="text", text="❌ Tâche introuvable")]
-
-            await task.assign(arguments["assignee_id"])
-            return [TextContent(type="text", text=f"✅ Tâche assignée à {arguments['assignee_id']}")]
-
-        # ─── Colonnes ────────────────────────────────────────────────
-        elif name == "create_column":
-            space_id = arguments.get("space_id")
-            if not space_id:
-                return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire")]
-
-            column_id = await Column.create_for_space(
-                space_id=space_id,
-                name=arguments["name"],
-                position=arguments.get("position", 0),
-                wip_limit=arguments.get("wip_limit")
-            )
-
-            return [TextContent(type="text", text=f"✅ Colonne '{arguments['name']}' créée (ID: {column_id}) dans workspace {space_id}")]
-
-        elif name == "get_kanban_board":
-            space_id = arguments.get("space_id")
-            if not space_id:
-                return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire. Utilise get_board avec le space_id du contexte.")]
-
-            board = await Task.get_kanban_board(space_id)
-
-            result = "📊 Board Kanban:\n\n"
-            for column_name, data in board.items():
-                wip = f" (WIP: {data['column']['wip_limit']})" if data['column'].get('wip_limit') else ""
-                result += f"🔹 {column_name}{wip} ({len(data['tasks'])} tâches)\n"
-                for task in data['tasks'][:5]:  # Limiter à 5 pour lisibilité
-                    result += f"  - #{task['sequence_number']}: {task['title']}\n"
-                if len(data['tasks']) > 5:
-                    result += f"  ... et {len(data['tasks']) - 5} autres\n"
-                result += "\n"
-
-            return [TextContent(type="text", text=result)]
-
-        elif name == "get_column_tasks":
-            column = await Column.find_by_id(arguments["column_id"])
-            if not column:
-                return [TextContent(type="text", text="❌ Colonne introuvable")]
-
-            tasks = await column.get_tasks()
-            result = f"📋 Colonne '{column.name}' ({len(tasks)} tâches):\n\n"
-            for task in tasks:
-                result += f"- #{task['sequence_number']}: {task['title']}\n"
-            return [TextContent(type="text", text=result or "Aucune tâche")]
-
-        else:
-            return [TextContent(type="text", text=f"❌ Outil inconnu : {name}")]
+                item = pending_item.result()
+                placement = f" et placée dans '{first_column['name']}'" if first_column else " (aucune colonne configurée)"
+                return [TextContent(type="text", text=f"✅ Tâche créée: #{item.sequence_number} - {item.title}{placement}")]
+
+            elif name == "move_task":
+                task = await Task.find_by_id(arguments["task_id"])
+                if not task:
+                    return [TextContent(type="text", text="❌ Tâche introuvable")]
+
+                # Déplacement + contrôle WIP atomiques (pas de dépassement par des déplacements concurrents)
+                moved = await task.move(
+                    column_id=arguments["column_id"],
+                    position=arguments.get("position", 0)
+                )
+                if moved is None:
+                    return [TextContent(type="text", text="❌ Colonne introuvable")]
+                occupancy = f"{moved['count']}/{moved['wip_limit']}" if moved['wip_limit'] is not None else f"{moved['count']}"
+                if not moved['moved']:
+                    return [TextContent(type="text", text=f"⚠️ Limite WIP atteinte pour la colonne {arguments['column_id']} ({occupancy} tâches) - tâche non déplacée")]
+                return [TextContent(type="text", text=f"✅ Tâche déplacée vers la colonne {arguments['column_id']} ({occupancy} tâches)")]
+
+            elif name == "assign_task":
+                task = await Task.find_by_id(arguments["task_id"])
+                if not task:
+                    return [TextContent(type="text", text="❌ Tâche introuvable")]
+
+                await task.assign(arguments["assignee_id"])
+                return [TextContent(type="text", text=f"✅ Tâche assignée à {arguments['assignee_id']}")]
+
+            # ─── Colonnes ────────────────────────────────────────────────
+            elif name == "create_column":
+                space_id = arguments.get("space_id")
+                if not space_id:
+                    return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire")]
+
+                column_id = await Column.create_for_space(
+                    space_id=space_id,
+                    name=arguments["name"],
+                    position=arguments.get("position", 0),
+                    wip_limit=arguments.get("wip_limit")
+                )
+
+                return [TextContent(type="text", text=f"✅ Colonne '{arguments['name']}' créée (ID: {column_id}) dans workspace {space_id}")]
+
+            elif name == "get_kanban_board":
+                space_id = arguments.get("space_id")
+                if not space_id:
+                    return [TextContent(type="text", text="❌ Erreur: space_id est obligatoire. Utilise get_board avec le space_id du contexte.")]
+
+                board = await Task.get_kanban_board(space_id, limit=BOARD_TASKS_PER_COLUMN)
+
+                result = "📊 Board Kanban:\n\n" + _format_board(board, OUTPUT_MAX_CHARS)
+
+                return [TextContent(type="text", text=result)]
+
+            elif name == "get_column_tasks":
+                limit = arguments.get("limit") or 20
+                after_rank = after_task_id = None
+                if arguments.get("cursor"):
+                    try:
+                        column_id, after_rank, after_task_id = parse_column_task_cursor(arguments["cursor"])
+                    except ValueError:
+                        return [TextContent(type="text", text="❌ Curseur invalide - relance get_board ou get_column_tasks avec column_id")]
+                elif arguments.get("column_id"):
+                    column_id = arguments["column_id"]
+                else:
+                    return [TextContent(type="text", text="❌ Erreur: column_id ou cursor est obligatoire")]
+
+                column = await Column.find_by_id(column_id)
+                if not column:
+                    return [TextContent(type="text", text="❌ Colonne introuvable")]
+
+                tasks, next_cursor = await Column.get_tasks_page(column.id, limit, after_rank, after_task_id)
+                result = f"📋 Colonne '{column.name}' ({column.task_count} tâches):\n\n"
+                for index, task in enumerate(tasks):
+                    line = f"- #{task['sequence_number']}: {task['title']} <!-- {{\"task_id\":\"{task['id']}\"}} -->\n"
+                    if index and len(result) + len(line) > OUTPUT_MAX_CHARS:
+                        # Budget atteint : la page suivante reprend après la dernière tâche affichée
+                        next_cursor = column_task_cursor(column.id, tasks[index - 1])
+                        break
+                    result += line
+                if not tasks:
+                    result += "Aucune tâche\n"
+                if next_cursor:
+                    result += f"\n➡️ Suite : get_column_tasks cursor=\"{next_cursor}\""
+                return [TextContent(type="text", text=result)]
+
+            else:
+                return [TextContent(type="text", text=f"❌ Outil inconnu : {name}")]
             
+    except DeadlineExceeded as e:
+        logger.warning(f"⏱️ Délai dépassé dans l'outil {name}: {e}")
+        return [TextContent(type="text", text=f"⏱️ Délai dépassé ({TOOL_TIMEOUT:.0f}s) : la base de données n'a pas répondu à temps, réessaie plus tard")]
+    except DatabaseUnavailable as e:
+        logger.warning(f"🔴 Base indisponible pour l'outil {name}: {e}")
+        return [TextContent(type="text", text="🔴 Base de données momentanément indisponible, réessaie dans quelques secondes")]
     except Exception as e:
         logger.error(f"Erreur dans l'outil {name}: {e}")
         import traceback
@@ -0,0 +1,130 @@
+"""
+Fixtures communes des tests.
+
+Les tests qui demandent une base (`database`) créent une base PostgreSQL
+jetable, y appliquent les migrations Prisma (Backend/prisma/migrations) dans
+l'ordre, puis pointent le singleton `db` dessus :
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/postgres python -m pytest -q tests
+
+Sans TEST_DATABASE_URL (ou si le serveur est injoignable), ces tests sont ignorés.
+"""
+import asyncio
+import os
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, TypeVar
+
+import psycopg
+import pytest
+from psycopg.conninfo import make_conninfo
+
+from db import connection
+from db.connection import ShardDirectory, db
+from db.instrumentation import instrumentation
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "Backend" / "prisma" / "migrations"
+
+T = TypeVar("T")
+
+
+@pytest.fixture(scope="session")
+def admin_url() -> str:
+    """DSN d'administration (CREATE / DROP DATABASE) ; ignore le test sans serveur"""
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL non défini")
+    try:
+        psycopg.connect(url, connect_timeout=3).close()
+    except psycopg.OperationalError as e:
+        pytest.skip(f"Base de test injoignable: {e}")
+    return url
+
+
+@pytest.fixture(scope="session")
+def create_database(admin_url: str) -> Callable[[], str]:
+    """Fabrique de bases jetables migrées (supprimées en fin de session) ; renvoie leur DSN"""
+    created = []
+
+    def create() -> str:
+        name = f"apcs_test_{uuid.uuid4().hex[:12]}"
+        with psycopg.connect(admin_url, autocommit=True) as conn:
+            conn.execute(f'CREATE DATABASE "{name}"')
+        created.append(name)
+        url = make_conninfo(admin_url, dbname=name)
+        with psycopg.connect(url, autocommit=True) as conn:
+            for migration in sorted(MIGRATIONS.glob("*/migration.sql")):
+                conn.execute(migration.read_text())
+        return url
+
+    yield create
+
+    with psycopg.connect(admin_url, autocommit=True) as conn:
+        for name in created:
+            conn.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+
+
+@pytest.fixture(scope="session")
+def database_url(create_database: Callable[[], str]) -> str:
+    return create_database()
+
+
+@pytest.fixture
+def database(database_url: str):
+    """Base migrée pour le test (`db` pointé dessus), vidée après le test"""
+    previous = db.database_url, db.replica_url
+    db.database_url, db.replica_url = database_url, None
+    instrumentation.reset()
+    yield database_url
+    db.database_url, db.replica_url = previous
+    _truncate(database_url)
+
+
+@pytest.fixture(scope="session")
+def shard_url(create_database: Callable[[], str]) -> str:
+    return create_database()
+
+
+@pytest.fixture
+def shard(database: str, shard_url: str, tmp_path: Path):
+    """
+    Deuxième base migrée déclarée comme shard "eu2", vidée après le test ; renvoie
+    le chemin de l'annuaire JSON (à écrire par le test, relu à chaque appel)
+    """
+    directory = tmp_path / "shards.json"
+    previous = db.shard_urls, db.directory, db._shard_breakers, db._shard_pools
+    db.shard_urls = {"eu2": shard_url}
+    db.directory = ShardDirectory(str(directory), db.shard_urls, ttl=0)
+    db._shard_breakers = {"eu2": db._create_breaker("shard:eu2", lambda: db._probe_shard("eu2"))}
+    db._shard_pools = {}
+    connection._located.clear()
+    yield directory
+    db.shard_urls, db.directory, db._shard_breakers, db._shard_pools = previous
+    connection._located.clear()
+    _truncate(shard_url)
+
+
+def _truncate(url: str) -> None:
+    with psycopg.connect(url, autocommit=True) as conn:
+        tables = [
+            row[0] for row in conn.execute(
+                "SELECT tablename FROM pg_tables WHERE schemaname = 'public' AND tablename <> '_prisma_migrations'"
+            )
+        ]
+        conn.execute("TRUNCATE " + ", ".join(f'"{table}"' for table in tables) + " CASCADE")
+
+
+@pytest.fixture
+def run() -> Callable[[Awaitable[T]], T]:
+    """Exécuter une coroutine avec le pool ouvert (une boucle asyncio par appel)"""
+    def run(coro: Awaitable[T]) -> T:
+        async def main() -> T:
+            await db.connect()
+            try:
+                return await coro
+            finally:
+                await db.disconnect()
+
+        return asyncio.run(main())
+
+    return run
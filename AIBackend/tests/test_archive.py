@@ -0,0 +1,78 @@
+"""Archivage : sprints terminés et cartes de la dernière colonne déplacés dans les tables *_archive"""
+import psycopg
+import pytest
+
+from db.archive import ArchiveSweep
+
+_SEED = [
+    "INSERT INTO users (id, email, password_hash, name) VALUES ('owner', 'owner@example.test', 'x', 'Owner')",
+    """
+    INSERT INTO spaces (id, name, methodology, owner_id)
+    VALUES ('kanban', 'Kanban', 'KANBAN', 'owner'), ('scrum', 'Scrum', 'SCRUM', 'owner')
+    """,
+    """
+    INSERT INTO sprints (id, space_id, name, status, start_date, end_date)
+    VALUES ('sprint', 'scrum', 'Sprint 1', 'COMPLETED', CURRENT_DATE - 90, CURRENT_DATE - 60)
+    """,
+    # "Terminé" est la colonne de plus grande position
+    """
+    INSERT INTO columns (id, space_id, name, position)
+    VALUES ('todo', 'kanban', 'À faire', 0), ('done', 'kanban', 'Terminé', 1)
+    """,
+    "INSERT INTO columns (id, sprint_id, name, position, wip_limit) VALUES ('sprint-c', 'sprint', 'Sprint', 0, 5)",
+    """
+    INSERT INTO backlog_items (id, space_id, title, sequence_number, created_by_id)
+    VALUES ('bi1', 'kanban', 'Ancienne', 1, 'owner'), ('bi2', 'kanban', 'Récente', 2, 'owner'),
+           ('bi3', 'kanban', 'En cours', 3, 'owner'), ('bi4', 'scrum', 'Story', 4, 'owner')
+    """,
+    "INSERT INTO sprint_backlog_items (id, sprint_id, backlog_item_id, story_points, rank) VALUES ('sbi', 'sprint', 'bi4', 3, 'a')",
+    """
+    INSERT INTO tasks (id, backlog_item_id, sprint_backlog_item_id, assignee_id)
+    VALUES ('old', 'bi1', NULL, 'owner'), ('recent', 'bi2', NULL, NULL), ('doing', 'bi3', NULL, NULL),
+           ('story', NULL, 'sbi', 'owner')
+    """,
+    """
+    INSERT INTO columns_tasks (id, column_id, task_id, moved_at, rank)
+    VALUES ('ct-old', 'done', 'old', now() - interval '60 days', 'b'),
+           ('ct-recent', 'done', 'recent', now(), 'c'),
+           ('ct-doing', 'todo', 'doing', now() - interval '60 days', 'd'),
+           ('ct-story', 'sprint-c', 'story', now() - interval '60 days', 'e')
+    """,
+]
+
+
+@pytest.fixture
+def archivable(database):
+    with psycopg.connect(database, autocommit=True) as conn:
+        for statement in _SEED:
+            conn.execute(statement)
+
+
+def _rows(url: str, query: str) -> list[tuple]:
+    with psycopg.connect(url) as conn:
+        return conn.execute(query).fetchall()
+
+
+def test_sweep_moves_completed_sprints_and_done_cards(archivable, database, run):
+    result = run(ArchiveSweep(after_days=30, batch_size=10).run())
+
+    assert (result["sprints"], result["cards"], result["errors"]) == (1, 1, 0)
+    assert _rows(database, "SELECT id FROM tasks ORDER BY id") == [("doing",), ("recent",)]
+    assert _rows(database, "SELECT id FROM tasks_archive ORDER BY id") == [("old",), ("story",)]
+    # Colonnes copiées une à une (pas de décalage de valeurs)
+    assert _rows(database, "SELECT id, backlog_item_id, sprint_backlog_item_id, assignee_id FROM tasks_archive ORDER BY id") == [
+        ("old", "bi1", None, "owner"), ("story", None, "sbi", "owner")
+    ]
+    assert _rows(database, "SELECT id, column_id, rank FROM columns_tasks_archive ORDER BY id") == [
+        ("ct-old", "done", "b"), ("ct-story", "sprint-c", "e")
+    ]
+    assert _rows(database, "SELECT id, name, position, wip_limit FROM columns_archive") == [("sprint-c", "Sprint", 0, 5)]
+    assert _rows(database, "SELECT id, story_points, rank FROM sprint_backlog_items_archive") == [("sbi", 3, "a")]
+    assert _rows(database, "SELECT archived_at IS NOT NULL FROM sprints") == [(True,)]
+
+
+def test_sweep_is_idempotent(archivable, run):
+    sweep = ArchiveSweep(after_days=30, batch_size=10)
+    run(sweep.run())
+    again = run(sweep.run())
+    assert (again["sprints"], again["cards"], again["errors"]) == (0, 0, 0)
@@ -0,0 +1,69 @@
+"""Import NDJSON / CSV du Product Backlog : lignes invalides signalées avec leur numéro, lots précédents gardés"""
+import psycopg
+import pytest
+
+httpx = pytest.importorskip("httpx")
+main = pytest.importorskip("api.main")
+
+from api.routes import backlog  # noqa: E402
+
+_SEED = [
+    "INSERT INTO users (id, email, password_hash, name) VALUES ('owner', 'owner@example.test', 'x', 'Owner')",
+    "INSERT INTO spaces (id, name, methodology, owner_id) VALUES ('kanban', 'Kanban', 'KANBAN', 'owner')",
+]
+
+
+@pytest.fixture
+def space(database, monkeypatch):
+    with psycopg.connect(database, autocommit=True) as conn:
+        for statement in _SEED:
+            conn.execute(statement)
+    monkeypatch.setattr(backlog, "IMPORT_BATCH_SIZE", 2)
+
+
+def _import(body: str, content_type: str):
+    # Application complète : middleware d'unité de travail par requête compris
+    app = main.create_app()
+
+    async def post():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post(
+                "/v1/backlog/kanban/import",
+                params={"created_by_id": "owner"},
+                content=body.encode(),
+                headers={"content-type": content_type},
+            )
+
+    return post()
+
+
+def _titles(url: str) -> list[str]:
+    with psycopg.connect(url) as conn:
+        return [row[0] for row in conn.execute("SELECT title FROM backlog_items ORDER BY sequence_number")]
+
+
+def test_ndjson_import(space, database, run):
+    body = '{"title": "A"}\n\n{"title": "B", "description": "d"}\n{"title": "C"}\n'
+    response = run(_import(body, "application/x-ndjson"))
+    assert response.status_code == 200
+    assert response.json()["imported"] == 3
+    assert _titles(database) == ["A", "B", "C"]
+
+
+@pytest.mark.parametrize("line", ['[1, 2]', '"titre"', '{"title": '])
+def test_ndjson_rejects_non_objects_with_line_number(space, database, run, line):
+    body = '{"title": "A"}\n{"title": "B"}\n\n' + line + '\n{"title": "D"}\n'
+    response = run(_import(body, "application/x-ndjson"))
+    assert response.status_code == 400
+    assert "ligne 4" in response.json()["detail"]
+    # Le premier lot (2 items) reste commité malgré l'annulation de l'unité de travail de la requête
+    assert "2 items déjà importés" in response.json()["detail"]
+    assert _titles(database) == ["A", "B"]
+
+
+def test_csv_reports_missing_title_line(space, database, run):
+    body = 'title,description\nA,"sur\ndeux lignes"\n,sans titre\n'
+    response = run(_import(body, "text/csv"))
+    assert response.status_code == 400
+    assert "ligne 4: title requis" in response.json()["detail"]
+    assert _titles(database) == []
@@ -0,0 +1,40 @@
+"""IDs CUID croissants (utils.generate_cuid / generate_cuids)"""
+import pytest
+
+import utils
+from utils import generate_cuid, generate_cuids
+
+
+def test_ids_are_increasing_and_unique():
+    ids = [generate_cuid() for _ in range(1000)] + generate_cuids(5000) + [generate_cuid()]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert {len(id_) for id_ in ids} == {25}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge figée par le test ; état du générateur restauré après le test"""
+    monkeypatch.setattr(utils, "_last_ms", 0)
+    monkeypatch.setattr(utils, "_counter", 0)
+    monkeypatch.setattr(utils, "_last_prefix", (-1, ""))
+
+    def set_ms(ms: int) -> None:
+        monkeypatch.setattr(utils.time, "time", lambda: ms / 1000)
+
+    return set_ms
+
+
+def test_counter_overflow_borrows_the_next_millisecond(clock):
+    clock(1_800_000_000_000)
+    ids = generate_cuids(36 ** 4 + 10)
+    assert ids == sorted(ids)
+    assert ids[0][:9] < ids[-1][:9]
+
+
+def test_timestamps_past_2059_are_rejected(clock):
+    clock(36 ** 8 - 2)
+    assert generate_cuid().startswith("czzzzzzz")
+    clock(36 ** 8)
+    with pytest.raises(OverflowError):
+        generate_cuid()
@@ -0,0 +1,95 @@
+"""Déplacements concurrents (Task.move, trigger de compteur) : rangs distincts, limite WIP tenue, pas de deadlock, compteurs réparés"""
+import asyncio
+
+import psycopg
+import pytest
+
+from db.tables import Column, Task
+
+MOVES = 8
+ROUNDS = 500
+
+_SEED = [
+    "INSERT INTO users (id, email, password_hash, name) VALUES ('owner', 'owner@example.test', 'x', 'Owner')",
+    "INSERT INTO spaces (id, name, methodology, owner_id) VALUES ('kanban', 'Kanban', 'KANBAN', 'owner')",
+    """
+    INSERT INTO columns (id, space_id, name, position, wip_limit)
+    VALUES ('todo', 'kanban', 'À faire', 0, NULL), ('doing', 'kanban', 'En cours', 1, %(wip)s)
+    """,
+    """
+    INSERT INTO backlog_items (id, space_id, title, sequence_number, created_by_id)
+    SELECT 'bi' || n, 'kanban', 'Item ' || n, n, 'owner' FROM generate_series(1, %(tasks)s) n
+    """,
+    "INSERT INTO tasks (id, backlog_item_id) SELECT 't' || n, 'bi' || n FROM generate_series(1, %(tasks)s) n",
+    """
+    INSERT INTO columns_tasks (id, column_id, task_id)
+    SELECT 'ct' || n, CASE WHEN n <= 2 THEN 'doing' ELSE 'todo' END, 't' || n FROM generate_series(1, %(tasks)s) n
+    """,
+]
+
+
+def _seed(url: str, wip: int = None) -> None:
+    with psycopg.connect(url, autocommit=True) as conn:
+        for statement in _SEED:
+            conn.execute(statement, {"wip": wip, "tasks": MOVES + 2})
+
+
+async def _move_all(position: int = None) -> list[dict]:
+    tasks = [Task(id=f"t{n}", backlog_item_id=f"bi{n}") for n in range(3, MOVES + 3)]
+    return await asyncio.gather(*(task.move("doing", position) for task in tasks))
+
+
+def _ranks(url: str) -> list[str]:
+    with psycopg.connect(url) as conn:
+        return [row[0] for row in conn.execute("SELECT rank FROM columns_tasks WHERE column_id = 'doing'")]
+
+
+@pytest.mark.parametrize("position", [None, 1])
+def test_concurrent_moves_get_distinct_ranks(database, run, position):
+    _seed(database)
+    results = run(_move_all(position))
+    assert all(result["moved"] for result in results)
+    ranks = _ranks(database)
+    assert len(ranks) == MOVES + 2
+    assert len(set(ranks)) == len(ranks)
+
+
+def test_concurrent_moves_respect_the_wip_limit(database, run):
+    _seed(database, wip=4)
+    results = run(_move_all(1))
+    assert sum(result["moved"] for result in results) == 2
+    assert len(_ranks(database)) == 4
+
+
+def test_opposite_moves_do_not_deadlock(database, run):
+    # Va-et-vient croisés entre deux colonnes : le trigger de compteur verrouille les deux lignes de columns
+    _seed(database)
+
+    async def shuttle(task_id: str, there: str, back: str) -> None:
+        async with await psycopg.AsyncConnection.connect(database, autocommit=True) as conn:
+            for _ in range(ROUNDS):
+                for column_id in (there, back):
+                    await conn.execute("UPDATE columns_tasks SET column_id = %s WHERE task_id = %s", (column_id, task_id))
+
+    async def scenario():
+        # t1, t2 partent de "doing", t3, t4 de "todo"
+        await asyncio.gather(
+            shuttle("t1", "todo", "doing"), shuttle("t2", "todo", "doing"),
+            shuttle("t3", "doing", "todo"), shuttle("t4", "doing", "todo"),
+        )
+
+    run(scenario())
+    with psycopg.connect(database) as conn:
+        counts = dict(conn.execute("SELECT id, task_count FROM columns").fetchall())
+    assert counts == {"todo": MOVES, "doing": 2}
+
+
+def test_repair_task_counts(database, run):
+    _seed(database)
+    with psycopg.connect(database, autocommit=True) as conn:
+        # Dérive : compteurs écrits hors trigger
+        conn.execute("UPDATE columns SET task_count = 0")
+
+    repaired = run(Column.repair_task_counts())
+    assert sorted((row["id"], row["task_count"], row["previous"]) for row in repaired) == [("doing", 2, 0), ("todo", MOVES, 0)]
+    assert run(Column.repair_task_counts()) == []
@@ -0,0 +1,21 @@
+"""Plans d'exécution des requêtes des modèles sur le jeu de données synthétique (python -m db.plans)"""
+import psycopg
+
+from db.plans import check_plans
+
+
+def test_model_queries_are_served_by_indexes(database, run):
+    assert run(check_plans()) == {}
+
+
+def test_missing_index_is_reported(database, run):
+    with psycopg.connect(database, autocommit=True) as conn:
+        conn.execute('DROP INDEX "backlog_items_space_id_rank_id_idx"')
+    try:
+        failures = run(check_plans(spaces=100))
+    finally:
+        with psycopg.connect(database, autocommit=True) as conn:
+            conn.execute(
+                'CREATE INDEX "backlog_items_space_id_rank_id_idx" ON "backlog_items"("space_id", "rank", "id")'
+            )
+    assert "backlog_item.get_page" in failures
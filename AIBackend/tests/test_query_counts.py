@@ -0,0 +1,107 @@
+"""Allers-retours des chemins chauds : boards (get_board) et création de tâche (create_task)"""
+import psycopg
+import pytest
+
+from db.instrumentation import instrumentation
+from db.tables import Task
+
+COLUMNS = 12
+TASKS_PER_COLUMN = 3
+
+# Workspace KANBAN "kanban" et workspace SCRUM "scrum" (sprint actif "sprint"), 12 colonnes de 3 tâches chacun
+_SEED = [
+    "INSERT INTO users (id, email, password_hash, name) VALUES ('owner', 'owner@example.test', 'x', 'Owner')",
+    """
+    INSERT INTO spaces (id, name, methodology, owner_id)
+    VALUES ('kanban', 'Kanban', 'KANBAN', 'owner'), ('scrum', 'Scrum', 'SCRUM', 'owner')
+    """,
+    """
+    INSERT INTO sprints (id, space_id, name, status, start_date, end_date)
+    VALUES ('sprint', 'scrum', 'Sprint 1', 'ACTIVE', CURRENT_DATE, CURRENT_DATE + 14)
+    """,
+    """
+    INSERT INTO columns (id, space_id, name, position)
+    SELECT 'kanban-c' || p, 'kanban', 'Colonne ' || p, p FROM generate_series(0, %(columns)s - 1) p
+    """,
+    """
+    INSERT INTO columns (id, sprint_id, name, position)
+    SELECT 'sprint-c' || p, 'sprint', 'Colonne ' || p, p FROM generate_series(0, %(columns)s - 1) p
+    """,
+    """
+    INSERT INTO backlog_items (id, space_id, title, sequence_number, created_by_id)
+    SELECT space || '-bi' || n, space, 'Item ' || n, n, 'owner'
+    FROM unnest(ARRAY['kanban', 'scrum']) space, generate_series(1, %(columns)s * %(tasks)s) n
+    """,
+    """
+    INSERT INTO sprint_backlog_items (id, sprint_id, backlog_item_id, story_points)
+    SELECT 'sbi' || n, 'sprint', 'scrum-bi' || n, 3 FROM generate_series(1, %(columns)s * %(tasks)s) n
+    """,
+    """
+    INSERT INTO tasks (id, backlog_item_id) SELECT 'kanban-t' || n, 'kanban-bi' || n
+    FROM generate_series(1, %(columns)s * %(tasks)s) n
+    """,
+    """
+    INSERT INTO tasks (id, sprint_backlog_item_id) SELECT 'sprint-t' || n, 'sbi' || n
+    FROM generate_series(1, %(columns)s * %(tasks)s) n
+    """,
+    """
+    INSERT INTO columns_tasks (id, column_id, task_id)
+    SELECT board || '-ct' || n, board || '-c' || mod(n, %(columns)s), board || '-t' || n
+    FROM unnest(ARRAY['kanban', 'sprint']) board, generate_series(1, %(columns)s * %(tasks)s) n
+    """,
+]
+
+
+def _round_trips() -> int:
+    """Allers-retours enregistrés depuis le dernier reset (un pipeline compte pour un)"""
+    return sum(stats.calls for stats in instrumentation.by_fingerprint.values())
+
+
+@pytest.fixture
+def boards(database):
+    with psycopg.connect(database, autocommit=True) as conn:
+        for statement in _SEED:
+            conn.execute(statement, {"columns": COLUMNS, "tasks": TASKS_PER_COLUMN})
+    instrumentation.reset()
+
+
+def test_kanban_board_is_one_query(boards, run):
+    board = run(Task.get_kanban_board("kanban"))
+    assert _round_trips() == 1
+    assert len(board) == COLUMNS
+    assert all(len(entry["tasks"]) == TASKS_PER_COLUMN for entry in board.values())
+
+
+def test_kanban_board_summary_is_one_query(boards, run):
+    board = run(Task.get_kanban_board("kanban", limit=2))
+    assert _round_trips() == 1
+    assert all(len(entry["tasks"]) == 2 and entry["total"] == TASKS_PER_COLUMN for entry in board.values())
+
+
+def test_sprint_board_is_one_query(boards, run):
+    board = run(Task.get_sprint_board("sprint"))
+    assert _round_trips() == 1
+    assert len(board) == COLUMNS
+    assert all(len(entry["tasks"]) == TASKS_PER_COLUMN for entry in board.values())
+
+
+@pytest.mark.parametrize("space_id", ["kanban", "scrum"])
+def test_get_board_tool_round_trips(boards, run, space_id):
+    workflow = pytest.importorskip("mcps.workflow_mcp")
+    result = run(workflow.call_workflow_tool("get_board", {"space_id": space_id}))
+    assert "Colonne 11" in result[0].text
+    # Workspace + sprint actif (pipeline), board résumé, puis taille du backlog (KANBAN) ou
+    # sprint backlog (SCRUM) : indépendant du nombre de colonnes
+    assert _round_trips() == 3
+
+
+def test_create_task_tool_round_trips(boards, run):
+    workflow = pytest.importorskip("mcps.workflow_mcp")
+    result = run(workflow.call_workflow_tool(
+        "create_task", {"space_id": "kanban", "title": "Nouvelle tâche", "created_by_id": "owner"}
+    ))
+    assert result[0].text.startswith("✅")
+    # Lectures (première colonne) puis écritures (item, tâche, placement) : deux pipelines
+    assert _round_trips() == 2
+    board = run(Task.get_kanban_board("kanban"))
+    assert "Nouvelle tâche" in [task["title"] for task in board["Colonne 0"]["tasks"]]
@@ -0,0 +1,159 @@
+"""Clés de rang : ajouts en fin de groupe, ordre, accord Python / SQL (rank_after, rank_between), rééquilibrage et listes complètes"""
+import asyncio
+import math
+
+import psycopg
+import pytest
+
+from db.tables import BacklogItem, Column
+from db.cursors import MAX_PAGE_SIZE
+from db.ranking import DIGITS, group_lock_key, rank_after, rank_between, ranks_between, rebalance, spread_ranks
+
+
+def _appends(count: int, start: str = None) -> list[str]:
+    ranks = []
+    for _ in range(count):
+        start = rank_after(start)
+        ranks.append(start)
+    return ranks
+
+
+def test_appends_keep_keys_short():
+    for count in (200, 5_000, 50_000):
+        ranks = _appends(count)
+        assert ranks == sorted(ranks)
+        assert len(set(ranks)) == count
+        # Chiffre de largeur + ~log36(N) chiffres
+        assert max(map(len, ranks)) <= 2 + math.ceil(math.log(count, 36))
+
+
+def test_appends_never_end_with_zero():
+    assert not any(rank.endswith("0") for rank in _appends(5_000))
+
+
+def test_rank_between_without_upper_bound_appends():
+    before = None
+    for _ in range(1_000):
+        rank = rank_between(before, None)
+        assert before is None or rank > before
+        before = rank
+    assert len(before) <= 3
+
+
+def test_ranks_between_append_batch():
+    ranks = ranks_between("1z", None, 2_000)
+    assert ranks == sorted(ranks) and ranks[0] > "1z"
+    assert max(map(len, ranks)) <= 4
+
+
+def test_insert_between_and_after():
+    ranks = _appends(50)
+    middle = rank_between(ranks[10], ranks[11])
+    assert ranks[10] < middle < ranks[11]
+    # Ajout après une clé insérée au milieu, ou après une ancienne clé sans préfixe de largeur
+    for before in (middle, ranks[-1] + "i", "000000001i", "i", "zz", spread_ranks(300)[-1]):
+        assert rank_after(before) > before
+
+
+def test_spread_then_append_stays_short():
+    spread = spread_ranks(1_000)
+    assert spread == sorted(spread)
+    ranks = _appends(1_000, spread[-1])
+    assert ranks[0] > spread[-1]
+    assert max(map(len, ranks)) <= 2 + math.ceil(math.log(2_000, 36))
+
+
+def test_sql_rank_after_matches_python(database):
+    keys = [None, "000000001i", "i", "r", "zz", "1z", "1zi", "2zz", "3zzz", DIGITS[35] + "z" * 34]
+    keys += _appends(3_000)[::7] + spread_ranks(500)[::13]
+    with psycopg.connect(database) as conn:
+        for key in keys:
+            assert conn.execute("SELECT rank_after(%s)", (key,)).fetchone()[0] == rank_after(key), key
+        # Suite d'ajouts côté SQL (trigger assign_rank)
+        sql_ranks = conn.execute("""
+            WITH RECURSIVE appends(n, rank) AS (
+                SELECT 1, rank_after(NULL)
+                UNION ALL SELECT n + 1, rank_after(rank) FROM appends WHERE n < 2000
+            )
+            SELECT rank FROM appends ORDER BY n
+        """).fetchall()
+    assert [row[0] for row in sql_ranks] == _appends(2_000)
+
+
+def test_sql_rank_between_matches_python(database):
+    # Fonction utilisée par le backend Node (déplacement de carte)
+    ranks = _appends(300)
+    pairs = [(None, None), (None, "11"), (None, "0001"), ("1z", None), ("1z", "2"), ("11", "11"), ("12", "11"), ("a", "a1")]
+    pairs += list(zip(ranks, ranks[1:]))[::11] + [(rank_between(a, b), b) for a, b in zip(ranks, ranks[1:])][::17]
+    with psycopg.connect(database) as conn:
+        for before, after in pairs:
+            sql = conn.execute("SELECT rank_between(%s, %s)", (before, after)).fetchone()[0]
+            assert sql == rank_between(before, after), (before, after)
+
+
+_BOARD = [
+    "INSERT INTO users (id, email, password_hash, name) VALUES ('owner', 'owner@example.test', 'x', 'Owner')",
+    "INSERT INTO spaces (id, name, methodology, owner_id) VALUES ('kanban', 'Kanban', 'KANBAN', 'owner')",
+    "INSERT INTO columns (id, space_id, name, position) VALUES ('todo', 'kanban', 'À faire', 0)",
+    """
+    INSERT INTO backlog_items (id, space_id, title, sequence_number, created_by_id)
+    SELECT 'bi' || n, 'kanban', 'Item ' || n, n, 'owner' FROM generate_series(1, 5) n
+    """,
+    "INSERT INTO tasks (id, backlog_item_id) SELECT 't' || n, 'bi' || n FROM generate_series(1, 5) n",
+    "INSERT INTO columns_tasks (id, column_id, task_id) SELECT 'ct' || n, 'todo', 't' || n FROM generate_series(1, 5) n",
+]
+
+
+@pytest.mark.parametrize("advisory_lock", [True, False], ids=["move", "node-write"])
+def test_rebalance_keeps_a_concurrent_move(database, run, advisory_lock):
+    with psycopg.connect(database, autocommit=True) as conn:
+        for statement in _BOARD:
+            conn.execute(statement)
+
+    async def scenario():
+        # Déplacement de t5 en tête, transaction encore ouverte quand le rééquilibrage démarre
+        async with await psycopg.AsyncConnection.connect(database) as move:
+            if advisory_lock:
+                await move.execute(
+                    "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", (group_lock_key("columns_tasks", "todo"),)
+                )
+            await move.execute(
+                "UPDATE columns_tasks SET rank = (SELECT '0' || MIN(rank) FROM columns_tasks) WHERE task_id = 't5'"
+            )
+            rebalancing = asyncio.create_task(rebalance("columns_tasks", "todo"))
+            await asyncio.sleep(0.3)
+            assert not rebalancing.done()
+            await move.commit()
+            return await rebalancing
+
+    assert run(scenario()) == 5
+    with psycopg.connect(database) as conn:
+        order = [row[0] for row in conn.execute("SELECT task_id FROM columns_tasks ORDER BY rank, task_id")]
+    assert order == ["t5", "t1", "t2", "t3", "t4"]
+
+
+def test_full_lists_span_pages_in_rank_order(database, run):
+    count = 2 * MAX_PAGE_SIZE + 50
+    with psycopg.connect(database, autocommit=True) as conn:
+        for statement in _BOARD[:3]:
+            conn.execute(statement)
+        # Rangs dans le désordre des identifiants, avec des égalités (départagées par l'identifiant)
+        conn.execute("""
+            INSERT INTO backlog_items (id, space_id, title, sequence_number, created_by_id, rank)
+            SELECT 'bi' || n, 'kanban', 'Item ' || n, n, 'owner', md5((n / 2)::text) FROM generate_series(1, %s) n
+        """, (count,))
+        conn.execute("INSERT INTO tasks (id, backlog_item_id) SELECT 't' || n, 'bi' || n FROM generate_series(1, %s) n", (count,))
+        conn.execute("""
+            INSERT INTO columns_tasks (id, column_id, task_id, rank)
+            SELECT 'ct' || n, 'todo', 't' || n, md5((n / 2)::text) FROM generate_series(1, %s) n
+        """, (count,))
+        items = [row[0] for row in conn.execute("SELECT id FROM backlog_items ORDER BY rank, id")]
+        tasks = [row[0] for row in conn.execute("SELECT task_id FROM columns_tasks ORDER BY rank, task_id")]
+
+    async def scenario():
+        column = await Column.find_by_id("todo")
+        return await BacklogItem.get_by_space("kanban"), await column.get_tasks()
+
+    by_space, column_tasks = run(scenario())
+    assert [row["id"] for row in by_space] == items
+    assert [row["id"] for row in column_tasks] == tasks
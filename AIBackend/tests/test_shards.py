@@ -0,0 +1,130 @@
+"""Routage par shard (routed, locate, fan_out), rejet des écritures inter-shards et copie des utilisateurs"""
+import json
+
+import psycopg
+import pytest
+
+from db.connection import CrossShardError, locate, pipeline, transaction
+from db.tables import Column, Space, Sprint, User
+
+# Workspaces intercalés dans le temps : a et c sur la base par défaut, b et d sur eu2
+_SPACES = {"a": None, "b": "eu2", "c": None, "d": "eu2"}
+
+
+def _seed(url: str, spaces: list[str]) -> None:
+    with psycopg.connect(url, autocommit=True) as conn:
+        conn.execute("INSERT INTO users (id, email, password_hash, name) VALUES ('owner', 'owner@example.test', 'x', 'Owner')")
+        for space in spaces:
+            day = ord(space) - ord("a") + 1
+            conn.execute(
+                """
+                INSERT INTO spaces (id, name, methodology, owner_id, created_at)
+                VALUES (%s, %s, 'SCRUM', 'owner', make_date(2026, 1, %s))
+                """,
+                (f"space-{space}", space.upper(), day)
+            )
+            conn.execute(
+                """
+                INSERT INTO sprints (id, space_id, name, status, start_date, end_date)
+                VALUES (%s, %s, 'Sprint', 'ACTIVE', CURRENT_DATE, CURRENT_DATE + 14)
+                """,
+                (f"sprint-{space}", f"space-{space}")
+            )
+
+
+def _count(url: str, query: str, params: tuple = ()) -> int:
+    with psycopg.connect(url) as conn:
+        return conn.execute(query, params).fetchone()[0]
+
+
+@pytest.fixture
+def spaces(database, shard, shard_url):
+    _seed(database, [space for space, name in _SPACES.items() if name is None])
+    _seed(shard_url, [space for space, name in _SPACES.items() if name == "eu2"])
+    shard.write_text(json.dumps({f"space-{space}": name for space, name in _SPACES.items() if name}))
+
+
+def test_writes_follow_the_space_directory(spaces, database, shard_url, run):
+    async def scenario():
+        await Column.create_for_space("space-a", "Défaut")
+        await Column.create_for_space("space-b", "Eu2")
+        return await Column.get_by_space("space-b")
+
+    columns = run(scenario())
+    assert [column.name for column in columns] == ["Eu2"]
+    assert _count(database, "SELECT count(*) FROM columns WHERE space_id = 'space-a'") == 1
+    assert _count(shard_url, "SELECT count(*) FROM columns WHERE space_id = 'space-b'") == 1
+    assert _count(database, "SELECT count(*) FROM columns WHERE space_id = 'space-b'") == 0
+
+
+def test_locate_finds_the_row_shard(spaces, run):
+    async def scenario():
+        return (
+            await locate("sprints", "sprint-d"),
+            await locate("sprints", "sprint-c"),
+            await locate("sprints", "missing"),
+            await Sprint.find_by_id("sprint-d"),
+        )
+
+    on_eu2, on_default, missing, sprint = run(scenario())
+    assert (on_eu2, on_default, missing) == ("eu2", None, None)
+    assert sprint.space_id == "space-d"
+
+
+def test_fan_out_merges_shards_in_order(spaces, run):
+    async def scenario():
+        everything = await Space.get_by_user("owner")
+        first, cursor = await Space.get_page_by_user("owner", limit=3)
+        rest, end = await Space.get_page_by_user("owner", limit=3, cursor=cursor)
+        return everything, first, rest, end
+
+    everything, first, rest, end = run(scenario())
+    assert [space.id for space in everything] == ["space-d", "space-c", "space-b", "space-a"]
+    assert [space.id for space in first] == ["space-d", "space-c", "space-b"]
+    assert [space.id for space in rest] == ["space-a"]
+    assert end is None
+
+
+def test_transaction_rejects_a_second_shard(spaces, database, run):
+    async def scenario():
+        async with transaction():
+            await Column.create_for_space("space-a", "Défaut")
+            await Column.create_for_space("space-b", "Eu2")
+
+    with pytest.raises(CrossShardError):
+        run(scenario())
+    # Rien n'est commité sur la base de la transaction
+    assert _count(database, "SELECT count(*) FROM columns") == 0
+
+
+def test_pipeline_rejects_a_second_shard(spaces, run):
+    async def scenario():
+        async with pipeline() as pipe:
+            await Space.find_by_id("space-a", pipe=pipe)
+            await Space.find_by_id("space-b", pipe=pipe)
+
+    with pytest.raises(CrossShardError):
+        run(scenario())
+
+
+def test_users_are_copied_to_shards(spaces, database, shard_url, run):
+    with psycopg.connect(database, autocommit=True) as conn:
+        # Créé hors AIBackend (backend Node) : absent du shard jusqu'au rattrapage
+        conn.execute("INSERT INTO users (id, email, password_hash, name) VALUES ('node', 'node@example.test', 'x', 'Node')")
+        conn.execute("UPDATE users SET name = 'Renamed' WHERE id = 'owner'")
+
+    created = run(User.create("new@example.test", "x", "New"))
+    # Copié dès sa création
+    assert _count(shard_url, "SELECT count(*) FROM users WHERE id = %s", (created,)) == 1
+    assert _count(shard_url, "SELECT count(*) FROM users WHERE id = 'node'") == 0
+
+    assert run(User.replicate()) == 3
+    assert _count(shard_url, "SELECT count(*) FROM users WHERE id IN ('node', %s)", (created,)) == 2
+    assert _count(shard_url, "SELECT count(*) FROM users WHERE id = 'owner' AND name = 'Renamed'") == 1
+    # Clé étrangère satisfaite sur le shard : le nouvel utilisateur peut y être assigné
+    with psycopg.connect(shard_url, autocommit=True) as conn:
+        conn.execute(
+            "INSERT INTO backlog_items (id, space_id, title, sequence_number, created_by_id, assignee_id) "
+            "VALUES ('bi', 'space-b', 'Item', 1, 'node', %s)",
+            (created,)
+        )
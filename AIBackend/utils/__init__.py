@@ -1,33 +1,135 @@
 """
 Utilitaires généraux pour l'application APCS.
 """
+import os
 import secrets
+import socket
+import threading
 import time
 
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+# Largeurs fixes (format CUID v1 de Prisma, 25 caractères) : comparer deux IDs
+# comme des chaînes revient à comparer (timestamp, compteur)
+_TIMESTAMP_WIDTH = 8  # millisecondes depuis 1970 : 36^8 ms, soit jusqu'en 2059
+_TIMESTAMP_LIMIT = 36 ** _TIMESTAMP_WIDTH
+_COUNTER_WIDTH = 4
+_RANDOM_WIDTH = 8
+_COUNTER_SPACE = 36 ** _COUNTER_WIDTH
+
+# Paires de chiffres base36 précalculées : deux chiffres par division
+_PAIRS = [a + b for a in _BASE36 for b in _BASE36]
+_BYTE_TO_BASE36 = bytes(ord(_BASE36[byte % 36]) for byte in range(256))
+
+
+def _encode(num: int, width: int) -> str:
+    """Nombre en base36 sur `width` caractères (largeur paire, chiffres de poids faible gardés), zéros à gauche"""
+    pairs = []
+    for _ in range(width // 2):
+        num, pair = divmod(num, 1296)
+        pairs.append(_PAIRS[pair])
+    return "".join(reversed(pairs))
+
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+_last_prefix = (-1, "")
+
+
+def _fingerprint() -> str:
+    """Empreinte du processus (pid + machine) sur 4 caractères, comme CUID v1"""
+    host = socket.gethostname()
+    host_id = sum(ord(char) for char in host) + len(host) + 36
+    return _encode(os.getpid(), 2) + _encode(host_id, 2)
+
+
+_FINGERPRINT = _fingerprint()
+
+
+def _reset_after_fork() -> None:
+    # Processus enfant (workers) : nouvelle empreinte, état du compteur indépendant
+    global _FINGERPRINT, _last_ms, _counter, _lock
+    _FINGERPRINT = _fingerprint()
+    _last_ms = 0
+    _counter = 0
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 
 def generate_cuid() -> str:
     """
     Génère un ID unique compatible avec le format CUID utilisé par Prisma.
-    Format: c + timestamp (base36) + random (16 chars)
-    Exemple: clxxx9a8b7c6d5e4f3g2h1
-    """
-    # Timestamp en base36
-    timestamp = int(time.time() * 1000)
-    ts_part = _to_base36(timestamp)
-    
-    # Partie aléatoire (16 caractères base36)
-    random_part = secrets.token_hex(8)  # 16 hex chars
-    
-    return f"c{ts_part}{random_part}"[:25]  # CUID typique ~25 chars
-
-
-def _to_base36(num: int) -> str:
-    """Convertir un nombre en base36"""
-    chars = "0123456789abcdefghijklmnopqrstuvwxyz"
-    if num == 0:
-        return "0"
-    result = ""
-    while num:
-        result = chars[num % 36] + result
-        num //= 36
-    return result
+    Format: c + timestamp (8, base36) + compteur (4) + empreinte (4) + aléatoire (8)
+    Exemple: clxxx9a8b0000k3f2g2h1a9zq
+
+    Les IDs sont croissants dans le processus (k-sortable) : les insertions
+    se font en fin d'index B-tree sur les clés primaires TEXT.
+    """
+    ms, counter = divmod(_reserve(1), _COUNTER_SPACE)
+    random_part = secrets.token_bytes(_RANDOM_WIDTH).translate(_BYTE_TO_BASE36).decode("ascii")
+    return _prefix(ms) + _PAIRS[counter // 1296] + _PAIRS[counter % 1296] + _FINGERPRINT + random_part
+
+
+def generate_cuids(n: int) -> list[str]:
+    """
+    Générer n IDs croissants en un seul appel (imports en masse) : une lecture
+    d'horloge, une prise de verrou et un tirage aléatoire pour tout le lot
+    """
+    if n <= 0:
+        return []
+    start = _reserve(n)
+    # Partie aléatoire : un octet -> un chiffre base36 (biais < 1 %, ~41 bits par ID)
+    randomness = secrets.token_bytes(_RANDOM_WIDTH * n).translate(_BYTE_TO_BASE36).decode("ascii")
+    pairs, fingerprint = _PAIRS, _FINGERPRINT
+    ids = []
+    prefix_ms = None
+    for index in range(n):
+        ms, counter = divmod(start + index, _COUNTER_SPACE)
+        if ms != prefix_ms:
+            prefix = _prefix(ms)
+            prefix_ms = ms
+        offset = _RANDOM_WIDTH * index
+        ids.append(
+            prefix + pairs[counter // 1296] + pairs[counter % 1296] + fingerprint
+            + randomness[offset:offset + _RANDOM_WIDTH]
+        )
+    return ids
+
+
+def _prefix(ms: int) -> str:
+    """
+    "c" + timestamp base36 (dernier préfixe gardé : plusieurs IDs par milliseconde)
+
+    Raises:
+        OverflowError: à partir de 2059 (timestamp sur plus de 8 chiffres)
+    """
+    global _last_prefix
+    if _last_prefix[0] != ms:
+        if ms >= _TIMESTAMP_LIMIT:
+            # 9 chiffres casseraient l'ordre des chaînes (et la longueur de 25 caractères)
+            raise OverflowError(f"Timestamp hors de la plage des CUID (8 chiffres base36): {ms} ms")
+        _last_prefix = (ms, "c" + _encode(ms, _TIMESTAMP_WIDTH))
+    return _last_prefix[1]
+
+
+def _reserve(n: int) -> int:
+    """
+    Réserver n valeurs consécutives de (timestamp, compteur), vues comme un seul
+    nombre timestamp * 36^4 + compteur : strictement croissant même si l'horloge
+    recule ou si le compteur déborde (on emprunte alors la milliseconde suivante)
+    """
+    global _last_ms, _counter
+    now = int(time.time() * 1000)
+    with _lock:
+        if now > _last_ms:
+            # Nouvelle milliseconde : compteur de départ aléatoire (moitié basse, place pour la suite)
+            start = now * _COUNTER_SPACE + secrets.randbelow(_COUNTER_SPACE // 2)
+        else:
+            start = _last_ms * _COUNTER_SPACE + _counter + 1
+        _last_ms, _counter = divmod(start + n - 1, _COUNTER_SPACE)
+    return start
+
@@ -0,0 +1,9 @@
+"""
+Chargement du fichier .env au premier import.
+
+À importer en tête des points d'entrée (API, serveurs MCP), avant les modules
+qui lisent leur configuration à l'import (db.connection, api.settings...).
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
@@ -0,0 +1,67 @@
+-- Fractional ranks (LexoRank style) for columns_tasks, backlog_items and sprint_backlog_items.
+-- Rows are ordered by "rank" (base-36 string, compared with the "C" collation): moving a row
+-- only rewrites its own rank. "position" is kept for the existing API.
+
+-- AlterTable
+ALTER TABLE "columns_tasks" ADD COLUMN "rank" TEXT COLLATE "C";
+ALTER TABLE "backlog_items" ADD COLUMN "rank" TEXT COLLATE "C";
+ALTER TABLE "sprint_backlog_items" ADD COLUMN "rank" TEXT COLLATE "C";
+
+-- Convert existing positions: fixed-width keys in (position, id) order, with room between them
+UPDATE "columns_tasks" AS ct
+SET "rank" = lpad(r.n::text, 9, '0') || 'i'
+FROM (SELECT "id", row_number() OVER (PARTITION BY "column_id" ORDER BY "position", "id") AS n FROM "columns_tasks") AS r
+WHERE ct."id" = r."id";
+
+UPDATE "backlog_items" AS bi
+SET "rank" = lpad(r.n::text, 9, '0') || 'i'
+FROM (SELECT "id", row_number() OVER (PARTITION BY "space_id" ORDER BY "position", "id") AS n FROM "backlog_items") AS r
+WHERE bi."id" = r."id";
+
+UPDATE "sprint_backlog_items" AS sbi
+SET "rank" = lpad(r.n::text, 9, '0') || 'i'
+FROM (SELECT "id", row_number() OVER (PARTITION BY "sprint_id" ORDER BY "position", "id") AS n FROM "sprint_backlog_items") AS r
+WHERE sbi."id" = r."id";
+
+-- Smallest key greater than r (same rule as rank_between(r, None) in AIBackend/db/ranking.py)
+CREATE OR REPLACE FUNCTION rank_after(r TEXT) RETURNS TEXT AS $$
+DECLARE
+    digits CONSTANT TEXT := '0123456789abcdefghijklmnopqrstuvwxyz';
+    d INT;
+BEGIN
+    IF r IS NULL THEN
+        RETURN 'i';
+    END IF;
+    FOR i IN 1..length(r) LOOP
+        d := strpos(digits, substr(r, i, 1)) - 1;
+        IF d < 35 THEN
+            RETURN substr(r, 1, i - 1) || substr(digits, (d + 36) / 2 + 1, 1);
+        END IF;
+    END LOOP;
+    RETURN r || 'i';
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Rows inserted without a rank (e.g. by Prisma) go to the end of their group (TG_ARGV[0])
+CREATE OR REPLACE FUNCTION assign_rank() RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW."rank" IS NULL THEN
+        EXECUTE format('SELECT rank_after(MAX("rank")) FROM %I WHERE %I = $1', TG_TABLE_NAME, TG_ARGV[0])
+        INTO NEW."rank"
+        USING to_jsonb(NEW) ->> TG_ARGV[0];
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "columns_tasks_assign_rank" BEFORE INSERT ON "columns_tasks"
+    FOR EACH ROW EXECUTE FUNCTION assign_rank('column_id');
+CREATE TRIGGER "backlog_items_assign_rank" BEFORE INSERT ON "backlog_items"
+    FOR EACH ROW EXECUTE FUNCTION assign_rank('space_id');
+CREATE TRIGGER "sprint_backlog_items_assign_rank" BEFORE INSERT ON "sprint_backlog_items"
+    FOR EACH ROW EXECUTE FUNCTION assign_rank('sprint_id');
+
+-- CreateIndex
+CREATE INDEX "columns_tasks_column_id_rank_idx" ON "columns_tasks"("column_id", "rank");
+CREATE INDEX "backlog_items_space_id_rank_idx" ON "backlog_items"("space_id", "rank");
+CREATE INDEX "sprint_backlog_items_sprint_id_rank_idx" ON "sprint_backlog_items"("sprint_id", "rank");
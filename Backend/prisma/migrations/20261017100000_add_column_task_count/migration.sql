@@ -0,0 +1,29 @@
+-- Per-column occupancy counter, kept up to date by a trigger on columns_tasks
+-- (inserts, moves and deletes from any client). WIP checks and board headers read it in O(1).
+
+-- AlterTable
+ALTER TABLE "columns" ADD COLUMN "task_count" INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill
+UPDATE "columns" AS c
+SET "task_count" = ct.n
+FROM (SELECT "column_id", COUNT(*) AS n FROM "columns_tasks" GROUP BY "column_id") AS ct
+WHERE c."id" = ct."column_id";
+
+CREATE OR REPLACE FUNCTION columns_tasks_count() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE "columns" SET "task_count" = "task_count" + 1 WHERE "id" = NEW."column_id";
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE "columns" SET "task_count" = "task_count" - 1 WHERE "id" = OLD."column_id";
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "columns_tasks_count_insert_delete" AFTER INSERT OR DELETE ON "columns_tasks"
+    FOR EACH ROW EXECUTE FUNCTION columns_tasks_count();
+CREATE TRIGGER "columns_tasks_count_move" AFTER UPDATE OF "column_id" ON "columns_tasks"
+    FOR EACH ROW WHEN (OLD."column_id" IS DISTINCT FROM NEW."column_id")
+    EXECUTE FUNCTION columns_tasks_count();
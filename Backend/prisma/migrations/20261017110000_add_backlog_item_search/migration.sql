@@ -0,0 +1,19 @@
+-- Full-text search over backlog items (title weighted above description), French and English stemming.
+-- The vector is an expression index rather than a column: PostgreSQL maintains it on every write
+-- from any client, and "SELECT *" on backlog_items is unchanged.
+
+CREATE OR REPLACE FUNCTION backlog_item_search_vector(title TEXT, description TEXT) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('french'::regconfig, coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A')
+        || setweight(to_tsvector('french'::regconfig, coalesce(description, '')), 'B')
+        || setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Parse a user query in both languages (websearch syntax: "quoted phrase", -excluded, or)
+CREATE OR REPLACE FUNCTION backlog_item_search_query(q TEXT) RETURNS tsquery AS $$
+    SELECT websearch_to_tsquery('french'::regconfig, q) || websearch_to_tsquery('english'::regconfig, q)
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- CreateIndex
+CREATE INDEX "backlog_items_search_idx" ON "backlog_items"
+    USING GIN (backlog_item_search_vector("title", "description"));
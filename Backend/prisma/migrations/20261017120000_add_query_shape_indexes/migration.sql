@@ -0,0 +1,45 @@
+-- Composite indexes matching the filter + sort of the hot queries (boards, backlogs, sprints,
+-- listings), so they are served by an index scan without a Sort node. Single-column indexes made
+-- redundant by a composite one with the same leading column are dropped.
+-- Checked by `python -m db.plans` (AIBackend): EXPLAIN of every model query, fails on Seq Scan / Sort.
+
+-- DropIndex (covered by the composite indexes below, or duplicates of a unique index)
+DROP INDEX IF EXISTS "columns_tasks_column_id_idx";
+DROP INDEX IF EXISTS "columns_tasks_task_id_idx";
+DROP INDEX IF EXISTS "columns_tasks_column_id_rank_idx";
+DROP INDEX IF EXISTS "backlog_items_space_id_rank_idx";
+DROP INDEX IF EXISTS "sprint_backlog_items_sprint_id_idx";
+DROP INDEX IF EXISTS "sprint_backlog_items_backlog_item_id_idx";
+DROP INDEX IF EXISTS "sprint_backlog_items_sprint_id_rank_idx";
+
+-- Column contents in board order; task_id completes the key (keyset cursors) and feeds the join to tasks
+CREATE INDEX "columns_tasks_column_id_rank_task_id_idx" ON "columns_tasks"("column_id", "rank", "task_id");
+
+-- Backlog / sprint backlog in rank order (keyset pagination on (rank, id))
+CREATE INDEX "backlog_items_space_id_rank_id_idx" ON "backlog_items"("space_id", "rank", "id");
+CREATE INDEX "backlog_items_space_id_sequence_number_idx" ON "backlog_items"("space_id", "sequence_number");
+CREATE INDEX "sprint_backlog_items_sprint_id_rank_id_idx" ON "sprint_backlog_items"("sprint_id", "rank", "id");
+CREATE INDEX "sprint_backlog_items_backlog_item_id_added_at_idx" ON "sprint_backlog_items"("backlog_item_id", "added_at");
+
+-- Tasks of a backlog item (KANBAN) / sprint backlog item (SCRUM)
+CREATE INDEX "tasks_backlog_item_id_idx" ON "tasks"("backlog_item_id");
+CREATE INDEX "tasks_sprint_backlog_item_id_idx" ON "tasks"("sprint_backlog_item_id");
+
+-- Board columns in position order, and lookup by name
+CREATE INDEX "columns_space_id_position_idx" ON "columns"("space_id", "position");
+CREATE INDEX "columns_sprint_id_position_idx" ON "columns"("sprint_id", "position");
+CREATE INDEX "columns_space_id_name_idx" ON "columns"("space_id", "name");
+
+-- Sprints of a space (most recent first); partial index for the single active sprint lookup
+CREATE INDEX "sprints_space_id_start_date_idx" ON "sprints"("space_id", "start_date" DESC);
+CREATE INDEX "sprints_space_id_active_idx" ON "sprints"("space_id", "start_date" DESC) WHERE "status" = 'ACTIVE';
+
+-- Spaces of a user (owned, or member of) by creation date, members by join date
+CREATE INDEX "spaces_owner_id_idx" ON "spaces"("owner_id");
+CREATE INDEX "spaces_created_at_id_idx" ON "spaces"("created_at", "id");
+CREATE INDEX "space_members_user_id_idx" ON "space_members"("user_id");
+CREATE INDEX "space_members_space_id_joined_at_idx" ON "space_members"("space_id", "joined_at");
+
+-- User directory (by name) and listing (by creation date)
+CREATE INDEX "users_name_id_idx" ON "users"("name", "id");
+CREATE INDEX "users_created_at_id_idx" ON "users"("created_at", "id");
@@ -0,0 +1,148 @@
+-- Denormalized board read model: one row per task placed in a column, carrying everything a
+-- board card shows (title, sequence number, story points, assignee, column name/position).
+-- Board reads are a range scan on ("column_id", "rank", "task_id") instead of a 6-table join.
+-- Kept in sync by triggers on every source table, in the writing transaction (any client).
+-- Rebuild from scratch: SELECT board_cards_rebuild(); (AIBackend: POST /v1/db/rebuild/board-cards)
+
+-- CreateTable
+CREATE TABLE "board_cards" (
+    "task_id" TEXT NOT NULL,
+    "column_id" TEXT NOT NULL,
+    "space_id" TEXT,
+    "sprint_id" TEXT,
+    "column_name" TEXT NOT NULL,
+    "column_position" INTEGER NOT NULL,
+    "position" INTEGER NOT NULL,
+    "rank" TEXT COLLATE "C",
+    "moved_at" TIMESTAMP(3) NOT NULL,
+    "assignee_id" TEXT,
+    "assignee_name" TEXT,
+    "backlog_item_id" TEXT,
+    "sprint_backlog_item_id" TEXT,
+    "task_created_at" TIMESTAMP(3) NOT NULL,
+    "item_id" TEXT NOT NULL,
+    "title" VARCHAR(500) NOT NULL,
+    "sequence_number" INTEGER NOT NULL,
+    "description" TEXT,
+    "story_points" INTEGER,
+    "item_assignee_id" TEXT,
+    "item_assignee_name" TEXT,
+    "item_created_at" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "board_cards_pkey" PRIMARY KEY ("task_id")
+);
+
+-- CreateIndex
+CREATE INDEX "board_cards_column_id_rank_task_id_idx" ON "board_cards"("column_id", "rank", "task_id");
+CREATE INDEX "board_cards_column_id_position_idx" ON "board_cards"("column_id", "position");
+CREATE INDEX "board_cards_item_id_idx" ON "board_cards"("item_id");
+CREATE INDEX "board_cards_sprint_backlog_item_id_idx" ON "board_cards"("sprint_backlog_item_id");
+CREATE INDEX "board_cards_assignee_id_idx" ON "board_cards"("assignee_id");
+CREATE INDEX "board_cards_item_assignee_id_idx" ON "board_cards"("item_assignee_id");
+
+-- AddForeignKey
+ALTER TABLE "board_cards" ADD CONSTRAINT "board_cards_task_id_fkey" FOREIGN KEY ("task_id") REFERENCES "tasks"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+ALTER TABLE "board_cards" ADD CONSTRAINT "board_cards_column_id_fkey" FOREIGN KEY ("column_id") REFERENCES "columns"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+
+-- Card contents computed from the normalized tables (used by refresh and rebuild)
+CREATE OR REPLACE VIEW "board_cards_source" AS
+SELECT
+    ct."task_id", ct."column_id", c."space_id", c."sprint_id", c."name" AS "column_name", c."position" AS "column_position",
+    ct."position", ct."rank", ct."moved_at",
+    t."assignee_id", assignee."name" AS "assignee_name",
+    t."backlog_item_id", t."sprint_backlog_item_id", t."created_at" AS "task_created_at",
+    bi."id" AS "item_id", bi."title", bi."sequence_number", bi."description", sbi."story_points",
+    bi."assignee_id" AS "item_assignee_id", item_assignee."name" AS "item_assignee_name", bi."created_at" AS "item_created_at"
+FROM "columns_tasks" ct
+JOIN "columns" c ON c."id" = ct."column_id"
+JOIN "tasks" t ON t."id" = ct."task_id"
+LEFT JOIN "sprint_backlog_items" sbi ON sbi."id" = t."sprint_backlog_item_id"
+JOIN "backlog_items" bi ON bi."id" = COALESCE(t."backlog_item_id", sbi."backlog_item_id")
+LEFT JOIN "users" assignee ON assignee."id" = t."assignee_id"
+LEFT JOIN "users" item_assignee ON item_assignee."id" = bi."assignee_id";
+
+-- Recompute the card of one task (deleted if the task is no longer placed)
+CREATE OR REPLACE FUNCTION board_cards_refresh(p_task_id TEXT) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO "board_cards" SELECT * FROM "board_cards_source" WHERE "task_id" = p_task_id
+    ON CONFLICT ("task_id") DO UPDATE SET
+        ("column_id", "space_id", "sprint_id", "column_name", "column_position", "position", "rank", "moved_at",
+         "assignee_id", "assignee_name", "backlog_item_id", "sprint_backlog_item_id", "task_created_at",
+         "item_id", "title", "sequence_number", "description", "story_points",
+         "item_assignee_id", "item_assignee_name", "item_created_at")
+      = (EXCLUDED."column_id", EXCLUDED."space_id", EXCLUDED."sprint_id", EXCLUDED."column_name", EXCLUDED."column_position",
+         EXCLUDED."position", EXCLUDED."rank", EXCLUDED."moved_at",
+         EXCLUDED."assignee_id", EXCLUDED."assignee_name", EXCLUDED."backlog_item_id", EXCLUDED."sprint_backlog_item_id",
+         EXCLUDED."task_created_at", EXCLUDED."item_id", EXCLUDED."title", EXCLUDED."sequence_number", EXCLUDED."description",
+         EXCLUDED."story_points", EXCLUDED."item_assignee_id", EXCLUDED."item_assignee_name", EXCLUDED."item_created_at");
+    IF NOT FOUND THEN
+        DELETE FROM "board_cards" WHERE "task_id" = p_task_id;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Repopulate the whole read model; returns the number of cards
+CREATE OR REPLACE FUNCTION board_cards_rebuild() RETURNS INTEGER AS $$
+DECLARE
+    n INTEGER;
+BEGIN
+    LOCK TABLE "board_cards" IN EXCLUSIVE MODE;
+    DELETE FROM "board_cards";
+    INSERT INTO "board_cards" SELECT * FROM "board_cards_source";
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION board_cards_sync() RETURNS TRIGGER AS $$
+BEGIN
+    CASE TG_TABLE_NAME
+    WHEN 'columns_tasks' THEN
+        IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD."task_id" <> NEW."task_id") THEN
+            DELETE FROM "board_cards" WHERE "task_id" = OLD."task_id";
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM board_cards_refresh(NEW."task_id");
+        END IF;
+    WHEN 'tasks' THEN
+        PERFORM board_cards_refresh(NEW."id");
+    WHEN 'sprint_backlog_items' THEN
+        PERFORM board_cards_refresh(t."id") FROM "tasks" t WHERE t."sprint_backlog_item_id" = NEW."id";
+    WHEN 'backlog_items' THEN
+        UPDATE "board_cards" SET
+            "title" = NEW."title",
+            "sequence_number" = NEW."sequence_number",
+            "description" = NEW."description",
+            "item_assignee_id" = NEW."assignee_id",
+            "item_assignee_name" = (SELECT "name" FROM "users" WHERE "id" = NEW."assignee_id")
+        WHERE "item_id" = NEW."id";
+    WHEN 'columns' THEN
+        UPDATE "board_cards" SET
+            "column_name" = NEW."name",
+            "column_position" = NEW."position",
+            "space_id" = NEW."space_id",
+            "sprint_id" = NEW."sprint_id"
+        WHERE "column_id" = NEW."id";
+    WHEN 'users' THEN
+        UPDATE "board_cards" SET "assignee_name" = NEW."name" WHERE "assignee_id" = NEW."id";
+        UPDATE "board_cards" SET "item_assignee_name" = NEW."name" WHERE "item_assignee_id" = NEW."id";
+    END CASE;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "board_cards_columns_tasks" AFTER INSERT OR UPDATE OR DELETE ON "columns_tasks"
+    FOR EACH ROW EXECUTE FUNCTION board_cards_sync();
+CREATE TRIGGER "board_cards_tasks" AFTER UPDATE OF "assignee_id", "backlog_item_id", "sprint_backlog_item_id" ON "tasks"
+    FOR EACH ROW EXECUTE FUNCTION board_cards_sync();
+CREATE TRIGGER "board_cards_sprint_backlog_items" AFTER UPDATE OF "story_points", "backlog_item_id" ON "sprint_backlog_items"
+    FOR EACH ROW EXECUTE FUNCTION board_cards_sync();
+CREATE TRIGGER "board_cards_backlog_items" AFTER UPDATE OF "title", "sequence_number", "description", "assignee_id" ON "backlog_items"
+    FOR EACH ROW EXECUTE FUNCTION board_cards_sync();
+CREATE TRIGGER "board_cards_columns" AFTER UPDATE OF "name", "position", "space_id", "sprint_id" ON "columns"
+    FOR EACH ROW EXECUTE FUNCTION board_cards_sync();
+CREATE TRIGGER "board_cards_users" AFTER UPDATE OF "name" ON "users"
+    FOR EACH ROW EXECUTE FUNCTION board_cards_sync();
+
+-- Backfill
+SELECT board_cards_rebuild();
@@ -0,0 +1,126 @@
+-- Hot/cold split: completed sprints and old done Kanban cards are moved out of the hot tables
+-- (sprint_backlog_items, tasks, columns, columns_tasks) into *_archive tables with the same columns
+-- plus "archived_at". Board joins and index scans only see live work; history stays readable.
+-- Moves are done by archive_sprint() / archive_done_cards(), one short transaction per call
+-- (AIBackend: python -m db.archive, or the background sweep, DB_ARCHIVE_INTERVAL).
+-- A column added to a hot table must be added to its archive table too (SELECT *, now()).
+
+-- AlterTable
+ALTER TABLE "sprints" ADD COLUMN "archived_at" TIMESTAMP(3);
+
+-- CreateTable
+CREATE TABLE "sprint_backlog_items_archive" (LIKE "sprint_backlog_items" INCLUDING DEFAULTS);
+ALTER TABLE "sprint_backlog_items_archive" ADD COLUMN "archived_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE "sprint_backlog_items_archive" ADD CONSTRAINT "sprint_backlog_items_archive_pkey" PRIMARY KEY ("id");
+
+CREATE TABLE "tasks_archive" (LIKE "tasks" INCLUDING DEFAULTS);
+ALTER TABLE "tasks_archive" ADD COLUMN "archived_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE "tasks_archive" ADD CONSTRAINT "tasks_archive_pkey" PRIMARY KEY ("id");
+
+CREATE TABLE "columns_archive" (LIKE "columns" INCLUDING DEFAULTS);
+ALTER TABLE "columns_archive" ADD COLUMN "archived_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE "columns_archive" ADD CONSTRAINT "columns_archive_pkey" PRIMARY KEY ("id");
+
+-- "column_id" may point to a live space column (archived Kanban card) or to columns_archive (archived sprint)
+CREATE TABLE "columns_tasks_archive" (LIKE "columns_tasks" INCLUDING DEFAULTS);
+ALTER TABLE "columns_tasks_archive" ADD COLUMN "archived_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE "columns_tasks_archive" ADD CONSTRAINT "columns_tasks_archive_pkey" PRIMARY KEY ("id");
+
+-- CreateIndex
+CREATE INDEX "sprint_backlog_items_archive_sprint_id_rank_id_idx" ON "sprint_backlog_items_archive"("sprint_id", "rank", "id");
+CREATE INDEX "sprint_backlog_items_archive_backlog_item_id_idx" ON "sprint_backlog_items_archive"("backlog_item_id");
+CREATE INDEX "tasks_archive_backlog_item_id_idx" ON "tasks_archive"("backlog_item_id");
+CREATE INDEX "tasks_archive_sprint_backlog_item_id_idx" ON "tasks_archive"("sprint_backlog_item_id");
+CREATE INDEX "columns_archive_sprint_id_position_idx" ON "columns_archive"("sprint_id", "position");
+CREATE INDEX "columns_archive_space_id_idx" ON "columns_archive"("space_id");
+CREATE UNIQUE INDEX "columns_tasks_archive_task_id_key" ON "columns_tasks_archive"("task_id");
+CREATE INDEX "columns_tasks_archive_column_id_idx" ON "columns_tasks_archive"("column_id");
+
+-- Sweep candidates: completed sprints not archived yet
+CREATE INDEX "sprints_archivable_idx" ON "sprints"("end_date", "id") WHERE "status" = 'COMPLETED' AND "archived_at" IS NULL;
+
+-- AddForeignKey (archived rows go away with their sprint, space or backlog item)
+ALTER TABLE "sprint_backlog_items_archive" ADD CONSTRAINT "sprint_backlog_items_archive_sprint_id_fkey" FOREIGN KEY ("sprint_id") REFERENCES "sprints"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+ALTER TABLE "sprint_backlog_items_archive" ADD CONSTRAINT "sprint_backlog_items_archive_backlog_item_id_fkey" FOREIGN KEY ("backlog_item_id") REFERENCES "backlog_items"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+ALTER TABLE "tasks_archive" ADD CONSTRAINT "tasks_archive_backlog_item_id_fkey" FOREIGN KEY ("backlog_item_id") REFERENCES "backlog_items"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+ALTER TABLE "tasks_archive" ADD CONSTRAINT "tasks_archive_sprint_backlog_item_id_fkey" FOREIGN KEY ("sprint_backlog_item_id") REFERENCES "sprint_backlog_items_archive"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+ALTER TABLE "columns_archive" ADD CONSTRAINT "columns_archive_space_id_fkey" FOREIGN KEY ("space_id") REFERENCES "spaces"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+ALTER TABLE "columns_archive" ADD CONSTRAINT "columns_archive_sprint_id_fkey" FOREIGN KEY ("sprint_id") REFERENCES "sprints"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+ALTER TABLE "columns_tasks_archive" ADD CONSTRAINT "columns_tasks_archive_task_id_fkey" FOREIGN KEY ("task_id") REFERENCES "tasks_archive"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+
+-- Move a completed sprint (backlog items, tasks, columns, placements) to the archive tables.
+-- Returns the number of rows moved, 0 if the sprint is not COMPLETED or already archived.
+-- Tasks of another sprint placed on this board lose their placement, as when the sprint is deleted.
+CREATE OR REPLACE FUNCTION archive_sprint(p_sprint_id TEXT) RETURNS INTEGER AS $$
+DECLARE
+    moved INTEGER := 0;
+    n INTEGER;
+    task_ids TEXT[];
+BEGIN
+    PERFORM 1 FROM "sprints"
+    WHERE "id" = p_sprint_id AND "status" = 'COMPLETED' AND "archived_at" IS NULL
+    FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN 0;
+    END IF;
+
+    SELECT COALESCE(array_agg(t."id"), '{}') INTO task_ids
+    FROM "tasks" t
+    WHERE t."sprint_backlog_item_id" IN (SELECT "id" FROM "sprint_backlog_items" WHERE "sprint_id" = p_sprint_id)
+       OR (t."sprint_backlog_item_id" IS NULL AND t."id" IN (
+              SELECT ct."task_id" FROM "columns_tasks" ct
+              JOIN "columns" c ON c."id" = ct."column_id"
+              WHERE c."sprint_id" = p_sprint_id));
+
+    -- Copies first (archive foreign keys), then deletes from the hot tables
+    INSERT INTO "sprint_backlog_items_archive" SELECT sbi.*, now() FROM "sprint_backlog_items" sbi WHERE sbi."sprint_id" = p_sprint_id;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    moved := moved + n;
+    INSERT INTO "tasks_archive" SELECT t.*, now() FROM "tasks" t WHERE t."id" = ANY(task_ids);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    moved := moved + n;
+    INSERT INTO "columns_archive" SELECT c.*, now() FROM "columns" c WHERE c."sprint_id" = p_sprint_id;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    moved := moved + n;
+    INSERT INTO "columns_tasks_archive" SELECT ct.*, now() FROM "columns_tasks" ct WHERE ct."task_id" = ANY(task_ids);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    moved := moved + n;
+
+    -- Cascades: placements and board cards of the tasks, then of the columns
+    DELETE FROM "tasks" WHERE "id" = ANY(task_ids);
+    DELETE FROM "columns" WHERE "sprint_id" = p_sprint_id;
+    DELETE FROM "sprint_backlog_items" WHERE "sprint_id" = p_sprint_id;
+
+    UPDATE "sprints" SET "archived_at" = now() WHERE "id" = p_sprint_id;
+    RETURN moved;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Move at most p_limit Kanban cards that sit in the last column of their space board since before
+-- p_before (task + placement). Locked cards are skipped. Returns the number of cards moved.
+CREATE OR REPLACE FUNCTION archive_done_cards(p_before TIMESTAMP, p_limit INTEGER) RETURNS INTEGER AS $$
+DECLARE
+    n INTEGER;
+    task_ids TEXT[];
+BEGIN
+    SELECT COALESCE(array_agg(done."task_id"), '{}') INTO task_ids
+    FROM (
+        SELECT ct."task_id"
+        FROM "columns" c
+        JOIN "columns_tasks" ct ON ct."column_id" = c."id"
+        JOIN "tasks" t ON t."id" = ct."task_id"
+        WHERE c."space_id" IS NOT NULL
+          AND c."position" = (SELECT max(c2."position") FROM "columns" c2 WHERE c2."space_id" = c."space_id")
+          AND ct."moved_at" < p_before
+          AND t."sprint_backlog_item_id" IS NULL
+        LIMIT p_limit
+        FOR UPDATE OF ct, t SKIP LOCKED
+    ) done;
+
+    INSERT INTO "tasks_archive" SELECT t.*, now() FROM "tasks" t WHERE t."id" = ANY(task_ids);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    INSERT INTO "columns_tasks_archive" SELECT ct.*, now() FROM "columns_tasks" ct WHERE ct."task_id" = ANY(task_ids);
+    DELETE FROM "tasks" WHERE "id" = ANY(task_ids);
+    RETURN n;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,47 @@
+-- Appended ranks: step instead of bisecting toward the top. The previous rank_after halved the gap
+-- after the last key, so keys grew by one character every ~2 appends and long columns were
+-- rebalanced every ~130 appends. Keys now carry their width in their first digit ('1x', '2xx'...)
+-- and an append increments that number with carry: N appends give ~log36(N) + 1 characters.
+-- Same rule as rank_after() in AIBackend/db/ranking.py; existing keys stay valid and in order.
+
+-- Smallest "step" key greater than r (NULL = empty group)
+CREATE OR REPLACE FUNCTION rank_after(r TEXT) RETURNS TEXT AS $$
+DECLARE
+    digits CONSTANT TEXT := '0123456789abcdefghijklmnopqrstuvwxyz';
+    width INT;
+    head TEXT;
+    value NUMERIC := 0;
+    result TEXT := '';
+BEGIN
+    IF r IS NULL THEN
+        RETURN '11';
+    END IF;
+    width := strpos(digits, left(r, 1)) - 1;
+    IF width <= 0 THEN
+        RETURN '11';
+    END IF;
+    head := rpad(substr(r, 2, width), width, '0');
+    FOR i IN 1..width LOOP
+        value := value * 36 + strpos(digits, substr(head, i, 1)) - 1;
+    END LOOP;
+    IF (left(r, 1) || head) COLLATE "C" <= r COLLATE "C" THEN
+        value := value + 1;
+    END IF;
+    -- Never end with '0': there is always room before the key
+    IF mod(value, 36) = 0 THEN
+        value := value + 1;
+    END IF;
+    IF value >= power(36::NUMERIC, width) THEN
+        IF width = 35 THEN
+            RETURN r || 'i';
+        END IF;
+        width := width + 1;
+        value := 1;
+    END IF;
+    FOR i IN 1..width LOOP
+        result := substr(digits, mod(value, 36)::INT + 1, 1) || result;
+        value := div(value, 36);
+    END LOOP;
+    RETURN substr(digits, width + 1, 1) || result;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
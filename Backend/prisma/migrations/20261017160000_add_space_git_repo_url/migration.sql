@@ -0,0 +1,6 @@
+-- "git_repo_url" is in schema.prisma (Space.gitRepoUrl) and read by the AIBackend models, but no
+-- migration created it: databases built from migrations alone lacked the column.
+-- IF NOT EXISTS: databases synced with `prisma db push` already have it.
+
+-- AlterTable
+ALTER TABLE "spaces" ADD COLUMN IF NOT EXISTS "git_repo_url" TEXT;
@@ -0,0 +1,98 @@
+-- Archive copies list their columns explicitly instead of "SELECT t.*, now()": a column added to a
+-- hot table (or created in another order) no longer shifts values into the wrong archive column.
+-- A column added to a hot table must still be added to its archive table and to these lists.
+--
+-- "Done" Kanban cards are the cards of the highest-position column of a space board: there is no
+-- done flag on columns, so reordering columns (or adding one after "Done") changes what is archived.
+
+-- Move a completed sprint (backlog items, tasks, columns, placements) to the archive tables.
+-- Returns the number of rows moved, 0 if the sprint is not COMPLETED or already archived.
+-- Tasks of another sprint placed on this board lose their placement, as when the sprint is deleted.
+CREATE OR REPLACE FUNCTION archive_sprint(p_sprint_id TEXT) RETURNS INTEGER AS $$
+DECLARE
+    moved INTEGER := 0;
+    n INTEGER;
+    task_ids TEXT[];
+BEGIN
+    PERFORM 1 FROM "sprints"
+    WHERE "id" = p_sprint_id AND "status" = 'COMPLETED' AND "archived_at" IS NULL
+    FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN 0;
+    END IF;
+
+    SELECT COALESCE(array_agg(t."id"), '{}') INTO task_ids
+    FROM "tasks" t
+    WHERE t."sprint_backlog_item_id" IN (SELECT "id" FROM "sprint_backlog_items" WHERE "sprint_id" = p_sprint_id)
+       OR (t."sprint_backlog_item_id" IS NULL AND t."id" IN (
+              SELECT ct."task_id" FROM "columns_tasks" ct
+              JOIN "columns" c ON c."id" = ct."column_id"
+              WHERE c."sprint_id" = p_sprint_id));
+
+    -- Copies first (archive foreign keys), then deletes from the hot tables
+    INSERT INTO "sprint_backlog_items_archive"
+        ("id", "sprint_id", "backlog_item_id", "story_points", "position", "added_at", "rank", "archived_at")
+    SELECT sbi."id", sbi."sprint_id", sbi."backlog_item_id", sbi."story_points", sbi."position", sbi."added_at", sbi."rank", now()
+    FROM "sprint_backlog_items" sbi WHERE sbi."sprint_id" = p_sprint_id;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    moved := moved + n;
+    INSERT INTO "tasks_archive" ("id", "backlog_item_id", "sprint_backlog_item_id", "assignee_id", "created_at", "archived_at")
+    SELECT t."id", t."backlog_item_id", t."sprint_backlog_item_id", t."assignee_id", t."created_at", now()
+    FROM "tasks" t WHERE t."id" = ANY(task_ids);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    moved := moved + n;
+    INSERT INTO "columns_archive"
+        ("id", "space_id", "sprint_id", "name", "wip_limit", "position", "created_at", "task_count", "archived_at")
+    SELECT c."id", c."space_id", c."sprint_id", c."name", c."wip_limit", c."position", c."created_at", c."task_count", now()
+    FROM "columns" c WHERE c."sprint_id" = p_sprint_id;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    moved := moved + n;
+    INSERT INTO "columns_tasks_archive" ("id", "column_id", "task_id", "position", "moved_at", "rank", "archived_at")
+    SELECT ct."id", ct."column_id", ct."task_id", ct."position", ct."moved_at", ct."rank", now()
+    FROM "columns_tasks" ct WHERE ct."task_id" = ANY(task_ids);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    moved := moved + n;
+
+    -- Cascades: placements and board cards of the tasks, then of the columns
+    DELETE FROM "tasks" WHERE "id" = ANY(task_ids);
+    DELETE FROM "columns" WHERE "sprint_id" = p_sprint_id;
+    DELETE FROM "sprint_backlog_items" WHERE "sprint_id" = p_sprint_id;
+
+    UPDATE "sprints" SET "archived_at" = now() WHERE "id" = p_sprint_id;
+    RETURN moved;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Move at most p_limit Kanban cards that sit in the last (highest-position) column of their space
+-- board since before p_before (task + placement). Locked cards are skipped. Returns the number of
+-- cards moved.
+CREATE OR REPLACE FUNCTION archive_done_cards(p_before TIMESTAMP, p_limit INTEGER) RETURNS INTEGER AS $$
+DECLARE
+    n INTEGER;
+    task_ids TEXT[];
+BEGIN
+    SELECT COALESCE(array_agg(done."task_id"), '{}') INTO task_ids
+    FROM (
+        SELECT ct."task_id"
+        FROM "columns" c
+        JOIN "columns_tasks" ct ON ct."column_id" = c."id"
+        JOIN "tasks" t ON t."id" = ct."task_id"
+        WHERE c."space_id" IS NOT NULL
+          AND c."position" = (SELECT max(c2."position") FROM "columns" c2 WHERE c2."space_id" = c."space_id")
+          AND ct."moved_at" < p_before
+          AND t."sprint_backlog_item_id" IS NULL
+        LIMIT p_limit
+        FOR UPDATE OF ct, t SKIP LOCKED
+    ) done;
+
+    INSERT INTO "tasks_archive" ("id", "backlog_item_id", "sprint_backlog_item_id", "assignee_id", "created_at", "archived_at")
+    SELECT t."id", t."backlog_item_id", t."sprint_backlog_item_id", t."assignee_id", t."created_at", now()
+    FROM "tasks" t WHERE t."id" = ANY(task_ids);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    INSERT INTO "columns_tasks_archive" ("id", "column_id", "task_id", "position", "moved_at", "rank", "archived_at")
+    SELECT ct."id", ct."column_id", ct."task_id", ct."position", ct."moved_at", ct."rank", now()
+    FROM "columns_tasks" ct WHERE ct."task_id" = ANY(task_ids);
+    DELETE FROM "tasks" WHERE "id" = ANY(task_ids);
+    RETURN n;
+END;
+$$ LANGUAGE plpgsql;
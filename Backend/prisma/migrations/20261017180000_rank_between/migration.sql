@@ -0,0 +1,40 @@
+-- Ordering is rank-only: the Node backend now places moved cards and reordered backlog items with
+-- rank_between() instead of renumbering "position". "position" is no longer written by either
+-- backend (kept at its default for old clients); the order of a group is (rank, id).
+-- Same rule as rank_between() in AIBackend/db/ranking.py.
+
+-- Key strictly between lo and hi (NULL = unbounded). Never ends with '0'; when lo >= hi
+-- (concurrent inserts) the key goes after lo. Without upper bound it is rank_after(lo).
+CREATE OR REPLACE FUNCTION rank_between(lo TEXT, hi TEXT) RETURNS TEXT AS $$
+DECLARE
+    digits CONSTANT TEXT := '0123456789abcdefghijklmnopqrstuvwxyz';
+    result TEXT := '';
+    i INT := 1;
+    low INT;
+    high INT;
+    middle INT;
+BEGIN
+    IF lo IS NOT NULL AND hi IS NOT NULL AND lo COLLATE "C" >= hi COLLATE "C" THEN
+        hi := NULL;
+    END IF;
+    IF hi IS NULL THEN
+        RETURN rank_after(lo);
+    END IF;
+    LOOP
+        low := CASE WHEN lo IS NOT NULL AND i <= length(lo) THEN strpos(digits, substr(lo, i, 1)) - 1 ELSE 0 END;
+        high := CASE WHEN hi IS NOT NULL AND i <= length(hi) THEN strpos(digits, substr(hi, i, 1)) - 1 ELSE 36 END;
+        IF low = high THEN
+            result := result || substr(digits, low + 1, 1);
+        ELSE
+            middle := (low + high) / 2;
+            IF middle > low THEN
+                RETURN result || substr(digits, middle + 1, 1);
+            END IF;
+            -- Consecutive digits: the prefix is already below hi, continue after lo
+            result := result || substr(digits, low + 1, 1);
+            hi := NULL;
+        END IF;
+        i := i + 1;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
@@ -0,0 +1,19 @@
+-- Column counter trigger: lock both columns in id order on a move. The previous version updated
+-- the NEW column then the OLD one, so two opposite moves (a -> b and b -> a) locked the same
+-- two rows in opposite orders and deadlocked.
+
+CREATE OR REPLACE FUNCTION columns_tasks_count() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        -- Rows are locked after the sort: every move takes the two locks in the same order
+        PERFORM 1 FROM "columns" WHERE "id" IN (OLD."column_id", NEW."column_id") ORDER BY "id" FOR NO KEY UPDATE;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE "columns" SET "task_count" = "task_count" + 1 WHERE "id" = NEW."column_id";
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE "columns" SET "task_count" = "task_count" - 1 WHERE "id" = OLD."column_id";
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
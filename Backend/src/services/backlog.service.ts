@@ -17,26 +17,31 @@ export interface BacklogItemResponse {
   createdAt: Date;
 }
 
-function toResponse(item: {
-  id: string;
-  spaceId: string;
-  title: string;
-  description: string | null;
-  sequenceNumber: number;
-  position: number;
-  assigneeId: string | null;
-  createdById: string;
-  createdAt: Date;
-  assignee: { name: string } | null;
-  createdBy: { name: string };
-}): BacklogItemResponse {
+/**
+ * `position` is the index of the item in the backlog (order is rank, id); the position column is no longer written
+ */
+function toResponse(
+  item: {
+    id: string;
+    spaceId: string;
+    title: string;
+    description: string | null;
+    sequenceNumber: number;
+    assigneeId: string | null;
+    createdById: string;
+    createdAt: Date;
+    assignee: { name: string } | null;
+    createdBy: { name: string };
+  },
+  position: number
+): BacklogItemResponse {
   return {
     id: item.id,
     spaceId: item.spaceId,
     title: item.title,
     description: item.description,
     sequenceNumber: item.sequenceNumber,
-    position: item.position,
+    position,
     assigneeId: item.assigneeId,
     assigneeName: item.assignee?.name ?? null,
     createdById: item.createdById,
@@ -46,18 +51,18 @@ function toResponse(item: {
 }
 
 /**
- * Get all backlog items for a space (ordered by position)
+ * Get all backlog items for a space (ordered by rank)
  */
 export async function getBacklogItems(spaceId: string): Promise<BacklogItemResponse[]> {
   const items = await prisma.backlogItem.findMany({
     where: { spaceId },
-    orderBy: { position: 'asc' },
+    orderBy: [{ rank: 'asc' }, { id: 'asc' }],
     include: {
       assignee: { select: { name: true } },
       createdBy: { select: { name: true } },
     },
   });
-  return items.map(toResponse);
+  return items.map((item, index) => toResponse(item, index));
 }
 
 /**
@@ -68,11 +73,8 @@ export async function createBacklogItem(
   data: { title: string; description?: string | null; assigneeId?: string | null },
   createdById: string
 ): Promise<BacklogItemResponse> {
-  const maxPosition = await prisma.backlogItem.aggregate({
-    where: { spaceId },
-    _max: { position: true },
-  });
-  const position = (maxPosition._max.position ?? -1) + 1;
+  // The rank trigger (assign_rank) appends the item at the end: its index is the current item count
+  const position = await prisma.backlogItem.count({ where: { spaceId } });
 
   const item = await prisma.backlogItem.create({
     data: {
@@ -81,14 +83,13 @@ export async function createBacklogItem(
       description: data.description ?? null,
       assigneeId: data.assigneeId ?? null,
       createdById,
-      position,
     },
     include: {
       assignee: { select: { name: true } },
       createdBy: { select: { name: true } },
     },
   });
-  return toResponse(item);
+  return toResponse(item, position);
 }
 
 /**
@@ -120,7 +121,13 @@ export async function updateBacklogItem(
       createdBy: { select: { name: true } },
     },
   });
-  return toResponse(updated);
+  const position = await prisma.backlogItem.count({
+    where: {
+      spaceId,
+      OR: [{ rank: { lt: updated.rank ?? '' } }, { rank: updated.rank, id: { lt: updated.id } }],
+    },
+  });
+  return toResponse(updated, position);
 }
 
 /**
@@ -135,7 +142,8 @@ export async function deleteBacklogItem(spaceId: string, itemId: string): Promis
 }
 
 /**
- * Reorder backlog items. Body is ordered array of item ids; positions are set 0, 1, 2, ...
+ * Reorder backlog items. Body is ordered array of item ids; ranks are reassigned in that order
+ * (rank_after chain, short keys) under the space's advisory lock, shared with the AIBackend moves.
  */
 export async function reorderBacklogItems(
   spaceId: string,
@@ -145,13 +153,21 @@ export async function reorderBacklogItems(
   if (itemIds.length !== count) {
     throw new Error('Reorder must include all backlog items for this space');
   }
-  const updates = itemIds.map((id, position) =>
-    prisma.backlogItem.updateMany({
-      where: { id, spaceId },
-      data: { position },
-    })
-  );
-  await prisma.$transaction(updates);
+  await prisma.$transaction(async (tx) => {
+    await tx.$executeRaw`SELECT pg_advisory_xact_lock(hashtextextended(${`backlog_items:${spaceId}`}, 0))`;
+    await tx.$executeRaw`
+      WITH RECURSIVE ordered AS (
+        SELECT id, n FROM unnest(${itemIds}::text[]) WITH ORDINALITY AS t(id, n)
+      ), ranks(n, rank) AS (
+        SELECT 1::bigint, rank_after(NULL)
+        UNION ALL SELECT n + 1, rank_after(rank) FROM ranks WHERE n < ${itemIds.length}
+      )
+      UPDATE backlog_items AS bi
+      SET rank = ranks.rank
+      FROM ordered JOIN ranks USING (n)
+      WHERE bi.id = ordered.id AND bi.space_id = ${spaceId}
+    `;
+  });
   return getBacklogItems(spaceId);
 }
 
@@ -37,47 +37,6 @@ export interface BoardResponse {
   nextSequence: number;
 }
 
-function cardFromTask(
-  task: {
-    id: string;
-    assigneeId?: string | null;
-    position: number;
-    backlogItem?: {
-      title: string;
-      description: string | null;
-      sequenceNumber: number;
-      assigneeId: string | null;
-      createdAt: Date;
-      assignee: { name: string } | null;
-    } | null;
-    sprintBacklogItem?: {
-      backlogItem: {
-        title: string;
-        description: string | null;
-        sequenceNumber: number;
-        assigneeId: string | null;
-        createdAt: Date;
-        assignee: { name: string } | null;
-      };
-    } | null;
-    assignee: { name: string } | null;
-  }
-): BoardCardResponse {
-  const item = task.backlogItem ?? task.sprintBacklogItem?.backlogItem;
-  const assigneeName = task.assignee?.name ?? item?.assignee?.name ?? null;
-  const assigneeId = item?.assigneeId ?? (task as { assigneeId?: string | null }).assigneeId ?? null;
-  return {
-    id: task.id,
-    title: item?.title ?? '',
-    description: item?.description ?? null,
-    assigneeId,
-    assigneeName,
-    sequenceNumber: item?.sequenceNumber ?? 0,
-    position: task.position,
-    createdAt: (item?.createdAt ?? new Date()).toISOString(),
-  };
-}
-
 /**
  * Get or create columns for a space (KANBAN) or sprint (SCRUM).
  */
@@ -109,67 +68,30 @@ export async function getBoard(spaceId: string, sprintId?: string | null): Promi
   const columnsMeta = await getOrCreateColumns(spaceId, sprintId);
   const columnIds = columnsMeta.map((c) => c.id);
 
-  const columnTasks = await prisma.columnTask.findMany({
+  // Denormalized read model (board_cards, maintained by DB triggers): one indexed scan, no joins.
+  // Same order as the (column_id, rank, task_id) index; position is no longer written
+  const boardCards = await prisma.boardCard.findMany({
     where: { columnId: { in: columnIds } },
-    orderBy: [{ columnId: 'asc' }, { position: 'asc' }],
-    include: {
-      task: {
-        include: {
-          backlogItem: {
-            select: {
-              title: true,
-              description: true,
-              sequenceNumber: true,
-              assigneeId: true,
-              createdAt: true,
-              assignee: { select: { name: true } },
-            },
-          },
-          sprintBacklogItem: {
-            select: {
-              backlogItem: {
-                select: {
-                  title: true,
-                  description: true,
-                  sequenceNumber: true,
-                  assigneeId: true,
-                  createdAt: true,
-                  assignee: { select: { name: true } },
-                },
-              },
-            },
-          },
-          assignee: { select: { name: true } },
-        },
-      },
-    },
-  });
-
-  const taskToPosition: Record<string, number> = {};
-  const taskToCard: Record<string, BoardCardResponse> = {};
-  columnTasks.forEach((ct) => {
-    taskToPosition[ct.taskId] = ct.position;
-    const t = ct.task as unknown as {
-      id: string;
-      position: number;
-      backlogItem?: { title: string; description: string | null; sequenceNumber: number; assigneeId: string | null; createdAt: Date; assignee: { name: string } | null };
-      sprintBacklogItem?: { backlogItem: { title: string; description: string | null; sequenceNumber: number; assigneeId: string | null; createdAt: Date; assignee: { name: string } | null } };
-      assignee: { name: string } | null;
-    };
-    t.position = ct.position;
-    taskToCard[ct.taskId] = cardFromTask(t);
+    orderBy: [{ columnId: 'asc' }, { rank: 'asc' }, { taskId: 'asc' }],
   });
 
-  const colIdToTaskIds: Record<string, string[]> = {};
-  columnTasks.forEach((ct) => {
-    const arr = colIdToTaskIds[ct.columnId];
-    if (!arr) colIdToTaskIds[ct.columnId] = [ct.taskId];
-    else arr.push(ct.taskId);
-  });
+  const colIdToCards: Record<string, BoardCardResponse[]> = {};
   columnsMeta.forEach((c) => {
-    const arr = colIdToTaskIds[c.id];
-    if (!arr) colIdToTaskIds[c.id] = [];
-    else arr.sort((a, b) => (taskToPosition[a] ?? 0) - (taskToPosition[b] ?? 0));
+    colIdToCards[c.id] = [];
+  });
+  boardCards.forEach((card) => {
+    const cards = colIdToCards[card.columnId];
+    if (!cards) return;
+    cards.push({
+      id: card.taskId,
+      title: card.title,
+      description: card.description,
+      assigneeId: card.itemAssigneeId ?? card.assigneeId,
+      assigneeName: card.assigneeName ?? card.itemAssigneeName,
+      sequenceNumber: card.sequenceNumber,
+      position: cards.length,
+      createdAt: card.itemCreatedAt.toISOString(),
+    });
   });
 
   let nextSequence = 1;
@@ -194,7 +116,7 @@ export async function getBoard(spaceId: string, sprintId?: string | null): Promi
     name: col.name,
     wipLimit: col.wipLimit,
     position: col.position,
-    cards: (colIdToTaskIds[col.id] ?? []).map((taskId) => taskToCard[taskId]).filter((c): c is BoardCardResponse => c != null),
+    cards: colIdToCards[col.id] ?? [],
   }));
 
   return { columns, nextSequence };
@@ -220,11 +142,8 @@ export async function createCard(
   if (columnSpaceId !== spaceId) throw new Error('Column not found');
   const sprintId = column.sprintId;
 
-  const maxPos = await prisma.columnTask.aggregate({
-    where: { columnId },
-    _max: { position: true },
-  });
-  const position = (maxPos._max.position ?? -1) + 1;
+  // The rank trigger (assign_rank) appends the card at the bottom: its index is the current card count
+  const position = await prisma.columnTask.count({ where: { columnId } });
 
   if (sprintId) {
     const backlogItem = await prisma.backlogItem.create({
@@ -256,7 +175,7 @@ export async function createCard(
       },
     });
     await prisma.columnTask.create({
-      data: { columnId, taskId: task.id, position },
+      data: { columnId, taskId: task.id },
     });
     const item = task.sprintBacklogItem!.backlogItem;
     return {
@@ -287,7 +206,7 @@ export async function createCard(
       },
     });
     await prisma.columnTask.create({
-      data: { columnId, taskId: task.id, position },
+      data: { columnId, taskId: task.id },
     });
     return {
       id: task.id,
@@ -347,6 +266,15 @@ export async function updateCard(
   if (!updated) throw new Error('Task not found');
   const item = updated.backlogItem ?? updated.sprintBacklogItem?.backlogItem;
   const ct = updated.columnTask;
+  // Index of the card in its column (order is rank, taskId)
+  const position = ct
+    ? await prisma.columnTask.count({
+        where: {
+          columnId: ct.columnId,
+          OR: [{ rank: { lt: ct.rank ?? '' } }, { rank: ct.rank, taskId: { lt: ct.taskId } }],
+        },
+      })
+    : 0;
   return {
     id: updated.id,
     title: item?.title ?? '',
@@ -354,7 +282,7 @@ export async function updateCard(
     assigneeId: item?.assigneeId ?? null,
     assigneeName: item?.assignee?.name ?? updated.assignee?.name ?? null,
     sequenceNumber: item?.sequenceNumber ?? 0,
-    position: ct?.position ?? 0,
+    position,
     createdAt: (item?.createdAt ?? new Date()).toISOString(),
   };
 }
@@ -388,25 +316,29 @@ export async function moveCard(
   });
   if (!existing) throw new Error('Card not found on board');
 
-  await prisma.columnTask.update({
-    where: { taskId },
-    data: { columnId, position },
+  // Only the moved card is written: its rank goes between the neighbours at the target index.
+  // The column's advisory lock (shared with Task.move and the rank rebalance in AIBackend)
+  // serialises concurrent moves into the same column.
+  const index = Math.max(position, 0);
+  await prisma.$transaction(async (tx) => {
+    await tx.$executeRaw`SELECT pg_advisory_xact_lock(hashtextextended(${`columns_tasks:${columnId}`}, 0))`;
+    await tx.$executeRaw`
+      WITH others AS (
+        SELECT rank, task_id FROM columns_tasks WHERE column_id = ${columnId} AND task_id <> ${taskId}
+      )
+      UPDATE columns_tasks
+      SET column_id = ${columnId},
+          moved_at = CURRENT_TIMESTAMP,
+          rank = rank_between(
+            CASE WHEN ${index}::int > 0 THEN COALESCE(
+              (SELECT rank FROM others ORDER BY rank, task_id OFFSET ${index}::int - 1 LIMIT 1),
+              (SELECT MAX(rank) FROM others)
+            ) END,
+            (SELECT rank FROM others ORDER BY rank, task_id OFFSET ${index}::int LIMIT 1)
+          )
+      WHERE task_id = ${taskId}
+    `;
   });
-  const allInColumn = await prisma.columnTask.findMany({
-    where: { columnId },
-    orderBy: { position: 'asc' },
-  });
-  const others = allInColumn.filter((ct) => ct.taskId !== taskId);
-  const orderedIds = others.map((ct) => ct.taskId);
-  orderedIds.splice(Math.min(position, orderedIds.length), 0, taskId);
-  await prisma.$transaction(
-    orderedIds.map((tid, i) =>
-      prisma.columnTask.updateMany({
-        where: { taskId: tid, columnId },
-        data: { position: i },
-      })
-    )
-  );
 }
 
 /**